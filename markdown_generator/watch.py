@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Thin wrapper around `python -m sitegen watch`."""
+from __future__ import annotations
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from sitegen.watch import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Shared building blocks for the site's content generator scripts."""
@@ -0,0 +1,34 @@
+"""``python -m sitegen <command> [options]``; ``build`` runs every pipeline in one process."""
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Sequence
+
+COMMANDS = {
+    "bench": "sitegen.benchmark",
+    "build": "sitegen.build",
+    "corpus": "sitegen.corpus",
+    "publications": "sitegen.publications",
+    "pubsFromBib": "sitegen.pubs_from_bib",
+    "talks": "sitegen.talks",
+    "talkmap": "sitegen.talkmap",
+    "watch": "sitegen.watch",
+}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS:
+        asked_for_help = bool(argv) and argv[0] in {"-h", "--help"}
+        print(
+            f"usage: python -m sitegen {{{','.join(COMMANDS)}}} [options]",
+            file=sys.stdout if asked_for_help else sys.stderr,
+        )
+        return 0 if asked_for_help else 2
+
+    return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
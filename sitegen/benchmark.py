@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import pathlib
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sitegen.corpus import Corpus, build_corpus
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Timings below this many seconds are too noisy to call a regression whatever the ratio.
+MIN_REGRESSION_SECONDS = 0.005
+
+Phases = Dict[str, float]
+# Each scenario returns how many items one run handles and the seconds taken per phase.
+ScenarioResult = Tuple[int, Phases]
+
+
+def timed(function: Callable[[], object]) -> float:
+    """Seconds taken by ``function``, with the generators' progress output discarded."""
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+            started = time.perf_counter()
+            function()
+            return time.perf_counter() - started
+
+
+def bench_publications(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import publications
+
+    output_dir = workdir / "publications"
+
+    def run() -> None:
+        publications.process_file(corpus.publications_tsv, output_dir, dry_run=False, dedup=False)
+
+    return corpus.size, {"cold": timed(run), "warm": timed(run)}
+
+
+def bench_talks(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import talks
+
+    output_dir = workdir / "talks"
+
+    def run() -> None:
+        talks.process_file(corpus.talks_tsv, output_dir, dry_run=False)
+
+    return corpus.size, {"cold": timed(run), "warm": timed(run)}
+
+
+def bench_pubs_from_bib(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import pubs_from_bib
+    from sitegen.outputs import OutputManifest
+
+    output_dir = workdir / "bib-publications"
+    config = pubs_from_bib.SourceConfig(file=corpus.bib_file, venue_key="journal")
+
+    def run() -> None:
+        records, _, _ = pubs_from_bib.load_source_records(
+            "synthetic", config, cache_dir=workdir / "bib-cache"
+        )
+        manifest = OutputManifest(output_dir)
+        pubs_from_bib.process_records("synthetic", config, output_dir, False, manifest, records or [], {})
+        manifest.save()
+
+    return corpus.size, {"cold": timed(run), "warm": timed(run)}
+
+
+def bench_load_locations(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import talkmap
+
+    # Warm runs get the scan manifest a previous run would have saved.
+    manifest, _ = talkmap.scan_talk_locations(corpus.talks_dir, {})
+    return corpus.size, {
+        "cold": timed(lambda: talkmap.load_locations(corpus.talks_dir)),
+        "warm": timed(lambda: talkmap.load_locations(corpus.talks_dir, manifest)),
+    }
+
+
+def bench_build_address_points(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import talkmap
+    from sitegen.geocache import load_json_cache
+
+    # Cold includes reading the geocode cache from disk; warm reuses it from memory.
+    locations = list(corpus.locations)
+    cache = load_json_cache(corpus.geocode_cache)
+    return len(locations), {
+        "cold": timed(lambda: talkmap.build_address_points(locations, load_json_cache(corpus.geocode_cache))),
+        "warm": timed(lambda: talkmap.build_address_points(locations, cache)),
+    }
+
+
+def bench_write_locations_js(corpus: Corpus, workdir: pathlib.Path) -> ScenarioResult:
+    from sitegen import talkmap
+    from sitegen.geocache import load_json_cache
+
+    points, _ = talkmap.build_address_points(list(corpus.locations), load_json_cache(corpus.geocode_cache))
+    path = workdir / "talkmap" / "org-locations.js"
+
+    def run() -> None:
+        talkmap.write_locations_js(path, points)
+
+    return len(points), {"cold": timed(run), "warm": timed(run)}
+
+
+SCENARIOS: Dict[str, Callable[[Corpus, pathlib.Path], ScenarioResult]] = {
+    "publications.process_file": bench_publications,
+    "talks.process_file": bench_talks,
+    "pubsFromBib.process_source": bench_pubs_from_bib,
+    "talkmap.load_locations": bench_load_locations,
+    "talkmap.build_address_points": bench_build_address_points,
+    "talkmap.write_locations_js": bench_write_locations_js,
+}
+
+
+def run_scenario(name: str, corpus: Corpus, workdir: pathlib.Path, repeat: int) -> ScenarioResult:
+    """Best time of each phase over ``repeat`` runs, each starting from an empty output directory."""
+    items = 0
+    best: Phases = {}
+    for attempt in range(repeat):
+        scratch = workdir / f"{name}-{attempt}"
+        scratch.mkdir(parents=True)
+        try:
+            items, phases = SCENARIOS[name](corpus, scratch)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        for phase, seconds in phases.items():
+            best[phase] = min(seconds, best.get(phase, seconds))
+    return items, best
+
+
+def load_baseline(path: pathlib.Path) -> Dict[Tuple[str, int, str], float]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} has results version {data.get('version')}, expected {RESULTS_VERSION}")
+    return {
+        (result["scenario"], int(result["size"]), result["phase"]): float(result["seconds"])
+        for result in data.get("results", [])
+    }
+
+
+def compare(seconds: float, baseline: float | None, threshold: float) -> Tuple[str, bool]:
+    """Change text for the summary line and whether it counts as a regression."""
+    if baseline is None or baseline <= 0:
+        return "", False
+    change = seconds / baseline - 1
+    regressed = change > threshold and seconds - baseline > MIN_REGRESSION_SECONDS
+    return f" baseline={baseline:.4f} change={change:+.1%}", regressed
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time the generators and talkmap on synthetic corpora, cold and warm."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help="Corpus sizes to benchmark (default: 1000 10000 100000).",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        help="Scenarios to run (default: all).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest counts.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Fail when a timing is this much slower than the baseline (default: 0.10 = 10%%).",
+    )
+    parser.add_argument(
+        "--workdir",
+        help="Directory for corpora and outputs (default: a temporary directory, removed afterwards).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.repeat < 1 or any(size < 1 for size in args.sizes) or args.threshold < 0:
+        print("ERROR: --repeat and --sizes must be at least 1 and --threshold non-negative", file=sys.stderr)
+        return 1
+
+    baseline: Dict[Tuple[str, int, str], float] = {}
+    if args.baseline:
+        try:
+            baseline = load_baseline(pathlib.Path(args.baseline))
+        except (OSError, ValueError, KeyError) as error:
+            print(f"ERROR: cannot read baseline: {error}", file=sys.stderr)
+            return 1
+
+    if args.workdir:
+        workdir = pathlib.Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        cleanup = None
+    else:
+        cleanup = tempfile.TemporaryDirectory(prefix="sitegen-bench-")
+        workdir = pathlib.Path(cleanup.name)
+
+    results: List[Dict[str, object]] = []
+    regressions = 0
+    try:
+        for size in args.sizes:
+            corpus = build_corpus(workdir / f"corpus-{size}", size, args.seed)
+            for name in args.scenarios:
+                items, phases = run_scenario(name, corpus, workdir / f"runs-{size}", args.repeat)
+                for phase, seconds in phases.items():
+                    previous = baseline.get((name, size, phase))
+                    change_text, regressed = compare(seconds, previous, args.threshold)
+                    regressions += regressed
+                    rate = items / seconds if seconds else 0
+                    print(
+                        f"bench: scenario={name} size={size} phase={phase} items={items} "
+                        f"seconds={seconds:.4f} items_per_second={rate:.0f}{change_text}"
+                    )
+                    if regressed:
+                        print(
+                            f"WARNING bench: scenario={name} size={size} phase={phase} "
+                            f"is slower than the baseline{change_text}",
+                            file=sys.stderr,
+                        )
+                    results.append(
+                        {"scenario": name, "size": size, "phase": phase, "items": items, "seconds": seconds}
+                    )
+    finally:
+        if cleanup is not None:
+            cleanup.cleanup()
+
+    if args.output:
+        report = {
+            "version": RESULTS_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        pathlib.Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if regressions:
+        print(f"ERROR: {regressions} timing(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
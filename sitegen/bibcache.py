@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import array
+import hashlib
+import pathlib
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sitegen.fileio import atomic_write_bytes
+
+CACHE_MAGIC = b"SGBIBC"
+CACHE_VERSION = 4
+HEADER = struct.Struct("<6sHB16sI")
+RECORD_FIELDS = 9
+
+
+@dataclass(frozen=True)
+class BibRecord:
+    """One BibTeX entry reduced to what the publication pages need.
+
+    ``warning`` is set instead of the other fields when the entry could not be
+    normalized, so a cached run reports the same problems as a parsing run.
+    """
+
+    bib_id: str
+    title: str = ""
+    pub_date: str = ""
+    venue: str = ""
+    note: str = ""
+    paper_url: str = ""
+    doi: str = ""
+    arxiv_id: str = ""
+    warning: str = ""
+    authors: Tuple[str, ...] = ()
+
+
+def bib_cache_key(path: pathlib.Path, *parts: str) -> bytes:
+    """Digest of the file contents plus everything else that shapes the parsed records."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part.encode("utf-8") + b"\0")
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def encode_records(key: bytes, records: Sequence[BibRecord], warnings: Sequence[str] = ()) -> bytes:
+    author_counts = array.array("I")
+    lengths = array.array("I")
+    chunks: List[bytes] = []
+
+    for warning in warnings:
+        encoded = warning.encode("utf-8")
+        lengths.append(len(encoded))
+        chunks.append(encoded)
+
+    for record in records:
+        author_counts.append(len(record.authors))
+        values = (
+            record.bib_id,
+            record.title,
+            record.pub_date,
+            record.venue,
+            record.note,
+            record.paper_url,
+            record.doi,
+            record.arxiv_id,
+            record.warning,
+            *record.authors,
+        )
+        for value in values:
+            encoded = value.encode("utf-8")
+            lengths.append(len(encoded))
+            chunks.append(encoded)
+
+    little_endian = sys.byteorder == "little"
+    body = b"".join(
+        [struct.pack("<II", len(lengths), len(warnings)), author_counts.tobytes(), lengths.tobytes(), *chunks]
+    )
+    return HEADER.pack(CACHE_MAGIC, CACHE_VERSION, little_endian, key, len(records)) + zlib.compress(body, 1)
+
+
+def decode_records(data: bytes, key: bytes) -> Optional[Tuple[List[BibRecord], List[str]]]:
+    """Return the records and source warnings, or None if ``data`` is not a cache for ``key``."""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, little_endian, stored_key, record_count = HEADER.unpack_from(data, 0)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or stored_key != key:
+        return None
+
+    data = zlib.decompress(data[HEADER.size :])
+    string_count, warning_count = struct.unpack_from("<II", data, 0)
+    position = 8
+    author_counts = array.array("I")
+    lengths = array.array("I")
+    author_counts.frombytes(data[position : position + record_count * author_counts.itemsize])
+    position += record_count * author_counts.itemsize
+    lengths.frombytes(data[position : position + string_count * lengths.itemsize])
+    position += string_count * lengths.itemsize
+    if bool(little_endian) != (sys.byteorder == "little"):
+        author_counts.byteswap()
+        lengths.byteswap()
+
+    strings: List[str] = []
+    for length in lengths:
+        strings.append(data[position : position + length].decode("utf-8"))
+        position += length
+
+    records = []
+    index = warning_count
+    for author_count in author_counts:
+        fields = strings[index : index + RECORD_FIELDS]
+        authors = tuple(strings[index + RECORD_FIELDS : index + RECORD_FIELDS + author_count])
+        records.append(BibRecord(*fields, authors=authors))
+        index += RECORD_FIELDS + author_count
+    return records, strings[:warning_count]
+
+
+def load_bib_cache(path: pathlib.Path, key: bytes) -> Optional[Tuple[List[BibRecord], List[str]]]:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        return decode_records(data, key)
+    except (struct.error, ValueError, zlib.error):
+        return None
+
+
+def save_bib_cache(
+    path: pathlib.Path, key: bytes, records: Iterable[BibRecord], warnings: Sequence[str] = ()
+) -> None:
+    """Store ``records`` with the source-level ``warnings`` their parse produced, replayed on a hit."""
+    atomic_write_bytes(path, encode_records(key, list(records), warnings))
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+# Bump when a change to the reader can alter the values it returns.
+READER_VERSION = 1
+CHUNK_SIZE = 1 << 16
+MAX_HEADER_LENGTH = 256
+PERSON_FIELDS = ("author", "editor")
+MONTH_MACROS = {
+    "jan": "January",
+    "feb": "February",
+    "mar": "March",
+    "apr": "April",
+    "may": "May",
+    "jun": "June",
+    "jul": "July",
+    "aug": "August",
+    "sep": "September",
+    "oct": "October",
+    "nov": "November",
+    "dec": "December",
+}
+
+HEADER_PATTERN = re.compile(r"@\s*([A-Za-z][\w:.+-]*)\s*([{(])")
+BLOCK_CHARACTERS = re.compile(r'[{}()"]')
+BRACES = re.compile(r"[{}]")
+QUOTED_CHARACTERS = re.compile(r'[{}"]')
+NAME_PATTERN = re.compile(r"[A-Za-z0-9@!$&*+\-./:;<>?\[\\\]^_`|~\x7f]+")
+NUMBER_PATTERN = re.compile(r"[0-9]+")
+WHITESPACE = re.compile(r"\s+")
+NAME_SPACE = re.compile(r"(?:\\ |\s|(?<!\\)~)+")
+NAME_SEPARATOR = re.compile(r" [Aa][Nn][Dd] ")
+COMMA = re.compile(",")
+
+
+class BibSyntaxError(ValueError):
+    """Input the built-in reader does not handle; callers may retry with pybtex."""
+
+
+class BibPerson:
+    """A name split into BibTeX name parts, with the same rules as pybtex's Person."""
+
+    def __init__(self, name: str) -> None:
+        self.first_names: List[str] = []
+        self.middle_names: List[str] = []
+        self.prelast_names: List[str] = []
+        self.last_names: List[str] = []
+        self.lineage_names: List[str] = []
+
+        name = name.strip()
+        if not name:
+            return
+
+        parts = split_tex_string(name, COMMA)
+        if len(parts) > 3:
+            raise BibSyntaxError(f"too many commas in name: {name}")
+
+        if len(parts) == 3:
+            self._add_von_last(split_tex_string(parts[0]))
+            self.lineage_names.extend(split_tex_string(parts[1]))
+            self._add_first_middle(split_tex_string(parts[2]))
+        elif len(parts) == 2:
+            self._add_von_last(split_tex_string(parts[0]))
+            self._add_first_middle(split_tex_string(parts[1]))
+        else:
+            words = split_tex_string(name)
+            von_start = next((index for index, word in enumerate(words) if is_von_name(word)), len(words))
+            first_middle, von_last = words[:von_start], words[von_start:]
+            if not von_last and first_middle:
+                von_last.append(first_middle.pop())
+            self._add_first_middle(first_middle)
+            self._add_von_last(von_last)
+
+    def _add_first_middle(self, words: List[str]) -> None:
+        if words:
+            self.first_names.append(words[0])
+            self.middle_names.extend(words[1:])
+
+    def _add_von_last(self, words: List[str]) -> None:
+        candidates = words[:-1]
+        # The last von word ends the von part; the final word is always a last name.
+        split = len(candidates)
+        while split > 0 and not is_von_name(candidates[split - 1]):
+            split -= 1
+        self.prelast_names.extend(candidates[:split])
+        self.last_names.extend(candidates[split:])
+        self.last_names.extend(words[-1:])
+
+
+class BibEntry:
+    def __init__(self, entry_type: str, key: str) -> None:
+        self.type = entry_type
+        self.key = key
+        # Field names are lower-cased; BibTeX treats them case-insensitively.
+        self.fields: Dict[str, str] = {}
+        self.persons: Dict[str, List[BibPerson]] = {}
+
+
+def _closing_brace(text: str, start: int) -> int:
+    """Index just past the brace closing the group opened before ``start``, or -1."""
+    depth = 1
+    for match in BRACES.finditer(text, start):
+        depth += 1 if match.group() == "{" else -1
+        if depth == 0:
+            return match.end()
+    return -1
+
+
+def split_tex_string(text: str, separator: re.Pattern = NAME_SPACE) -> List[str]:
+    """Split on ``separator`` outside braces, as pybtex's split_tex_string does."""
+    words: List[str] = []
+    pending: List[str] = []
+    position = 0
+
+    while True:
+        brace = text.find("{", position)
+        head = text[position:] if brace < 0 else text[position:brace]
+        if head:
+            pieces = separator.split(head)
+            for piece in pieces[:-1]:
+                words.append("".join([*pending, piece]))
+                pending = []
+            pending.append(pieces[-1])
+        if brace < 0:
+            break
+        end = _closing_brace(text, brace + 1)
+        position = len(text) if end < 0 else end
+        pending.append(text[brace:position])
+
+    if pending:
+        words.append("".join(pending))
+
+    words = [word.strip() for word in words]
+    if separator is NAME_SPACE:
+        words = [word for word in words if word]
+    return words
+
+
+def _special_character_is_lower(special: str) -> bool:
+    control_sequence = True
+    for character in special[1:]:
+        if control_sequence:
+            control_sequence = character.isalpha()
+        elif character.isalpha():
+            return character.islower()
+    return False
+
+
+def is_von_name(word: str) -> bool:
+    if word[0].isupper():
+        return False
+    if word[0].islower():
+        return True
+
+    depth = 0
+    position = 0
+    while position < len(word):
+        character = word[position]
+        if character == "{":
+            if depth == 0 and word.startswith("\\", position + 1):
+                end = _closing_brace(word, position + 1)
+                return _special_character_is_lower(word[position + 1 : end - 1 if end > 0 else len(word)])
+            depth += 1
+        elif character == "}":
+            depth = max(depth - 1, 0)
+        elif depth == 0 and character.isalpha():
+            return character.islower()
+        position += 1
+    return False
+
+
+def _find_block_end(text: str, start: int, opener: str) -> int:
+    depth = 0
+    in_quotes = False
+    for match in BLOCK_CHARACTERS.finditer(text, start):
+        character = match.group()
+        if character == "{":
+            depth += 1
+        elif character == "}":
+            if depth == 0:
+                if opener == "{":
+                    return match.start()
+                raise BibSyntaxError("unbalanced braces")
+            depth -= 1
+        elif opener == "(" and depth == 0:
+            if character == '"':
+                in_quotes = not in_quotes
+            elif character == ")" and not in_quotes:
+                return match.start()
+    return -1
+
+
+def iter_entry_blocks(handle: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """Yield ``(entry_type, body)`` for each ``@type{...}`` block, reading ``handle`` in chunks."""
+    buffer = ""
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, eof
+        chunk = "" if eof else handle.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        return bool(chunk)
+
+    while True:
+        at = buffer.find("@")
+        if at < 0:
+            buffer = ""
+            if not read_more():
+                return
+            continue
+
+        buffer = buffer[at:]
+        header = HEADER_PATTERN.match(buffer)
+        if header is None:
+            if len(buffer) < MAX_HEADER_LENGTH and read_more():
+                continue
+            buffer = buffer[1:]
+            continue
+
+        entry_type, opener = header.group(1), header.group(2)
+        end = _find_block_end(buffer, header.end(), opener)
+        while end < 0:
+            if not read_more():
+                raise BibSyntaxError(f"unterminated @{entry_type} entry")
+            end = _find_block_end(buffer, header.end(), opener)
+
+        yield entry_type, buffer[header.end() : end]
+        buffer = buffer[end + 1 :]
+
+
+class _BodyParser:
+    def __init__(self, text: str, macros: Dict[str, str]) -> None:
+        self.text = text
+        self.position = 0
+        self.macros = macros
+
+    def skip_whitespace(self) -> None:
+        match = WHITESPACE.match(self.text, self.position)
+        if match:
+            self.position = match.end()
+
+    def at_end(self) -> bool:
+        self.skip_whitespace()
+        return self.position >= len(self.text)
+
+    def expect(self, character: str) -> None:
+        self.skip_whitespace()
+        if not self.text.startswith(character, self.position):
+            raise BibSyntaxError(f"expected {character!r} at {self.text[self.position:self.position + 20]!r}")
+        self.position += 1
+
+    def name(self) -> str:
+        self.skip_whitespace()
+        match = NAME_PATTERN.match(self.text, self.position)
+        if match is None:
+            raise BibSyntaxError(f"expected a name at {self.text[self.position:self.position + 20]!r}")
+        self.position = match.end()
+        return match.group()
+
+    def value_part(self) -> str:
+        self.skip_whitespace()
+        start = self.position
+        character = self.text[start : start + 1]
+
+        if character == "{":
+            end = _closing_brace(self.text, start + 1)
+            if end < 0:
+                raise BibSyntaxError("unbalanced braces")
+            self.position = end
+            return self.text[start + 1 : end - 1]
+
+        if character == '"':
+            depth = 0
+            for match in QUOTED_CHARACTERS.finditer(self.text, start + 1):
+                token = match.group()
+                if token == "{":
+                    depth += 1
+                elif token == "}":
+                    depth -= 1
+                    if depth < 0:
+                        raise BibSyntaxError("unbalanced braces")
+                elif depth == 0:
+                    self.position = match.end()
+                    return self.text[start + 1 : match.start()]
+            raise BibSyntaxError("unterminated quoted string")
+
+        number = NUMBER_PATTERN.match(self.text, start)
+        if number:
+            self.position = number.end()
+            return number.group()
+
+        macro = self.name()
+        if macro.lower() not in self.macros:
+            raise BibSyntaxError(f"undefined macro {macro!r}")
+        return self.macros[macro.lower()]
+
+    def value(self) -> str:
+        parts = [self.value_part()]
+        while not self.at_end() and self.text[self.position] == "#":
+            self.position += 1
+            parts.append(self.value_part())
+        return WHITESPACE.sub(" ", "".join(parts).strip())
+
+    def fields(self) -> Iterator[Tuple[str, str]]:
+        while not self.at_end():
+            name = self.name()
+            self.expect("=")
+            yield name, self.value()
+            if self.at_end():
+                return
+            self.expect(",")
+
+
+def iter_entries(
+    handle: TextIO, macros: Optional[Dict[str, str]] = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[str, BibEntry]]:
+    """Lazily yield ``(key, entry)`` pairs in file order.
+
+    Field values are flattened and whitespace-normalized like pybtex's, and
+    ``author``/``editor`` lists are split into :class:`BibPerson` objects.
+    Anything outside that subset raises :class:`BibSyntaxError`.
+    """
+    known_macros = dict(MONTH_MACROS)
+    known_macros.update({name.lower(): value for name, value in (macros or {}).items()})
+    seen_keys = set()
+
+    for entry_type, body in iter_entry_blocks(handle, chunk_size):
+        kind = entry_type.lower()
+        if kind in {"comment", "preamble"}:
+            continue
+
+        if kind == "string":
+            for name, value in _BodyParser(body, known_macros).fields():
+                known_macros[name.lower()] = value
+            continue
+
+        key, comma, rest = body.partition(",")
+        key = key.strip()
+        if not key or WHITESPACE.search(key):
+            raise BibSyntaxError(f"invalid key in @{entry_type} entry: {key!r}")
+        if key.lower() in seen_keys:
+            raise BibSyntaxError(f"repeated entry key: {key}")
+        seen_keys.add(key.lower())
+
+        entry = BibEntry(kind, key)
+        for name, value in _BodyParser(rest, known_macros).fields() if comma else ():
+            field = name.lower()
+            if field in entry.fields or field in entry.persons:
+                raise BibSyntaxError(f"repeated field {name!r} in entry {key}")
+            if field in PERSON_FIELDS:
+                names = split_tex_string(value, NAME_SEPARATOR)
+                entry.persons[field] = [BibPerson(name) for name in names]
+            else:
+                entry.fields[field] = value
+
+        yield key, entry
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import shlex
+import sys
+import time
+from typing import List, Sequence
+
+from sitegen.context import BuildContext
+from sitegen.instrumentation import add_instrumentation_args, run_instrumented
+
+STAGES = ("publications", "pubsFromBib", "talks", "talkmap")
+
+
+def stage_argv(args: argparse.Namespace, full_rebuild: bool = True) -> List[str]:
+    argv = ["--jobs", str(args.jobs)]
+    if args.dry_run:
+        argv.append("--dry-run")
+    if full_rebuild and args.full_rebuild:
+        argv.append("--full-rebuild")
+    if args.staged:
+        argv.append("--staged")
+    return argv
+
+
+def run_stage(stage: str, args: argparse.Namespace, context: BuildContext) -> int:
+    # Each pipeline is imported only when it runs, so pybtex and geopy load only when needed.
+    if stage == "publications":
+        from sitegen import publications
+
+        return publications.main(stage_argv(args), context)
+
+    if stage == "pubsFromBib":
+        from sitegen import pubs_from_bib
+
+        return pubs_from_bib.main(stage_argv(args, full_rebuild=False), context)
+
+    if stage == "talks":
+        from sitegen import talks
+
+        argv = stage_argv(args)
+        if "talkmap" in args.stages:
+            argv += ["--talkmap", f"--talkmap-args={args.talkmap_args}"]
+        return talks.main(argv, context)
+
+    if "talks" in args.stages:
+        # Already updated by the talks stage from the rows it rendered.
+        return 0
+    if args.dry_run:
+        print("talkmap: skipped in dry-run mode")
+        return 0
+
+    from sitegen import talkmap
+
+    return talkmap.main(shlex.split(args.talkmap_args), context)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run every content pipeline in one process, sharing output listings and manifests."
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=list(STAGES),
+        help="Pipelines to run, always in publications, pubsFromBib, talks, talkmap order (default: all).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate and render without writing files; the talk map is not updated.",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Re-render every TSV row instead of only rows that changed since the last run.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes and threads for the stages that support them.",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Swap each generated collection in with one rename instead of updating it file by file.",
+    )
+    parser.add_argument(
+        "--talkmap-args",
+        default="",
+        help="Extra talkmap.py options as one string (e.g. --talkmap-args='--skip-geocode').",
+    )
+    add_instrumentation_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1", file=sys.stderr)
+        return 1
+
+    context = BuildContext()
+    stages = [stage for stage in STAGES if stage in args.stages]
+
+    def run() -> int:
+        started = time.perf_counter()
+        for stage in stages:
+            with context.stats.pipeline(stage).phase("total"):
+                status = run_stage(stage, args, context)
+            if status != 0:
+                print(f"ERROR: build: {stage} failed with status {status}", file=sys.stderr)
+                return status
+
+        print(f"build: stages={','.join(stages)} seconds={time.perf_counter() - started:.2f}")
+        return 0
+
+    return run_instrumented(args, context.stats, "build", run)
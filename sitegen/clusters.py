@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import math
+import pathlib
+from typing import Collection, Dict, List, Sequence, Set, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+TILE_SIZE = 256
+DEFAULT_RADIUS = 80
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 16
+# Shards at zoom z are split along the tile grid of zoom z - SHARD_ZOOM_OFFSET,
+# so a typical viewport needs one to four shard files.
+SHARD_ZOOM_OFFSET = 2
+MAX_LATITUDE = 85.05112878
+COORDINATE_DIGITS = 6
+
+Cluster = Tuple[float, float, int, str]
+
+
+def project(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Project to Web Mercator coordinates in the unit square, as Leaflet does."""
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_latitude = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_latitude) / (1 - sin_latitude)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def _load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _cells_per_side(zoom: int, radius: int) -> int:
+    return math.ceil(TILE_SIZE * 2**zoom / radius)
+
+
+def _grid_clusters_python(
+    points: Sequence[Sequence], projected: List[Tuple[float, float]], zoom: int, radius: int
+) -> List[Cluster]:
+    side = _cells_per_side(zoom, radius)
+    groups: Dict[int, List[int]] = {}
+    for index, (x, y) in enumerate(projected):
+        cell = int(x * side) * side + int(y * side)
+        groups.setdefault(cell, []).append(index)
+
+    clusters: List[Cluster] = []
+    for cell in sorted(groups):
+        members = groups[cell]
+        latitude = sum(float(points[index][1]) for index in members) / len(members)
+        longitude = sum(float(points[index][2]) for index in members) / len(members)
+        label = str(points[members[0]][0]) if len(members) == 1 else ""
+        clusters.append((latitude, longitude, len(members), label))
+    return clusters
+
+
+def _grid_clusters_numpy(numpy, points: Sequence[Sequence], arrays, zoom: int, radius: int) -> List[Cluster]:
+    latitudes, longitudes, xs, ys = arrays
+    side = _cells_per_side(zoom, radius)
+    cells = (xs * side).astype(numpy.int64) * side + (ys * side).astype(numpy.int64)
+    unique_cells, first_index, inverse = numpy.unique(cells, return_index=True, return_inverse=True)
+    counts = numpy.bincount(inverse)
+    mean_latitudes = numpy.bincount(inverse, weights=latitudes) / counts
+    mean_longitudes = numpy.bincount(inverse, weights=longitudes) / counts
+
+    return [
+        (
+            float(mean_latitudes[group]),
+            float(mean_longitudes[group]),
+            int(counts[group]),
+            str(points[first_index[group]][0]) if counts[group] == 1 else "",
+        )
+        for group in range(len(unique_cells))
+    ]
+
+
+def cluster_points_by_zoom(
+    points: Sequence[Sequence],
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    radius: int = DEFAULT_RADIUS,
+) -> Dict[int, List[Cluster]]:
+    """Grid-cluster ``[location, latitude, longitude]`` points for every zoom level.
+
+    Cells are ``radius`` screen pixels wide, matching markercluster's
+    maxClusterRadius. NumPy is used when installed.
+    """
+    projected = [project(float(point[1]), float(point[2])) for point in points]
+    zooms = range(min_zoom, max_zoom + 1)
+
+    numpy = _load_numpy()
+    if numpy is None or not points:
+        return {zoom: _grid_clusters_python(points, projected, zoom, radius) for zoom in zooms}
+
+    arrays = (
+        numpy.array([float(point[1]) for point in points]),
+        numpy.array([float(point[2]) for point in points]),
+        numpy.array([x for x, _ in projected]),
+        numpy.array([y for _, y in projected]),
+    )
+    return {zoom: _grid_clusters_numpy(numpy, points, arrays, zoom, radius) for zoom in zooms}
+
+
+def build_cluster_shards(
+    clusters_by_zoom: Dict[int, List[Cluster]]
+) -> Tuple[Dict[str, List[list]], Dict[str, object]]:
+    shards: Dict[str, List[list]] = {}
+    tiles: Dict[str, Set[str]] = {}
+
+    for zoom, clusters in sorted(clusters_by_zoom.items()):
+        shard_zoom = max(zoom - SHARD_ZOOM_OFFSET, 0)
+        scale = 2**shard_zoom
+        for latitude, longitude, count, label in clusters:
+            x, y = project(latitude, longitude)
+            tile = f"{int(x * scale)}-{int(y * scale)}"
+            shards.setdefault(f"{zoom}/{tile}.json", []).append(
+                [round(latitude, COORDINATE_DIGITS), round(longitude, COORDINATE_DIGITS), count, label]
+            )
+            tiles.setdefault(str(zoom), set()).add(tile)
+
+    index = {
+        "minZoom": min(clusters_by_zoom) if clusters_by_zoom else 0,
+        "maxZoom": max(clusters_by_zoom) if clusters_by_zoom else 0,
+        "shardZoomOffset": SHARD_ZOOM_OFFSET,
+        "tiles": {zoom: sorted(zoom_tiles) for zoom, zoom_tiles in tiles.items()},
+    }
+    return shards, index
+
+
+def write_cluster_shards(
+    directory: pathlib.Path, shards: Dict[str, List[list]], index: Dict[str, object]
+) -> Tuple[int, int]:
+    """Write changed shard files plus ``index.json`` and delete shards that are no longer produced."""
+    files = {
+        name: json.dumps(content, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for name, content in shards.items()
+    }
+    files["index.json"] = json.dumps(index, ensure_ascii=False, separators=(",", ":"), sort_keys=True) + "\n"
+
+    written = 0
+    for name, content in files.items():
+        path = directory / name
+        if path.exists() and path.read_text(encoding="utf-8") == content:
+            continue
+        atomic_write_text(path, content)
+        written += 1
+
+    return written, _remove_shards(directory, keep=files)
+
+
+def _remove_shards(directory: pathlib.Path, keep: Collection[str] = ()) -> int:
+    removed = 0
+    if directory.exists():
+        for path in sorted(directory.glob("*/*.json")):
+            if path.relative_to(directory).as_posix() not in keep:
+                path.unlink()
+                removed += 1
+        for path in sorted(directory.iterdir()):
+            if path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+    return removed
+
+
+def remove_cluster_shards(directory: pathlib.Path) -> int:
+    """Delete ``index.json`` and every shard, so map.html falls back to org-locations.js."""
+    if not directory.exists():
+        return 0
+    (directory / "index.json").unlink(missing_ok=True)
+    removed = _remove_shards(directory)
+    if not any(directory.iterdir()):
+        directory.rmdir()
+    return removed
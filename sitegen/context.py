@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from typing import Dict, Set
+
+from sitegen.instrumentation import PipelineStats, Stats
+from sitegen.outputs import OutputManifest
+
+
+class BuildContext:
+    """State shared by the pipelines that run in one process.
+
+    ``python -m sitegen build`` and the watch mode hand one context to every
+    pipeline, so an output directory is listed once and its manifest is read
+    once however many generators write to it. Pipelines keep the listings up
+    to date as they write and remove files. ``stats`` collects the per-phase
+    timings and counters of every pipeline run with this context.
+    """
+
+    def __init__(self) -> None:
+        self.stats = Stats()
+        self._manifests: Dict[pathlib.Path, OutputManifest] = {}
+        self._listings: Dict[pathlib.Path, Set[str]] = {}
+
+    def manifest(self, directory: pathlib.Path) -> OutputManifest:
+        key = directory.resolve()
+        if key not in self._manifests:
+            self._manifests[key] = OutputManifest(directory)
+        return self._manifests[key]
+
+    def listing(self, directory: pathlib.Path) -> Set[str]:
+        """Names in ``directory``; the set is shared and callers update it in place."""
+        key = directory.resolve()
+        if key not in self._listings:
+            self._listings[key] = set(os.listdir(directory)) if directory.is_dir() else set()
+        return self._listings[key]
+
+    def forget(self, directory: pathlib.Path) -> None:
+        """Drop the manifest and listing of ``directory``, e.g. after it was replaced as a whole."""
+        key = directory.resolve()
+        self._manifests.pop(key, None)
+        self._listings.pop(key, None)
+
+    def forget_listings(self) -> None:
+        """Drop cached listings, e.g. before a watch cycle in which files may have changed by hand."""
+        self._listings.clear()
+
+
+def output_manifest(context: BuildContext | None, directory: pathlib.Path) -> OutputManifest:
+    return context.manifest(directory) if context else OutputManifest(directory)
+
+
+def directory_listing(context: BuildContext | None, directory: pathlib.Path) -> Set[str]:
+    if context:
+        return context.listing(directory)
+    return set(os.listdir(directory)) if directory.is_dir() else set()
+
+
+def pipeline_stats(context: BuildContext | None, pipeline: str) -> PipelineStats:
+    return (context.stats if context else Stats()).pipeline(pipeline)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import json
+import pathlib
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+PUBLICATION_COLUMNS = (
+    "pub_date", "title", "venue", "excerpt", "citation", "url_slug", "paper_url", "slides_url"
+)
+TALK_COLUMNS = ("title", "type", "url_slug", "venue", "date", "location", "talk_url", "description")
+TOPICS = ("Graphs", "Compilers", "Sensor Networks", "Protein Folding", "Climate Models", "Type Systems")
+TALK_TYPES = ("Talk", "Tutorial", "Keynote", "Poster")
+FIRST_NAMES = ("Ana", "Jean", "Mary Ann", "Ludwig", "Wei", "Olga", "Kwame", "Sofia")
+LAST_NAMES = ("Smith", "de la Cruz", "von Neumann", "Nakamura", "O'Neil", "Okafor", "Larsen", "Rossi")
+# Roughly one distinct venue location per this many talks, as on real sites.
+TALKS_PER_LOCATION = 10
+
+
+@dataclass(frozen=True)
+class Corpus:
+    directory: pathlib.Path
+    size: int
+    publications_tsv: pathlib.Path
+    talks_tsv: pathlib.Path
+    bib_file: pathlib.Path
+    talks_dir: pathlib.Path
+    geocode_cache: pathlib.Path
+    locations: List[str]
+
+
+def synthetic_date(rng: random.Random) -> str:
+    return (dt.date(2000, 1, 1) + dt.timedelta(days=rng.randrange(25 * 365))).isoformat()
+
+
+def location_names(count: int) -> List[str]:
+    count = max(1, count // TALKS_PER_LOCATION)
+    return [f"Synthetic City {index}, Country {index % 50}" for index in range(count)]
+
+
+def publication_rows(count: int, rng: random.Random) -> List[Dict[str, str]]:
+    rows = []
+    for index in range(count):
+        title = f"Synthetic Publication {index} on {rng.choice(TOPICS)}"
+        journal = f"Journal of {rng.choice(TOPICS)}"
+        rows.append(
+            {
+                "pub_date": synthetic_date(rng),
+                "title": title,
+                "venue": journal,
+                "excerpt": f"This paper is about item {index}.",
+                "citation": f'Author, A. ({2000 + index % 25}). "{title}." <i>{journal}</i>. {index % 40}.',
+                "url_slug": f"synthetic-publication-{index}",
+                "paper_url": f"https://example.org/papers/{index}.pdf" if index % 2 else "",
+                "slides_url": f"https://example.org/slides/{index}.pdf" if index % 3 == 0 else "",
+            }
+        )
+    return rows
+
+
+def talk_rows(count: int, locations: Sequence[str], rng: random.Random) -> List[Dict[str, str]]:
+    rows = []
+    for index in range(count):
+        rows.append(
+            {
+                "title": f"Synthetic Talk {index} on {rng.choice(TOPICS)}",
+                "type": rng.choice(TALK_TYPES),
+                "url_slug": f"synthetic-talk-{index}",
+                "venue": f"Institute {index % 97}",
+                "date": synthetic_date(rng),
+                "location": rng.choice(locations),
+                "talk_url": f"https://example.org/talks/{index}" if index % 2 else "",
+                "description": f"A synthetic talk, number {index}.",
+            }
+        )
+    return rows
+
+
+def write_tsv(path: pathlib.Path, columns: Sequence[str], rows: Sequence[Dict[str, str]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(columns), delimiter="\t", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_bib(path: pathlib.Path, count: int, rng: random.Random) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        for index in range(count):
+            authors = " and ".join(
+                f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}" for _ in range(rng.randint(1, 5))
+            )
+            doi = f"  doi = {{10.5555/synthetic.{index}}},\n" if index % 2 else ""
+            handle.write(
+                f"@article{{synthetic{index},\n"
+                f"  title = {{Synthetic {{BibTeX}} Entry {index} on {rng.choice(TOPICS)}}},\n"
+                f"  author = {{{authors}}},\n"
+                f"  journal = {{Journal of {rng.choice(TOPICS)}}},\n"
+                f"  year = {{{2000 + index % 25}}},\n"
+                f"  month = {rng.choice(('jan', 'apr', 'jul', 'oct'))},\n"
+                f"{doi}"
+                f"  url = {{https://example.org/bib/{index}}}\n"
+                "}\n\n"
+            )
+
+
+def write_talk_files(directory: pathlib.Path, rows: Sequence[Dict[str, str]]) -> None:
+    from sitegen.talks import render_markdown
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for row in rows:
+        filename, markdown = render_markdown(row)
+        (directory / filename).write_text(markdown, encoding="utf-8")
+
+
+def write_geocode_cache(path: pathlib.Path, locations: Sequence[str], rng: random.Random) -> None:
+    cache = {
+        location: {"latitude": round(rng.uniform(-60, 70), 6), "longitude": round(rng.uniform(-180, 180), 6)}
+        for location in locations
+    }
+    path.write_text(json.dumps(cache, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def build_corpus(directory: pathlib.Path, size: int, seed: int = 0) -> Corpus:
+    """Write ``size`` publications, talks, BibTeX entries and talk pages, plus a geocode cache for them."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    locations = location_names(size)
+    corpus = Corpus(
+        directory=directory,
+        size=size,
+        publications_tsv=directory / "publications.tsv",
+        talks_tsv=directory / "talks.tsv",
+        bib_file=directory / "publications.bib",
+        talks_dir=directory / "talk-pages",
+        geocode_cache=directory / "geocode-cache.json",
+        locations=locations,
+    )
+
+    write_tsv(corpus.publications_tsv, PUBLICATION_COLUMNS, publication_rows(size, rng))
+    talks = talk_rows(size, locations, rng)
+    write_tsv(corpus.talks_tsv, TALK_COLUMNS, talks)
+    write_talk_files(corpus.talks_dir, talks)
+    write_bib(corpus.bib_file, size, rng)
+    write_geocode_cache(corpus.geocode_cache, locations, rng)
+    return corpus
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write a synthetic corpus for benchmarking the generators.")
+    parser.add_argument("--output-dir", required=True, help="Directory to write the corpus into.")
+    parser.add_argument("--size", type=int, default=1000, help="Number of items of each kind.")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed; the same seed gives the same corpus."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.size < 1:
+        print("ERROR: --size must be at least 1", file=sys.stderr)
+        return 1
+
+    corpus = build_corpus(pathlib.Path(args.output_dir), args.size, args.seed)
+    print(f"corpus: size={corpus.size} locations={len(corpus.locations)} directory={corpus.directory}")
+    return 0
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+DEDUP_INDEX_NAME = ".dedup-index.json"
+DEDUP_INDEX_VERSION = 1
+# Shorter titles ("Introduction", "Erratum") are too generic to identify a paper.
+MIN_TITLE_WORDS = 3
+
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s\"<>]+)")
+ARXIV_PATTERN = re.compile(
+    r"arxiv(?:\.org/(?:abs|pdf)/|:\s*)([a-z-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?",
+    re.IGNORECASE,
+)
+BARE_ARXIV_PATTERN = re.compile(
+    r"^\s*([a-z-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?\s*$", re.IGNORECASE
+)
+TITLE_WORD = re.compile(r"[a-z0-9]+")
+
+Claim = Dict[str, object]
+
+
+def find_doi(*texts: str) -> str:
+    """First DOI in ``texts`` (a bare DOI, ``doi:...`` or a doi.org URL), lower-cased."""
+    for text in texts:
+        match = DOI_PATTERN.search(text or "")
+        if match:
+            return match.group(1).rstrip(".,;").lower()
+    return ""
+
+
+def find_arxiv_id(*texts: str, bare: str = "") -> str:
+    """arXiv identifier without version from ``arXiv:...`` or arxiv.org URLs, or from a bare eprint id."""
+    match = BARE_ARXIV_PATTERN.match(bare or "")
+    if match:
+        return match.group(1).lower()
+    for text in texts:
+        match = ARXIV_PATTERN.search(text or "")
+        if match:
+            return match.group(1).lower()
+    return ""
+
+
+def title_fingerprint(title: str) -> str:
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(character for character in text if not unicodedata.combining(character)).lower()
+    words = TITLE_WORD.findall(text)
+    if len(words) < MIN_TITLE_WORDS:
+        return ""
+    return hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def identity_keys(doi: str = "", arxiv_id: str = "", title: str = "") -> List[str]:
+    """Dedup keys for one publication, strongest identifier first."""
+    keys = []
+    if doi:
+        keys.append(f"doi:{doi}")
+    if arxiv_id:
+        keys.append(f"arxiv:{arxiv_id}")
+    fingerprint = title_fingerprint(title)
+    if fingerprint:
+        keys.append(f"title:{fingerprint}")
+    return keys
+
+
+def describe_claim(claim: Claim) -> str:
+    return f"source={claim.get('source')} id={claim.get('id')}"
+
+
+class DedupIndex:
+    """Which record owns each DOI, arXiv id and title fingerprint across every publication generator.
+
+    Claims carry a priority; a record is a duplicate when a key it shares is
+    already held by a claim with the same or a better (lower) priority, so
+    earlier records win ties. A generator releases the claims of the sources
+    it is about to regenerate and re-claims them as it goes; claims of other
+    generators and sources persist between runs.
+    """
+
+    def __init__(self, path: pathlib.Path, generator: str) -> None:
+        self.path = path
+        self.generator = generator
+        self.claims: Dict[str, Claim] = {}
+        self.matches: List[Dict[str, str]] = []
+        self.released_files: Set[str] = set()
+        self._saved: Dict[str, Claim] = {}
+
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == DEDUP_INDEX_VERSION:
+            self.claims = dict(payload.get("claims", {}))
+            self._saved = {key: dict(claim) for key, claim in self.claims.items()}
+
+    def release(self, sources: Iterable[str]) -> None:
+        """Drop this generator's claims for ``sources``, remembering the files they produced."""
+        sources = set(sources)
+        for key, claim in list(self.claims.items()):
+            if claim.get("generator") == self.generator and claim.get("source") in sources:
+                self.released_files.add(str(claim.get("file", "")))
+                del self.claims[key]
+
+    def resolve(
+        self, keys: Iterable[str], source: str, record_id: str, priority: int
+    ) -> Tuple[Claim, Optional[str]]:
+        """Claim ``keys`` for a record.
+
+        Returns ``(new claim, None)``, or ``(winning claim, matched key)`` when
+        the record duplicates one that is already claimed.
+        """
+        keys = list(keys)
+        for key in keys:
+            existing = self.claims.get(key)
+            if existing is not None and int(existing.get("priority", 0)) <= priority:
+                dropped = f"source={source} id={record_id}"
+                self.matches.append({"key": key, "kept": describe_claim(existing), "dropped": dropped})
+                return existing, key
+
+        claim: Claim = {
+            "generator": self.generator,
+            "source": source,
+            "id": record_id,
+            "file": "",
+            "priority": priority,
+        }
+        for key in keys:
+            displaced = self.claims.get(key)
+            if displaced is not None and displaced.get("generator") != self.generator:
+                self.matches.append(
+                    {"key": key, "kept": describe_claim(claim), "dropped": describe_claim(displaced)}
+                )
+                # The other generator's page stays until that generator runs again; parking
+                # the claim under a key nothing looks up lets that run release and remove it.
+                owner = (displaced.get("generator"), displaced.get("source"), displaced.get("id"))
+                self.claims["displaced:{}:{}:{}".format(*owner)] = displaced
+            self.claims[key] = claim
+        return claim, None
+
+    def withdraw(self, claim: Claim) -> None:
+        """Forget a claim whose record turned out not to produce a page."""
+        for key in [key for key, held in self.claims.items() if held is claim]:
+            del self.claims[key]
+
+    def stale_files(self, produced: Set[str]) -> List[str]:
+        """Files this generator released that no record, of any generator, produces now."""
+        claimed = {str(claim.get("file", "")) for claim in self.claims.values()}
+        candidates = self.released_files - produced - claimed
+        return sorted(name for name in candidates if name)
+
+    def save(self) -> None:
+        if self.claims == self._saved:
+            return
+        payload = {"version": DEDUP_INDEX_VERSION, "claims": self.claims}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, sort_keys=True) + "\n")
+        self._saved = {key: dict(claim) for key, claim in self.claims.items()}
+
+    def write_report(self, path: pathlib.Path) -> None:
+        """Write every match of this run as JSON: the key, the record kept and the record dropped."""
+        payload = {"generator": self.generator, "matches": self.matches}
+        atomic_write_text(path, json.dumps(payload, ensure_ascii=False, indent=2) + "\n")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import functools
+import os
+import pathlib
+import shutil
+import stat
+import sys
+import tempfile
+from typing import Optional
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+@functools.lru_cache(maxsize=None)
+def process_umask() -> int:
+    """The umask, read without changing it: ``os.umask`` can only swap it, which races other threads."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # Without /proc, see which permission bits the umask strips from a new file.
+    probe_dir = tempfile.mkdtemp(prefix=".sitegen-umask-")
+    try:
+        fd = os.open(os.path.join(probe_dir, "probe"), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o777)
+        try:
+            return 0o777 & ~stat.S_IMODE(os.fstat(fd).st_mode)
+        finally:
+            os.close(fd)
+    finally:
+        shutil.rmtree(probe_dir, ignore_errors=True)
+
+
+def default_mode(path: pathlib.Path, base: int = 0o666) -> int:
+    """Mode of the existing ``path``, or what a plain ``open``/``mkdir`` would create under the umask.
+
+    mkstemp creates files readable by the owner only; renamed outputs get this mode instead.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return base & ~process_umask()
+
+
+def atomic_write_bytes(path: pathlib.Path, data: bytes) -> None:
+    """Write ``data`` to a sibling temp file and rename it over ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = default_mode(path)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            os.fchmod(handle.fileno(), mode)
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: pathlib.Path, content: str) -> None:
+    atomic_write_bytes(path, content.encode("utf-8"))
+
+
+def exchange_paths(first: pathlib.Path, second: pathlib.Path) -> bool:
+    """Swap two existing paths with one ``renameat2(RENAME_EXCHANGE)``; False where that is unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not hasattr(libc, "renameat2"):
+        return False
+
+    result = libc.renameat2(
+        AT_FDCWD, os.fsencode(str(first)), AT_FDCWD, os.fsencode(str(second)), RENAME_EXCHANGE
+    )
+    if result == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in {errno.ENOSYS, errno.EINVAL, errno.ENOTSUP}:
+        return False
+    raise OSError(error, os.strerror(error), str(first))
+
+
+def replace_directory(staged: pathlib.Path, target: pathlib.Path) -> Optional[pathlib.Path]:
+    """Move ``staged`` to ``target``, returning where the previous ``target`` now lives, if anywhere.
+
+    On Linux the two directories are exchanged atomically. Elsewhere the old
+    directory is renamed aside first, so ``target`` is briefly missing.
+    """
+    if not target.exists():
+        os.rename(staged, target)
+        return None
+    if exchange_paths(staged, target):
+        return staged
+
+    backup = pathlib.Path(tempfile.mkdtemp(prefix=f".{target.name}.old-", dir=target.parent))
+    os.rmdir(backup)
+    os.rename(target, backup)
+    os.rename(staged, target)
+    return backup
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import pathlib
+import re
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+DELIMITER = "---"
+MAX_FRONT_MATTER_BYTES = 1024 * 1024
+
+KEY_PATTERN = re.compile(r"^([A-Za-z0-9_][^:#]*?)\s*:(?:\s+|$)(.*)$")
+
+
+def decode_text(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("utf-8", errors="ignore")
+
+
+def closing_quote_index(text: str, quote: str) -> int:
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote == '"' and char == "\\":
+            index += 2
+            continue
+        if char == quote:
+            if quote == "'" and text[index + 1 : index + 2] == "'":
+                index += 2
+                continue
+            return index
+        index += 1
+    return -1
+
+
+def unquote(value: str, quote: str) -> str:
+    if quote == "'":
+        return value.replace("''", "'")
+
+    unescaped = []
+    index = 0
+    while index < len(value):
+        char = value[index]
+        if char == "\\" and index + 1 < len(value):
+            following = value[index + 1]
+            unescaped.append({"n": "\n", "t": "\t"}.get(following, following))
+            index += 2
+            continue
+        unescaped.append(char)
+        index += 1
+    return "".join(unescaped)
+
+
+def open_quote_after(line: str, quote: Optional[str]) -> Optional[str]:
+    """Return the quote still open at the end of ``line``, given the one open before it."""
+    if quote is not None:
+        end = closing_quote_index(line, quote)
+        return quote if end < 0 else None
+
+    match = KEY_PATTERN.match(line)
+    if not match:
+        return None
+
+    value = match.group(2).lstrip()
+    if not value or value[0] not in {'"', "'"}:
+        return None
+
+    return value[0] if closing_quote_index(value[1:], value[0]) < 0 else None
+
+
+def read_front_matter_lines(handle: BinaryIO, limit: int = MAX_FRONT_MATTER_BYTES) -> Optional[List[bytes]]:
+    """Read header lines up to the closing delimiter, leaving the body unread.
+
+    A ``---`` line inside a quoted value does not close the block. If that quote
+    is never closed, the block ends at the first such line instead, as if the
+    value had not been quoted. Returns None when the stream has no complete
+    front matter block within ``limit`` bytes.
+    """
+    first_line = handle.readline(limit)
+    if first_line.lstrip(b"\xef\xbb\xbf").rstrip() != DELIMITER.encode():
+        return None
+
+    lines: List[bytes] = []
+    consumed = len(first_line)
+    quote: Optional[str] = None
+    unquoted_end: Optional[int] = None
+
+    while consumed < limit:
+        raw_line = handle.readline(limit - consumed)
+        if not raw_line:
+            break
+
+        consumed += len(raw_line)
+        line = decode_text(raw_line).rstrip("\r\n")
+
+        if line.rstrip() == DELIMITER:
+            if quote is None:
+                return lines
+            if unquoted_end is None:
+                unquoted_end = len(lines)
+
+        quote = open_quote_after(line, quote)
+        lines.append(raw_line)
+
+    return lines[:unquoted_end] if unquoted_end is not None else None
+
+
+def parse_front_matter(lines: Iterable[str]) -> Dict[str, str]:
+    """Parse top-level ``key: value`` pairs; nested mappings and lists are skipped.
+
+    A quoted value that is never closed is kept as written, and the lines after
+    it are read as keys again.
+    """
+    lines = [line.rstrip("\r\n") for line in lines]
+    fields: Dict[str, str] = {}
+    position = 0
+
+    while position < len(lines):
+        match = KEY_PATTERN.match(lines[position])
+        position += 1
+        if not match:
+            continue
+
+        key = match.group(1).strip()
+        value = match.group(2).strip()
+
+        if value and value[0] in {'"', "'"}:
+            quote = value[0]
+            end = closing_quote_index(value[1:], quote)
+            if end >= 0:
+                fields[key] = unquote(value[1 : end + 1], quote)
+                continue
+
+            parts = [value[1:].strip()]
+            for following in range(position, len(lines)):
+                end = closing_quote_index(lines[following], quote)
+                parts.append(lines[following].strip() if end < 0 else lines[following][:end].strip())
+                if end >= 0:
+                    fields[key] = unquote(" ".join(part for part in parts if part), quote)
+                    position = following + 1
+                    break
+            else:
+                fields[key] = value
+            continue
+
+        if " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        fields[key] = value
+
+    return fields
+
+
+def read_front_matter(path: pathlib.Path) -> Dict[str, str]:
+    with path.open("rb") as handle:
+        lines = read_front_matter_lines(handle)
+
+    if lines is None:
+        return {}
+
+    return parse_front_matter(decode_text(line) for line in lines)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import array
+import bisect
+import csv
+import mmap
+import pathlib
+import struct
+import sys
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from sitegen.fileio import atomic_write_bytes
+from sitegen.geocoding import Coordinates
+from sitegen.locations import location_key
+
+# Column positions in a GeoNames dump (allCountries.txt, cities15000.txt, ...).
+NAME_COLUMN = 1
+ASCII_NAME_COLUMN = 2
+ALTERNATE_NAMES_COLUMN = 3
+LATITUDE_COLUMN = 4
+LONGITUDE_COLUMN = 5
+COUNTRY_COLUMN = 8
+ADMIN1_COLUMN = 10
+POPULATION_COLUMN = 14
+
+INDEX_MAGIC = b"SGGAZIDX"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+PREFIX_CANDIDATE_LIMIT = 64
+
+COUNTRY_ALIASES = {
+    "usa": "us",
+    "america": "us",
+    "uk": "gb",
+    "england": "gb",
+    "scotland": "gb",
+    "wales": "gb",
+}
+
+
+class StringTable:
+    """Strings packed into one UTF-8 blob with an offsets array."""
+
+    def __init__(self, blob: Sequence[int], offsets: array.array) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, values: Iterable[str]) -> "StringTable":
+        offsets = array.array("Q", [0])
+        chunks = []
+        for value in values:
+            encoded = value.encode("utf-8")
+            chunks.append(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+        return cls(b"".join(chunks), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, index: int) -> bytes:
+        return bytes(self.blob[self.offsets[index] : self.offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        return self.raw(index).decode("utf-8")
+
+
+class _RawKeys:
+    """Sequence view used to bisect the sorted key table without decoding it."""
+
+    def __init__(self, table: StringTable) -> None:
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.table.raw(index)
+
+
+class GazetteerIndex:
+    """Array-backed gazetteer with a sorted name-key table for exact and prefix lookups."""
+
+    def __init__(
+        self,
+        latitudes: array.array,
+        longitudes: array.array,
+        populations: array.array,
+        countries: StringTable,
+        admin1_codes: StringTable,
+        keys: StringTable,
+        key_records: array.array,
+        backing: Optional[mmap.mmap] = None,
+    ) -> None:
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.populations = populations
+        self.countries = countries
+        self.admin1_codes = admin1_codes
+        self.keys = keys
+        self.key_records = key_records
+        self._raw_keys = _RawKeys(keys)
+        self._backing = backing
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Sequence[str]], include_alternate_names: bool = True
+    ) -> "GazetteerIndex":
+        latitudes = array.array("d")
+        longitudes = array.array("d")
+        populations = array.array("q")
+        countries: List[str] = []
+        admin1_codes: List[str] = []
+        key_pairs: List[Tuple[bytes, int]] = []
+
+        for row in rows:
+            if len(row) <= LONGITUDE_COLUMN:
+                continue
+
+            try:
+                latitude = float(row[LATITUDE_COLUMN])
+                longitude = float(row[LONGITUDE_COLUMN])
+            except ValueError:
+                continue
+
+            names: Set[str] = {row[NAME_COLUMN], row[ASCII_NAME_COLUMN]}
+            if include_alternate_names and row[ALTERNATE_NAMES_COLUMN]:
+                names.update(row[ALTERNATE_NAMES_COLUMN].split(","))
+
+            record = len(latitudes)
+            for key in {location_key(name) for name in names}:
+                if key:
+                    key_pairs.append((key.encode("utf-8"), record))
+
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            populations.append(_int_column(row, POPULATION_COLUMN))
+            countries.append(_column(row, COUNTRY_COLUMN).lower())
+            admin1_codes.append(_column(row, ADMIN1_COLUMN).lower())
+
+        key_pairs.sort()
+        return cls(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            populations=populations,
+            countries=StringTable.build(countries),
+            admin1_codes=StringTable.build(admin1_codes),
+            keys=StringTable.build(key.decode("utf-8") for key, _ in key_pairs),
+            key_records=array.array("Q", (record for _, record in key_pairs)),
+        )
+
+    @classmethod
+    def from_tsv(cls, path: pathlib.Path, include_alternate_names: bool = True) -> "GazetteerIndex":
+        csv.field_size_limit(sys.maxsize)
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            reader = csv.reader(handle, delimiter="\t", quoting=csv.QUOTE_NONE)
+            return cls.from_rows(
+                (row for row in reader if row and not row[0].startswith("#")),
+                include_alternate_names=include_alternate_names,
+            )
+
+    def _sections(self) -> List[array.array | bytes]:
+        return [
+            self.latitudes,
+            self.longitudes,
+            self.populations,
+            bytes(self.countries.blob),
+            self.countries.offsets,
+            bytes(self.admin1_codes.blob),
+            self.admin1_codes.offsets,
+            bytes(self.keys.blob),
+            self.keys.offsets,
+            self.key_records,
+        ]
+
+    def save(self, path: pathlib.Path) -> None:
+        sections = self._sections()
+        chunks = [struct.pack("<8sIBI", INDEX_MAGIC, INDEX_VERSION, sys.byteorder == "little", len(sections))]
+        for section in sections:
+            typecode = section.typecode if isinstance(section, array.array) else "B"
+            data = section.tobytes() if isinstance(section, array.array) else section
+            chunks.append(struct.pack("<cQ", typecode.encode("ascii"), len(data)))
+            chunks.append(data)
+        atomic_write_bytes(path, b"".join(chunks))
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "GazetteerIndex":
+        with path.open("rb") as handle:
+            backing = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(backing)
+        header = struct.calcsize("<8sIBI")
+        magic, version, little_endian, section_count = struct.unpack_from("<8sIBI", view, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"not a gazetteer index (version {INDEX_VERSION}): {path}")
+
+        swap = bool(little_endian) != (sys.byteorder == "little")
+        position = header
+        sections: List[array.array | memoryview] = []
+        for _ in range(section_count):
+            typecode, length = struct.unpack_from("<cQ", view, position)
+            position += struct.calcsize("<cQ")
+            data = view[position : position + length]
+            position += length
+
+            if typecode == b"B":
+                sections.append(data)
+                continue
+
+            values = array.array(typecode.decode("ascii"))
+            values.frombytes(data)
+            if swap:
+                values.byteswap()
+            sections.append(values)
+
+        (
+            latitudes,
+            longitudes,
+            populations,
+            country_blob,
+            country_offsets,
+            admin1_blob,
+            admin1_offsets,
+            key_blob,
+            key_offsets,
+            key_records,
+        ) = sections
+        return cls(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            populations=populations,
+            countries=StringTable(country_blob, country_offsets),
+            admin1_codes=StringTable(admin1_blob, admin1_offsets),
+            keys=StringTable(key_blob, key_offsets),
+            key_records=key_records,
+            backing=backing,
+        )
+
+    def lookup(self, key: str) -> List[int]:
+        encoded = key.encode("utf-8")
+        start = bisect.bisect_left(self._raw_keys, encoded)
+        records = []
+        while start < len(self.keys) and self.keys.raw(start) == encoded:
+            records.append(self.key_records[start])
+            start += 1
+        return records
+
+    def prefix(self, key: str, limit: int = PREFIX_CANDIDATE_LIMIT) -> List[int]:
+        encoded = key.encode("utf-8")
+        start = bisect.bisect_left(self._raw_keys, encoded)
+        records = []
+        while start < len(self.keys) and len(records) < limit and self.keys.raw(start).startswith(encoded):
+            records.append(self.key_records[start])
+            start += 1
+        return records
+
+    def _best(self, records: Iterable[int], context: Set[str]) -> int:
+        def rank(record: int) -> Tuple[int, int]:
+            matches = (self.countries[record] in context) + (self.admin1_codes[record] in context)
+            return matches, self.populations[record]
+
+        return max(records, key=rank)
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        parts = [key for key in (location_key(part) for part in query.split(",")) if key]
+        if not parts:
+            return None
+
+        context = set(" ".join(parts[1:]).split())
+        context.update(COUNTRY_ALIASES[token] for token in list(context) if token in COUNTRY_ALIASES)
+
+        head = parts[0].split()
+        # "Berkeley CA" has no exact entry; fall back to "Berkeley" with "ca" as context.
+        for end in range(len(head), 0, -1):
+            records = self.lookup(" ".join(head[:end]))
+            if records:
+                best = self._best(records, context | set(head[end:]))
+                return self.latitudes[best], self.longitudes[best]
+
+        records = self.prefix(parts[0])
+        if records:
+            best = self._best(records, context)
+            return self.latitudes[best], self.longitudes[best]
+
+        return None
+
+
+def _column(row: Sequence[str], column: int) -> str:
+    return row[column].strip() if len(row) > column else ""
+
+
+def _int_column(row: Sequence[str], column: int) -> int:
+    try:
+        return int(_column(row, column) or 0)
+    except ValueError:
+        return 0
+
+
+def load_gazetteer(path: pathlib.Path) -> GazetteerIndex:
+    """Load a prebuilt index, or build one from a GeoNames TSV and save it beside the TSV."""
+    if path.suffix == INDEX_SUFFIX:
+        return GazetteerIndex.load(path)
+
+    index_path = path.with_name(path.name + INDEX_SUFFIX)
+    if index_path.exists() and index_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        try:
+            return GazetteerIndex.load(index_path)
+        except (ValueError, struct.error):
+            pass
+
+    index = GazetteerIndex.from_tsv(path)
+    index.save(index_path)
+    return GazetteerIndex.load(index_path)
+
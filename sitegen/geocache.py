@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import abc
+import json
+import pathlib
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+CacheEntries = Dict[str, Dict[str, float]]
+FailureEntries = Dict[str, Dict[str, object]]
+
+SQLITE_VARIABLE_LIMIT = 500
+MAX_FAILURE_BACKOFF_SECONDS = 60 * 60 * 24 * 90
+
+
+def load_json_cache(path: pathlib.Path) -> CacheEntries:
+    if not path.exists():
+        return {}
+
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_json_cache(path: pathlib.Path, cache: CacheEntries) -> None:
+    serialized = json.dumps(cache, ensure_ascii=False, indent=2, sort_keys=True)
+    atomic_write_text(path, serialized + "\n")
+
+
+def has_coordinates(entry: object) -> bool:
+    return isinstance(entry, dict) and "latitude" in entry and "longitude" in entry
+
+
+def failure_retry_at(entry: Dict[str, object], base_backoff: float) -> float:
+    attempts = max(int(entry.get("attempts", 1)), 1)
+    backoff = min(base_backoff * 2 ** (attempts - 1), MAX_FAILURE_BACKOFF_SECONDS)
+    return float(entry.get("failed_at", 0.0)) + backoff
+
+
+def record_failure(previous: Dict[str, object] | None, now: float) -> Dict[str, object]:
+    attempts = int(previous.get("attempts", 0)) if previous else 0
+    return {"failed_at": now, "attempts": attempts + 1}
+
+
+class GeocodeCacheStore(abc.ABC):
+    """Interface shared by the geocode cache backends; a backend missing a method cannot be created."""
+
+    @abc.abstractmethod
+    def is_empty(self) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def get_many(self, locations: Iterable[str]) -> CacheEntries:
+        ...
+
+    @abc.abstractmethod
+    def upsert_many(self, entries: CacheEntries) -> int:
+        ...
+
+    @abc.abstractmethod
+    def insert_missing(self, entries: CacheEntries) -> int:
+        ...
+
+    @abc.abstractmethod
+    def items(self) -> Iterator[Tuple[str, Dict[str, float]]]:
+        ...
+
+    @abc.abstractmethod
+    def get_failures(self, locations: Iterable[str]) -> FailureEntries:
+        ...
+
+    @abc.abstractmethod
+    def record_failures(self, entries: FailureEntries) -> None:
+        ...
+
+    @abc.abstractmethod
+    def clear_failures(self, locations: Iterable[str]) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def get(self, location: str) -> Dict[str, float] | None:
+        return self.get_many([location]).get(location)
+
+    def __enter__(self) -> "GeocodeCacheStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class JsonCacheStore(GeocodeCacheStore):
+    """The diff-friendly ``geocode-cache.json`` file, rewritten only when it changed.
+
+    Failed lookups live in a separate ``failures_path`` file so the cache itself
+    only ever holds coordinates.
+    """
+
+    def __init__(self, path: pathlib.Path, failures_path: pathlib.Path | None = None) -> None:
+        self.path = path
+        self.failures_path = failures_path
+        self._entries = load_json_cache(path)
+        self._failures: FailureEntries = load_json_cache(failures_path) if failures_path else {}
+        self._dirty = False
+        self._failures_dirty = False
+
+    def is_empty(self) -> bool:
+        return not self._entries
+
+    def get_many(self, locations: Iterable[str]) -> CacheEntries:
+        return {location: self._entries[location] for location in locations if location in self._entries}
+
+    def upsert_many(self, entries: CacheEntries) -> int:
+        changed = 0
+        for location, coordinates in entries.items():
+            if self._entries.get(location) != coordinates:
+                self._entries[location] = coordinates
+                changed += 1
+        self._dirty = self._dirty or changed > 0
+        return changed
+
+    def insert_missing(self, entries: CacheEntries) -> int:
+        missing = {
+            location: coordinates
+            for location, coordinates in entries.items()
+            if location not in self._entries
+        }
+        return self.upsert_many(missing)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, float]]]:
+        return iter(sorted(self._entries.items()))
+
+    def get_failures(self, locations: Iterable[str]) -> FailureEntries:
+        return {location: self._failures[location] for location in locations if location in self._failures}
+
+    def record_failures(self, entries: FailureEntries) -> None:
+        self._failures.update(entries)
+        self._failures_dirty = self._failures_dirty or bool(entries)
+
+    def clear_failures(self, locations: Iterable[str]) -> None:
+        for location in locations:
+            if self._failures.pop(location, None) is not None:
+                self._failures_dirty = True
+
+    def flush(self) -> None:
+        if self._dirty or not self.path.exists():
+            save_json_cache(self.path, self._entries)
+            self._dirty = False
+
+        if self.failures_path and self._failures_dirty:
+            save_json_cache(self.failures_path, self._failures)
+            self._failures_dirty = False
+
+
+class SqliteCacheStore(GeocodeCacheStore):
+    """Row-level geocode cache in a WAL-mode SQLite database."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "location TEXT PRIMARY KEY, "
+            "latitude REAL NOT NULL, "
+            "longitude REAL NOT NULL, "
+            "updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS geocode_failure ("
+            "location TEXT PRIMARY KEY, "
+            "failed_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def is_empty(self) -> bool:
+        return self._connection.execute("SELECT 1 FROM geocode LIMIT 1").fetchone() is None
+
+    def get_many(self, locations: Iterable[str]) -> CacheEntries:
+        found: CacheEntries = {}
+        for chunk in _chunks(list(locations), SQLITE_VARIABLE_LIMIT):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT location, latitude, longitude FROM geocode WHERE location IN ({placeholders})",
+                chunk,
+            )
+            for location, latitude, longitude in rows:
+                found[location] = {"latitude": latitude, "longitude": longitude}
+        return found
+
+    def _write(self, statement: str, entries: CacheEntries) -> int:
+        now = time.time()
+        rows = [
+            (location, float(coordinates["latitude"]), float(coordinates["longitude"]), now)
+            for location, coordinates in entries.items()
+            if has_coordinates(coordinates)
+        ]
+        if not rows:
+            return 0
+
+        with self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(statement, rows)
+            return self._connection.total_changes - before
+
+    def upsert_many(self, entries: CacheEntries) -> int:
+        return self._write(
+            "INSERT INTO geocode (location, latitude, longitude, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(location) DO UPDATE SET "
+            "latitude = excluded.latitude, longitude = excluded.longitude, updated_at = excluded.updated_at "
+            "WHERE latitude != excluded.latitude OR longitude != excluded.longitude",
+            entries,
+        )
+
+    def insert_missing(self, entries: CacheEntries) -> int:
+        return self._write(
+            "INSERT OR IGNORE INTO geocode (location, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+            entries,
+        )
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, float]]]:
+        rows = self._connection.execute("SELECT location, latitude, longitude FROM geocode ORDER BY location")
+        for location, latitude, longitude in rows:
+            yield location, {"latitude": latitude, "longitude": longitude}
+
+    def get_failures(self, locations: Iterable[str]) -> FailureEntries:
+        found: FailureEntries = {}
+        for chunk in _chunks(list(locations), SQLITE_VARIABLE_LIMIT):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(
+                "SELECT location, failed_at, attempts FROM geocode_failure "
+                f"WHERE location IN ({placeholders})",
+                chunk,
+            )
+            for location, failed_at, attempts in rows:
+                found[location] = {"failed_at": failed_at, "attempts": attempts}
+        return found
+
+    def record_failures(self, entries: FailureEntries) -> None:
+        rows = [
+            (location, float(entry["failed_at"]), int(entry["attempts"]))
+            for location, entry in entries.items()
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO geocode_failure (location, failed_at, attempts) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def clear_failures(self, locations: Iterable[str]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM geocode_failure WHERE location = ?",
+                [(location,) for location in locations],
+            )
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def open_cache_store(
+    backend: str, path: pathlib.Path, failures_path: pathlib.Path | None = None
+) -> GeocodeCacheStore:
+    if backend == "sqlite":
+        return SqliteCacheStore(path)
+    if backend == "json":
+        return JsonCacheStore(path, failures_path)
+    raise ValueError(f"unknown cache backend: {backend}")
+
+
+def export_json_cache(store: GeocodeCacheStore, path: pathlib.Path) -> int:
+    entries = dict(store.items())
+    save_json_cache(path, entries)
+    return len(entries)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+Coordinates = Tuple[float, float]
+GeocodeFunction = Callable[[str], Optional[Coordinates]]
+
+DEFAULT_TIMEOUT = 10
+# Same defaults as geopy's RateLimiter, which the sequential lookups used before.
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_WAIT = 5.0
+
+
+class TransientGeocodeError(Exception):
+    """A lookup failure worth retrying: a timeout, an unavailable server or a rate limit."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every geocode worker.
+
+    Callers reserve a token under the lock and sleep outside it, so waiting
+    workers are released in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    @classmethod
+    def from_min_delay(cls, min_delay: float, burst: int = 1) -> "TokenBucket":
+        rate = 1.0 / min_delay if min_delay > 0 else float("inf")
+        return cls(rate=rate, burst=burst)
+
+    def acquire(self) -> float:
+        if self.rate == float("inf"):
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+@dataclass(frozen=True)
+class GeocodeOutcome:
+    location: str
+    coordinates: Optional[Coordinates]
+    error: str = ""
+    # Seconds this lookup spent waiting for the rate limiter.
+    waited: float = 0.0
+
+
+def create_nominatim_geocoder(
+    user_agent: str,
+    endpoint: str = "",
+    pool_size: int = 1,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Optional[GeocodeFunction]:
+    """Return a Nominatim lookup function, or None when geopy is not installed.
+
+    ``endpoint`` points at any Nominatim-compatible server, e.g. a local stand-in.
+    """
+    try:
+        from geopy import Nominatim
+        from geopy.adapters import RequestsAdapter, requests_available
+        from geopy.exc import (
+            GeocoderAuthenticationFailure,
+            GeocoderInsufficientPrivileges,
+            GeocoderQueryError,
+            GeocoderServiceError,
+        )
+    except ImportError:
+        return None
+
+    options = {"user_agent": user_agent, "timeout": timeout}
+
+    if endpoint:
+        parsed = urllib.parse.urlsplit(endpoint)
+        if not parsed.netloc:
+            raise ValueError(f"invalid geocoder endpoint: {endpoint}")
+        options["scheme"] = parsed.scheme or "https"
+        options["domain"] = (parsed.netloc + parsed.path).rstrip("/")
+
+    if requests_available:
+        # A pooled requests session keeps connections alive across lookups.
+        options["adapter_factory"] = functools.partial(
+            RequestsAdapter,
+            pool_connections=1,
+            pool_maxsize=max(pool_size, 1),
+        )
+
+    geocoder = Nominatim(**options)
+
+    def geocode(location: str) -> Optional[Coordinates]:
+        try:
+            result = geocoder.geocode(location)
+        except (GeocoderAuthenticationFailure, GeocoderInsufficientPrivileges, GeocoderQueryError):
+            raise
+        except GeocoderServiceError as error:
+            raise TransientGeocodeError(
+                f"{type(error).__name__}: {error}", getattr(error, "retry_after", None)
+            ) from error
+        if result is None:
+            return None
+        return float(result.latitude), float(result.longitude)
+
+    return geocode
+
+
+def _lookup(
+    geocode: GeocodeFunction,
+    limiter: TokenBucket,
+    location: str,
+    retries: int = DEFAULT_RETRIES,
+    retry_wait: float = DEFAULT_RETRY_WAIT,
+) -> GeocodeOutcome:
+    """Look ``location`` up, retrying transient errors; every attempt takes a token from ``limiter``."""
+    waited = 0.0
+    attempts = 0
+    while True:
+        waited += limiter.acquire()
+        attempts += 1
+        try:
+            coordinates = geocode(location)
+        except TransientGeocodeError as error:
+            if attempts > retries:
+                return GeocodeOutcome(location=location, coordinates=None, error=str(error), waited=waited)
+            time.sleep(error.retry_after if error.retry_after is not None else retry_wait)
+            continue
+        except Exception as error:
+            return GeocodeOutcome(
+                location=location, coordinates=None, error=f"{type(error).__name__}: {error}", waited=waited
+            )
+        return GeocodeOutcome(location=location, coordinates=coordinates, waited=waited)
+
+
+def geocode_concurrently(
+    locations: Iterable[str],
+    geocode: GeocodeFunction,
+    limiter: TokenBucket,
+    concurrency: int = 1,
+    retries: int = DEFAULT_RETRIES,
+    retry_wait: float = DEFAULT_RETRY_WAIT,
+) -> Iterator[GeocodeOutcome]:
+    """Yield outcomes as lookups finish, keeping at most ``concurrency`` in flight."""
+    workers = max(concurrency, 1)
+    pending_locations = iter(locations)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geocode") as executor:
+        in_flight = set()
+
+        def submit_next() -> bool:
+            location = next(pending_locations, None)
+            if location is None:
+                return False
+            in_flight.add(executor.submit(_lookup, geocode, limiter, location, retries, retry_wait))
+            return True
+
+        try:
+            for _ in range(workers):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    yield future.result()
+                    submit_next()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import pathlib
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+STATS_VERSION = 1
+
+
+class PipelineStats:
+    """Records phases and counters of one pipeline into a shared :class:`Stats`."""
+
+    def __init__(self, stats: "Stats", pipeline: str) -> None:
+        self._stats = stats
+        self.pipeline = pipeline
+
+    def add(self, phase: str, seconds: float, calls: int = 1) -> None:
+        self._stats.add(self.pipeline, phase, seconds, calls)
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    def count(self, **counters: float) -> None:
+        self._stats.count(self.pipeline, counters)
+
+
+class Stats:
+    """Wall time, call count and counters per ``(pipeline, phase)`` for one process.
+
+    Phases timed from several threads (writes, geocode lookups) add up the
+    time of every thread, so they can exceed the run's wall time.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[Tuple[str, str], List[float]] = {}
+        self.counters: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def pipeline(self, name: str) -> PipelineStats:
+        return PipelineStats(self, name)
+
+    def add(self, pipeline: str, phase: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            entry = self.phases.setdefault((pipeline, phase), [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, pipeline: str, counters: Dict[str, float]) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[(pipeline, name)] = self.counters.get((pipeline, name), 0) + value
+
+    def as_dict(self, command: str, status: int, seconds: float) -> Dict[str, object]:
+        pipelines: Dict[str, Dict[str, Dict[str, object]]] = {}
+        for (pipeline, phase), (phase_seconds, calls) in sorted(self.phases.items()):
+            phases = pipelines.setdefault(pipeline, {"phases": {}, "counters": {}})["phases"]
+            phases[phase] = {"seconds": round(phase_seconds, 6), "calls": calls}
+        for (pipeline, name), value in sorted(self.counters.items()):
+            pipelines.setdefault(pipeline, {"phases": {}, "counters": {}})["counters"][name] = value
+        return {
+            "version": STATS_VERSION,
+            "command": command,
+            "status": status,
+            "seconds": round(seconds, 6),
+            "pipelines": pipelines,
+        }
+
+    def prometheus_text(self, command: str, status: int, seconds: float) -> str:
+        """Metrics in the Prometheus text format, e.g. for node_exporter's textfile collector."""
+        lines = [
+            "# HELP sitegen_run_seconds Wall time of the whole run.",
+            "# TYPE sitegen_run_seconds gauge",
+            f'sitegen_run_seconds{{command="{command}"}} {seconds:.6f}',
+            "# HELP sitegen_run_status Exit status of the run.",
+            "# TYPE sitegen_run_status gauge",
+            f'sitegen_run_status{{command="{command}"}} {status}',
+            "# HELP sitegen_phase_seconds Wall time spent in each pipeline phase.",
+            "# TYPE sitegen_phase_seconds gauge",
+        ]
+        phases = sorted(self.phases.items())
+        for (pipeline, phase), (phase_seconds, _) in phases:
+            labels = f'command="{command}",pipeline="{pipeline}",phase="{phase}"'
+            lines.append(f"sitegen_phase_seconds{{{labels}}} {phase_seconds:.6f}")
+        lines += [
+            "# HELP sitegen_phase_calls Times each pipeline phase was entered.",
+            "# TYPE sitegen_phase_calls gauge",
+        ]
+        for (pipeline, phase), (_, calls) in phases:
+            labels = f'command="{command}",pipeline="{pipeline}",phase="{phase}"'
+            lines.append(f"sitegen_phase_calls{{{labels}}} {calls}")
+        lines += [
+            "# HELP sitegen_items Counters reported by each pipeline (rows, written files, ...).",
+            "# TYPE sitegen_items gauge",
+        ]
+        for (pipeline, name), value in sorted(self.counters.items()):
+            labels = f'command="{command}",pipeline="{pipeline}",name="{name}"'
+            lines.append(f"sitegen_items{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def add_instrumentation_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", help="Run under cProfile and dump the profile to this file.")
+    parser.add_argument("--stats-json", help="Write per-phase timings and counters as JSON to this file.")
+    parser.add_argument(
+        "--stats-prometheus",
+        help="Write per-phase timings and counters in the Prometheus textfile format to this file.",
+    )
+
+
+def run_instrumented(args: argparse.Namespace, stats: Stats, command: str, run: Callable[[], int]) -> int:
+    """Run ``run`` and write the profile and stats files requested on the command line."""
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
+    started = time.perf_counter()
+    status = profiler.runcall(run) if profiler else run()
+    seconds = time.perf_counter() - started
+
+    if profiler:
+        profiler.dump_stats(args.profile)
+    if args.stats_json:
+        report = stats.as_dict(command, status, seconds)
+        atomic_write_text(pathlib.Path(args.stats_json), json.dumps(report, indent=2) + "\n")
+    if args.stats_prometheus:
+        metrics = stats.prometheus_text(command, status, seconds)
+        atomic_write_text(pathlib.Path(args.stats_prometheus), metrics)
+    return status
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+from sitegen.fileio import atomic_write_text
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def location_key(text: str) -> str:
+    """Fold case, width, punctuation and whitespace so variants of one place compare equal."""
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(WORD_PATTERN.findall(folded))
+
+
+def load_alias_table(path: pathlib.Path) -> Dict[str, str]:
+    """Load a user-maintained ``{"variant": "canonical location"}`` table keyed by location_key."""
+    if not path.exists():
+        return {}
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError(f"alias table must be a JSON object: {path}")
+
+    aliases: Dict[str, str] = {}
+    for variant, canonical in payload.items():
+        canonical = str(canonical).strip()
+        if not canonical:
+            continue
+        aliases[location_key(str(variant))] = canonical
+        aliases.setdefault(location_key(canonical), canonical)
+    return aliases
+
+
+def load_alias_index(path: pathlib.Path) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+    return {str(key): str(value) for key, value in payload.items()} if isinstance(payload, dict) else {}
+
+
+def save_alias_index(path: pathlib.Path, index: Dict[str, str]) -> None:
+    atomic_write_text(path, json.dumps(index, ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+
+
+def canonicalize_locations(
+    locations: Iterable[str],
+    aliases: Dict[str, str],
+    index: Dict[str, str],
+    cached: Iterable[str] = (),
+) -> Dict[str, str]:
+    """Map every location string to one canonical spelling and record it in ``index``.
+
+    The canonical spelling comes from the alias table first, then from an
+    earlier run's index, then from a variant that already has cached
+    coordinates, and finally from the first variant in sorted order.
+    """
+    groups: Dict[str, List[str]] = {}
+    for location in sorted(set(locations)):
+        key = location_key(location)
+        if key:
+            groups.setdefault(key, []).append(location)
+
+    cached_locations = set(cached)
+    mapping: Dict[str, str] = {}
+
+    for key, variants in groups.items():
+        canonical = aliases.get(key) or index.get(key)
+        if not canonical:
+            canonical = next((variant for variant in variants if variant in cached_locations), variants[0])
+
+        index[key] = canonical
+        for variant in variants:
+            mapping[variant] = canonical
+
+    return mapping
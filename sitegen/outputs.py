@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, Optional
+
+from sitegen.fileio import atomic_write_text
+from sitegen.instrumentation import PipelineStats
+
+MANIFEST_NAME = ".output-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class OutputManifest:
+    """Hash, mtime and size of every generated file in one output directory.
+
+    A file whose stat still matches its entry is compared by hash alone; it
+    is only read back when the stat differs, e.g. after a hand edit.
+    """
+
+    def __init__(self, directory: pathlib.Path, name: str = MANIFEST_NAME) -> None:
+        self.directory = directory
+        self.path = directory / name
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == MANIFEST_VERSION:
+            self.entries = dict(payload.get("files", {}))
+
+    def _record(self, name: str, digest: str, stat: os.stat_result) -> None:
+        entry = {"hash": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        with self._lock:
+            if self.entries.get(name) != entry:
+                self.entries[name] = entry
+                self._dirty = True
+
+    def is_current(self, path: pathlib.Path, data: bytes, digest: str) -> bool:
+        name = path.relative_to(self.directory).as_posix()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+
+        entry = self.entries.get(name)
+        if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return entry.get("hash") == digest
+
+        if stat.st_size != len(data) or path.read_bytes() != data:
+            return False
+
+        self._record(name, digest, stat)
+        return True
+
+    def write_if_changed(
+        self, path: pathlib.Path, content: str, dry_run: bool, stats: Optional[PipelineStats] = None
+    ) -> str:
+        started = time.perf_counter()
+        data = content.encode("utf-8")
+        digest = content_digest(data)
+        current = self.is_current(path, data, digest)
+        if stats:
+            stats.add("change_detect", time.perf_counter() - started)
+        if current:
+            return "unchanged"
+
+        if dry_run:
+            return "dry-run"
+
+        started = time.perf_counter()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Staged output directories hard-link the live files; replace such a link, never write through it.
+            if os.lstat(path).st_nlink > 1:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        path.write_bytes(data)
+        self._record(path.relative_to(self.directory).as_posix(), digest, path.stat())
+        if stats:
+            stats.add("write", time.perf_counter() - started)
+        return "written"
+
+    def remove(self, path: pathlib.Path) -> bool:
+        if self.entries.pop(path.relative_to(self.directory).as_posix(), None) is not None:
+            self._dirty = True
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {"version": MANIFEST_VERSION, "files": self.entries}
+        atomic_write_text(self.path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        self._dirty = False
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import functools
+import math
+import pathlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sitegen.instrumentation import PipelineStats
+from sitegen.outputs import OutputManifest
+
+RenderFunction = Callable[[Dict[str, str]], Tuple[str, str]]
+RenderResult = Tuple[Optional[Tuple[str, str]], Optional[str]]
+
+CHUNKS_PER_JOB = 4
+
+
+def _render_safely(render: RenderFunction, row: Dict[str, str]) -> RenderResult:
+    try:
+        return render(row), None
+    except ValueError as error:
+        return None, str(error)
+
+
+def render_rows(render: RenderFunction, rows: Sequence[Dict[str, str]], jobs: int = 1) -> List[RenderResult]:
+    """Render rows in order, returning ``((filename, markdown), None)`` or ``(None, error)`` for each.
+
+    With ``jobs > 1`` the rows are rendered in chunks by a process pool;
+    ``render`` must then be a module-level function.
+    """
+    task = functools.partial(_render_safely, render)
+    if jobs <= 1 or len(rows) < 2:
+        return [task(row) for row in rows]
+
+    chunksize = max(1, math.ceil(len(rows) / (jobs * CHUNKS_PER_JOB)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(task, rows, chunksize=chunksize))
+
+
+def write_outputs(
+    manifest: OutputManifest,
+    writes: Sequence[Tuple[pathlib.Path, str]],
+    dry_run: bool,
+    jobs: int = 1,
+    stats: Optional[PipelineStats] = None,
+) -> List[str]:
+    """Write changed outputs, on a thread pool when ``jobs > 1``; statuses come back in input order."""
+    write = functools.partial(manifest.write_if_changed, dry_run=dry_run, stats=stats)
+    if jobs <= 1:
+        return [write(path, content) for path, content in writes]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(write, *zip(*writes))) if writes else []
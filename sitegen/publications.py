@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import pathlib
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sitegen.context import BuildContext, directory_listing, output_manifest, pipeline_stats
+from sitegen.dedup import (
+    DEDUP_INDEX_NAME,
+    Claim,
+    DedupIndex,
+    describe_claim,
+    find_arxiv_id,
+    find_doi,
+    identity_keys,
+)
+from sitegen.instrumentation import add_instrumentation_args, run_instrumented
+from sitegen.parallel import render_rows, write_outputs
+from sitegen.rowindex import (
+    RowIndex,
+    generator_fingerprint,
+    keep_skipped_rows,
+    row_fingerprint,
+    row_index_path,
+    stale_outputs,
+)
+from sitegen.staging import run_staged
+from sitegen.text import GENERATOR_DIR, REPO_ROOT, normalize, parse_iso_date, slugify, yaml_quote
+from sitegen.validation import report_problems, validate_rows
+
+REQUIRED_COLUMNS = ("pub_date", "title", "venue", "citation")
+# Rows of the hand-curated TSV win over publications generated from BibTeX.
+DEDUP_PRIORITY = 0
+RENDERER_FILES = (pathlib.Path(__file__), pathlib.Path(__file__).with_name("text.py"))
+
+
+def output_slug(row: Dict[str, str]) -> str:
+    return normalize(row.get("url_slug")) or slugify(normalize(row.get("title")), "publication")
+
+
+def output_filename(row: Dict[str, str]) -> str:
+    return f"{normalize(row.get('pub_date'))}-{output_slug(row)}.md"
+
+
+def render_markdown(row: Dict[str, str]) -> tuple[str, str]:
+    pub_date = parse_iso_date(normalize(row.get("pub_date")))
+    title = normalize(row.get("title"))
+    venue = normalize(row.get("venue"))
+    citation = normalize(row.get("citation"))
+    excerpt = normalize(row.get("excerpt"))
+    paper_url = normalize(row.get("paper_url"))
+    slides_url = normalize(row.get("slides_url"))
+    url_slug = output_slug(row)
+
+    html_filename = f"{pub_date}-{url_slug}"
+    md_filename = f"{html_filename}.md"
+
+    front_matter = [
+        "---",
+        f"title: {yaml_quote(title)}",
+        "collection: publications",
+        f"permalink: /publication/{html_filename}",
+        f"date: {pub_date}",
+        f"venue: {yaml_quote(venue)}",
+    ]
+
+    if excerpt:
+        front_matter.append(f"excerpt: {yaml_quote(excerpt)}")
+    if paper_url:
+        front_matter.append(f"paperurl: {yaml_quote(paper_url)}")
+    if slides_url:
+        front_matter.append(f"slidesurl: {yaml_quote(slides_url)}")
+
+    front_matter.append(f"citation: {yaml_quote(citation)}")
+    front_matter.append("---")
+
+    body = []
+    if paper_url:
+        body.append(f"[Download paper]({paper_url})")
+    if slides_url:
+        body.append(f"[Download slides]({slides_url})")
+    if excerpt:
+        body.append(excerpt)
+
+    body.append(f"Recommended citation: {citation}")
+
+    markdown = "\n".join(front_matter) + "\n\n" + "\n\n".join(body).rstrip() + "\n"
+    return md_filename, markdown
+
+
+def row_key(row: Dict[str, str]) -> str:
+    url_slug = normalize(row.get("url_slug"))
+    if url_slug:
+        return f"slug:{url_slug}"
+    return f"date:{normalize(row.get('pub_date'))}|{normalize(row.get('title'))}"
+
+
+def row_identity_keys(row: Dict[str, str]) -> List[str]:
+    paper_url = normalize(row.get("paper_url"))
+    citation = normalize(row.get("citation"))
+    return identity_keys(
+        doi=find_doi(normalize(row.get("doi")), paper_url, citation),
+        arxiv_id=find_arxiv_id(paper_url, normalize(row.get("venue")), citation),
+        title=normalize(row.get("title")),
+    )
+
+
+def process_file(
+    input_path: pathlib.Path,
+    output_dir: pathlib.Path,
+    dry_run: bool,
+    full_rebuild: bool = False,
+    jobs: int = 1,
+    dedup: bool = True,
+    dedup_report: Optional[pathlib.Path] = None,
+    validation_report: Optional[pathlib.Path] = None,
+    context: BuildContext | None = None,
+) -> int:
+    stats = pipeline_stats(context, "publications")
+    with stats.phase("read"), input_path.open("r", encoding="utf-8-sig", newline="") as file_handle:
+        text = file_handle.read()
+    with stats.phase("parse"):
+        reader = csv.DictReader(io.StringIO(text, newline=""), delimiter="\t")
+        rows = list(reader)
+    if not reader.fieldnames:
+        print("ERROR: TSV header is missing.", file=sys.stderr)
+        return 1
+
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing_columns:
+        print(f"ERROR: Missing required TSV columns: {', '.join(missing_columns)}", file=sys.stderr)
+        return 1
+
+    with stats.phase("validate"):
+        problems = validate_rows(rows, REQUIRED_COLUMNS, "pub_date", output_filename)
+    report_problems("publications", problems, len(rows), validation_report)
+
+    with stats.phase("cache_load"):
+        manifest = output_manifest(context, output_dir)
+        index = RowIndex(
+            row_index_path(output_dir, input_path), generator_fingerprint(*RENDERER_FILES)
+        )
+        if full_rebuild:
+            index.reusable = False
+        dedup_index = DedupIndex(output_dir / DEDUP_INDEX_NAME, "publications") if dedup else None
+        if dedup_index is not None:
+            dedup_index.release([input_path.stem])
+        existing_files = directory_listing(context, output_dir)
+    row_claims: Dict[str, Claim] = {}
+    current_rows: Dict[str, Dict[str, str]] = {}
+    key_counts: Dict[str, int] = {}
+    skipped_keys: List[str] = []
+
+    seen_filenames = set()
+    total_rows = 0
+    skipped_rows = 0
+    written_files = 0
+    unchanged_files = 0
+    added_rows = 0
+    changed_rows = 0
+    untouched_rows = 0
+
+    # (row_index, key, fingerprint, reused index entry, render queue position)
+    steps: List[tuple] = []
+    render_queue: List[Dict[str, str]] = []
+    checked_rows = 0
+    detect_seconds = 0.0
+
+    for row_index, row in enumerate(rows, start=2):
+        total_rows += 1
+        key = row_key(row)
+        key_counts[key] = key_counts.get(key, 0) + 1
+        if key_counts[key] > 1:
+            key = f"{key}#{key_counts[key]}"
+
+        if row_index in problems:
+            skipped_keys.append(key)
+            skipped_rows += 1
+            continue
+
+        if dedup_index is not None:
+            claim, matched_key = dedup_index.resolve(
+                row_identity_keys(row), input_path.stem, key, DEDUP_PRIORITY
+            )
+            if matched_key is not None:
+                print(
+                    f"WARNING row {row_index}: duplicate of {describe_claim(claim)} ({matched_key})",
+                    file=sys.stderr,
+                )
+                # Unlike rows skipped for an error, a duplicate's previous page is removed.
+                skipped_rows += 1
+                continue
+            row_claims[key] = claim
+
+        detect_started = time.perf_counter()
+        fingerprint = row_fingerprint(row)
+        previous = index.reusable_entry(key, fingerprint)
+        reusable = previous and previous["file"] in existing_files
+        detect_seconds += time.perf_counter() - detect_started
+        checked_rows += 1
+        if reusable:
+            steps.append((row_index, key, fingerprint, previous, -1))
+        else:
+            steps.append((row_index, key, fingerprint, None, len(render_queue)))
+            render_queue.append(row)
+
+    stats.add("change_detect", detect_seconds, calls=checked_rows)
+    with stats.phase("render"):
+        render_results = render_rows(render_markdown, render_queue, jobs)
+    writes: List[tuple[pathlib.Path, str]] = []
+
+    # Warnings and duplicate detection run in row order whatever the number of jobs.
+    for row_index, key, fingerprint, reused, position in steps:
+        if reused:
+            md_filename = reused["file"]
+        else:
+            result, error = render_results[position]
+            if result is None:
+                skipped_keys.append(key)
+                if key in row_claims:
+                    dedup_index.withdraw(row_claims[key])
+                skipped_rows += 1
+                print(f"WARNING row {row_index}: {error}", file=sys.stderr)
+                continue
+            md_filename, markdown = result
+
+        # validate_rows already rejected rows sharing an output filename, so this only catches a
+        # reused row-index entry whose recorded file another row now renders to.
+        if md_filename in seen_filenames:
+            skipped_keys.append(key)
+            if key in row_claims:
+                dedup_index.withdraw(row_claims[key])
+            skipped_rows += 1
+            print(f"WARNING row {row_index}: duplicate output filename {md_filename}", file=sys.stderr)
+            continue
+
+        seen_filenames.add(md_filename)
+        if key in row_claims:
+            row_claims[key]["file"] = md_filename
+
+        if reused:
+            current_rows[key] = reused
+            untouched_rows += 1
+            continue
+
+        writes.append((output_dir / md_filename, markdown))
+        current_rows[key] = {"hash": fingerprint, "file": md_filename}
+        if key in index.rows:
+            changed_rows += 1
+        else:
+            added_rows += 1
+
+    for status in write_outputs(manifest, writes, dry_run=dry_run, jobs=jobs, stats=stats):
+        if status == "unchanged":
+            unchanged_files += 1
+        else:
+            written_files += 1
+
+    keep_skipped_rows(index.rows, current_rows, skipped_keys)
+    removed_rows, stale_files = stale_outputs(index.rows, current_rows, seen_filenames)
+    if dedup_index is not None:
+        # As in pubsFromBib: pages this source claimed before that nothing claims or produces now.
+        owned = seen_filenames | {entry["file"] for entry in current_rows.values()}
+        stale_files = sorted(set(stale_files).union(dedup_index.stale_files(owned)))
+    if not dry_run:
+        existing_files.update(path.name for path, _ in writes)
+        with stats.phase("write"):
+            for stale_file in stale_files:
+                manifest.remove(output_dir / stale_file)
+                existing_files.discard(stale_file)
+        with stats.phase("cache_save"):
+            manifest.save()
+            index.save(current_rows)
+            if dedup_index is not None:
+                dedup_index.save()
+    if dedup_index is not None and dedup_report is not None:
+        dedup_index.write_report(dedup_report)
+
+    stats.count(
+        rows=total_rows,
+        added=added_rows,
+        changed=changed_rows,
+        removed=removed_rows,
+        untouched=untouched_rows,
+        written=written_files,
+        unchanged=unchanged_files,
+        skipped=skipped_rows,
+    )
+    mode_text = "dry-run" if dry_run else "write"
+    print(
+        f"publications: mode={mode_text} rows={total_rows} added={added_rows} changed={changed_rows} "
+        f"removed={removed_rows} untouched={untouched_rows} written={written_files} "
+        f"unchanged={unchanged_files} skipped={skipped_rows}"
+    )
+
+    return 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate publication markdown files from a TSV source.")
+    parser.add_argument(
+        "--input",
+        default=str(GENERATOR_DIR / "publications.tsv"),
+        help="Path to the publications TSV file.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=str(REPO_ROOT / "_publications"),
+        help="Directory where generated markdown files are written.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate and render without writing files.",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Re-render every row instead of only rows that changed since the last run.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render rows in this many processes and write files from this many threads.",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Do not skip rows that share a DOI, arXiv id or title with another publication.",
+    )
+    parser.add_argument(
+        "--dedup-report",
+        help="Write a JSON report of every duplicate found and which source was kept.",
+    )
+    parser.add_argument(
+        "--validation-report",
+        help="Write every row rejected by validation, with the reason, as JSON to this file.",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help=(
+            "Write into a hard-linked copy of the output directory and swap it in with one rename, "
+            "so a concurrent site build never sees a half-updated collection."
+        ),
+    )
+    add_instrumentation_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None, context: BuildContext | None = None) -> int:
+    args = parse_args(argv)
+    input_path = pathlib.Path(args.input)
+    output_dir = pathlib.Path(args.output_dir)
+
+    if not input_path.exists():
+        print(f"ERROR: Input TSV does not exist: {input_path}", file=sys.stderr)
+        return 1
+
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1", file=sys.stderr)
+        return 1
+
+    context = context or BuildContext()
+    return run_instrumented(
+        args,
+        context.stats,
+        "publications",
+        lambda: run_staged(
+            output_dir,
+            args.staged and not args.dry_run,
+            context,
+            lambda target_dir: process_file(
+                input_path=input_path,
+                output_dir=target_dir,
+                dry_run=args.dry_run,
+                full_rebuild=args.full_rebuild,
+                jobs=args.jobs,
+                context=context,
+                dedup=not args.no_dedup,
+                dedup_report=pathlib.Path(args.dedup_report) if args.dedup_report else None,
+                validation_report=pathlib.Path(args.validation_report) if args.validation_report else None,
+            ),
+        ),
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,654 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime as dt
+import functools
+import html
+import json
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sitegen.bibcache import BibRecord, bib_cache_key, load_bib_cache, save_bib_cache
+from sitegen.bibtex import READER_VERSION, BibSyntaxError, iter_entries
+from sitegen.context import BuildContext, output_manifest
+from sitegen.dedup import (
+    DEDUP_INDEX_NAME,
+    DedupIndex,
+    describe_claim,
+    find_arxiv_id,
+    find_doi,
+    identity_keys,
+)
+from sitegen.instrumentation import PipelineStats, add_instrumentation_args, run_instrumented
+from sitegen.outputs import OutputManifest
+from sitegen.staging import run_staged
+from sitegen.text import GENERATOR_DIR, REPO_ROOT, normalize, slugify, yaml_quote
+
+
+@dataclass(frozen=True)
+class SourceConfig:
+    file: pathlib.Path
+    venue_key: str
+    venue_prefix: str = ""
+    collection_name: str = "publications"
+    collection_permalink: str = "/publication/"
+
+
+DEFAULT_SOURCES: Dict[str, SourceConfig] = {
+    "proceeding": SourceConfig(
+        file=GENERATOR_DIR / "proceedings.bib",
+        venue_key="booktitle",
+        venue_prefix="In the proceedings of ",
+    ),
+    "journal": SourceConfig(
+        file=GENERATOR_DIR / "pubs.bib",
+        venue_key="journal",
+        venue_prefix="",
+    ),
+}
+
+# publications.tsv is curated by hand and claims with priority 0, so it wins over every bib source.
+BIB_PRIORITY_BASE = 1
+# Fields a kept record takes over from a dropped duplicate when it has none of its own.
+MERGED_FIELDS = ("note", "paper_url", "doi", "arxiv_id")
+
+MONTH_NAME_MAP = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+
+def strip_bibtex_markup(text: str) -> str:
+    return normalize(text).replace("{", "").replace("}", "").replace("\\", "")
+
+
+def parse_month(value: str) -> int:
+    raw = normalize(value)
+    if not raw:
+        return 1
+
+    cleaned = raw.strip("{} ").lower()
+
+    if cleaned.isdigit():
+        month = int(cleaned)
+        if 1 <= month <= 12:
+            return month
+        raise ValueError(f"invalid month number: {value}")
+
+    month_token = cleaned[:3]
+    if month_token in MONTH_NAME_MAP:
+        return MONTH_NAME_MAP[month_token]
+
+    raise ValueError(f"invalid month format: {value}")
+
+
+def parse_day(value: str) -> int:
+    raw = normalize(value)
+    if not raw:
+        return 1
+
+    cleaned = raw.strip("{} ")
+    if cleaned.isdigit():
+        day = int(cleaned)
+        if 1 <= day <= 31:
+            return day
+
+    raise ValueError(f"invalid day format: {value}")
+
+
+def parse_date(fields: Dict[str, str]) -> str:
+    raw_year = normalize(fields.get("year"))
+    if not raw_year or not raw_year.isdigit():
+        raise ValueError("missing or invalid year")
+
+    year = int(raw_year)
+    month = parse_month(fields.get("month", "1"))
+    day = parse_day(fields.get("day", "1"))
+
+    try:
+        return dt.date(year, month, day).isoformat()
+    except ValueError as error:
+        raise ValueError(f"invalid date combination: {error}") from error
+
+
+def author_names(entry) -> Tuple[str, ...]:
+    author_parts = []
+    for author in entry.persons.get("author", []):
+        first = normalize(" ".join(author.first_names))
+        last = normalize(" ".join(author.last_names))
+        full_name = normalize(f"{first} {last}")
+        if full_name:
+            author_parts.append(full_name)
+    return tuple(author_parts)
+
+
+def build_citation(authors: Iterable[str], title: str, venue: str, year: str) -> str:
+    author_text = ", ".join(authors)
+    components = [author_text, f'"{title}."', venue, f"{year}."]
+    return " ".join(part for part in components if part).strip()
+
+
+def render_markdown(
+    title: str,
+    pub_date: str,
+    venue: str,
+    citation: str,
+    permalink: str,
+    collection_name: str,
+    note: str,
+    paper_url: str,
+) -> str:
+    front_matter = [
+        "---",
+        f"title: {yaml_quote(title)}",
+        f"collection: {collection_name}",
+        f"permalink: {permalink}",
+        f"date: {pub_date}",
+        f"venue: {yaml_quote(venue)}",
+    ]
+
+    if note:
+        front_matter.append(f"excerpt: {yaml_quote(note)}")
+    if paper_url:
+        front_matter.append(f"paperurl: {yaml_quote(paper_url)}")
+
+    front_matter.append(f"citation: {yaml_quote(citation)}")
+    front_matter.append("---")
+
+    body = []
+    if note:
+        body.append(note)
+
+    if paper_url:
+        body.append(f"[Access paper here]({paper_url})")
+    else:
+        scholar_query = html.escape(title.replace(" ", "+"))
+        body.append(
+            "Use "
+            f"[Google Scholar](https://scholar.google.com/scholar?q={scholar_query}) "
+            "for full citation"
+        )
+
+    return "\n".join(front_matter) + "\n\n" + "\n\n".join(body).rstrip() + "\n"
+
+
+def load_source_config(path: pathlib.Path) -> Dict[str, SourceConfig]:
+    """Read ``{"name": {"file": ..., "venue_key": ..., ...}}``; relative files are resolved next to ``path``.
+
+    Falls back to :data:`DEFAULT_SOURCES` when the file does not exist.
+    """
+    if not path.exists():
+        return dict(DEFAULT_SOURCES)
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as error:
+        raise ValueError(f"{path}: {error}") from error
+    if not isinstance(payload, dict) or not payload:
+        raise ValueError(f"source config must be a non-empty JSON object: {path}")
+
+    sources: Dict[str, SourceConfig] = {}
+    for source_name, options in payload.items():
+        if not isinstance(options, dict) or "file" not in options or "venue_key" not in options:
+            raise ValueError(f"source {source_name} needs at least \"file\" and \"venue_key\"")
+        try:
+            config = SourceConfig(**options)
+        except TypeError as error:
+            raise ValueError(f"source {source_name}: {error}") from error
+        sources[source_name] = SourceConfig(
+            file=path.parent / str(config.file),
+            venue_key=str(config.venue_key),
+            venue_prefix=str(config.venue_prefix),
+            collection_name=str(config.collection_name),
+            collection_permalink=str(config.collection_permalink),
+        )
+    return sources
+
+
+def iter_sources(
+    sources: Dict[str, SourceConfig], selected_sources: Iterable[str]
+) -> Iterable[Tuple[str, SourceConfig]]:
+    for source_name in selected_sources:
+        config = sources.get(source_name)
+        if config is None:
+            raise ValueError(f"unknown source: {source_name}")
+        yield source_name, config
+
+
+def create_bib_parser() -> object | None:
+    try:
+        from pybtex.database.input import bibtex
+    except ImportError:
+        return None
+
+    return bibtex.Parser()
+
+
+def normalize_entry(bib_id: str, entry, config: SourceConfig) -> BibRecord:
+    fields = entry.fields
+    is_arxiv = "arxiv" in {fields.get("archiveprefix", "").lower(), fields.get("eprinttype", "").lower()}
+    try:
+        return BibRecord(
+            bib_id=bib_id,
+            title=strip_bibtex_markup(fields["title"]),
+            pub_date=parse_date(fields),
+            # The built-in reader lower-cases field names; pybtex looks them up case-insensitively.
+            venue=normalize(f"{config.venue_prefix}{strip_bibtex_markup(fields[config.venue_key.lower()])}"),
+            note=strip_bibtex_markup(fields.get("note", "")),
+            paper_url=normalize(fields.get("url", "")),
+            doi=find_doi(fields.get("doi", ""), fields.get("url", "")),
+            arxiv_id=find_arxiv_id(
+                fields.get("url", ""),
+                fields.get("journal", ""),
+                fields.get("note", ""),
+                bare=fields.get("eprint", "") if is_arxiv else "",
+            ),
+            authors=author_names(entry),
+        )
+    except KeyError as error:
+        return BibRecord(bib_id=bib_id, warning=f"missing expected field {error}")
+    except ValueError as error:
+        return BibRecord(bib_id=bib_id, warning=str(error))
+
+
+def load_source_records(
+    source_name: str,
+    config: SourceConfig,
+    engine: str = "auto",
+    cache_dir: Optional[pathlib.Path] = None,
+    dry_run: bool = False,
+) -> Tuple[Optional[List[BibRecord]], List[str], Dict[str, float]]:
+    """Parse one source into normalized records, returning them with any source-level warnings.
+
+    Runs in a worker process when several sources are read at once, so
+    warnings and the seconds spent in each phase are returned rather than
+    printed or recorded; records are None when the source could not be read
+    at all.
+    """
+    warnings: List[str] = []
+    phases: Dict[str, float] = {}
+    if not config.file.exists():
+        warnings.append(f"WARNING source={source_name}: missing bib file: {config.file}")
+        return None, warnings, phases
+
+    started = time.perf_counter()
+    cache_path = cache_dir / f"{source_name}.bin" if cache_dir else None
+    cache_key = bib_cache_key(
+        config.file, str(READER_VERSION), engine, config.venue_key, config.venue_prefix
+    )
+    phases["change_detect"] = time.perf_counter() - started
+    if cache_path:
+        started = time.perf_counter()
+        cached = load_bib_cache(cache_path, cache_key)
+        phases["cache_load"] = time.perf_counter() - started
+        if cached is not None:
+            cached_records, cached_warnings = cached
+            return cached_records, warnings + cached_warnings, phases
+
+    records: Optional[List[BibRecord]] = None
+    if engine != "pybtex":
+        started = time.perf_counter()
+        validate_seconds = 0.0
+        parsed: List[BibRecord] = []
+        try:
+            with config.file.open("r", encoding="utf-8") as handle:
+                for bib_id, entry in iter_entries(handle):
+                    normalize_started = time.perf_counter()
+                    parsed.append(normalize_entry(bib_id, entry, config))
+                    validate_seconds += time.perf_counter() - normalize_started
+            records = parsed
+        except BibSyntaxError as error:
+            parser = None if engine == "builtin" else create_bib_parser()
+            if parser is None:
+                warnings.append(f"WARNING source={source_name}: cannot read {config.file}: {error}")
+                return None, warnings, phases
+            warnings.append(
+                f"WARNING source={source_name}: built-in BibTeX reader failed ({error}); "
+                "retrying with pybtex"
+            )
+        # Entries are normalized as the reader yields them, so reading and parsing share one phase.
+        phases["parse"] = time.perf_counter() - started - validate_seconds
+        phases["validate"] = validate_seconds
+
+    if records is None:
+        # A pybtex Parser accumulates entries across parse_file calls, so each source gets its own.
+        started = time.perf_counter()
+        bibdata = create_bib_parser().parse_file(str(config.file))
+        phases["parse"] = phases.get("parse", 0.0) + time.perf_counter() - started
+        started = time.perf_counter()
+        records = [normalize_entry(bib_id, entry, config) for bib_id, entry in bibdata.entries.items()]
+        phases["validate"] = time.perf_counter() - started
+
+    if cache_path and not dry_run:
+        started = time.perf_counter()
+        save_bib_cache(cache_path, cache_key, records, warnings)
+        phases["cache_save"] = time.perf_counter() - started
+    return records, warnings, phases
+
+
+def load_all_sources(
+    sources: List[Tuple[str, SourceConfig]],
+    engine: str,
+    cache_dir: Optional[pathlib.Path],
+    dry_run: bool,
+    jobs: int = 1,
+) -> List[Tuple[Optional[List[BibRecord]], List[str], Dict[str, float]]]:
+    """Load every source, in a process pool when ``jobs > 1``; results keep the order of ``sources``."""
+    task = functools.partial(load_source_records, engine=engine, cache_dir=cache_dir, dry_run=dry_run)
+    names = [source_name for source_name, _ in sources]
+    configs = [config for _, config in sources]
+    if jobs <= 1 or len(sources) < 2:
+        return list(map(task, names, configs))
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as executor:
+        return list(executor.map(task, names, configs))
+
+
+def output_filename(record: BibRecord) -> str:
+    return f"{record.pub_date}-{slugify(record.title, 'publication')}.md"
+
+
+def deduplicate(dedup: DedupIndex, batches: Iterable[Tuple[str, List[BibRecord], int]]) -> None:
+    """Replace records that duplicate an already claimed publication with a warning, in place.
+
+    ``batches`` holds ``(source name, records, priority)``. A kept record read
+    in this run takes over the note, URL and identifiers it lacks from the
+    duplicates it absorbs.
+    """
+    kept: Dict[int, Tuple[List[BibRecord], int]] = {}
+    for source_name, records, priority in batches:
+        for position, record in enumerate(records):
+            if record.warning:
+                continue
+            keys = identity_keys(record.doi, record.arxiv_id, record.title)
+            claim, matched_key = dedup.resolve(keys, source_name, record.bib_id, priority)
+            if matched_key is None:
+                claim["file"] = output_filename(record)
+                kept[id(claim)] = (records, position)
+                continue
+
+            records[position] = BibRecord(
+                bib_id=record.bib_id, warning=f"duplicate of {describe_claim(claim)} ({matched_key})"
+            )
+            if id(claim) in kept:
+                kept_records, kept_position = kept[id(claim)]
+                winner = kept_records[kept_position]
+                merged = {
+                    field: getattr(record, field)
+                    for field in MERGED_FIELDS
+                    if not getattr(winner, field) and getattr(record, field)
+                }
+                if merged:
+                    kept_records[kept_position] = dataclasses.replace(winner, **merged)
+
+
+def process_records(
+    source_name: str,
+    config: SourceConfig,
+    output_dir: pathlib.Path,
+    dry_run: bool,
+    manifest: OutputManifest,
+    records: Iterable[BibRecord],
+    seen_filenames: Dict[str, str],
+    stats: Optional[PipelineStats] = None,
+) -> tuple[int, int, int, int]:
+    """Render and write one source's records.
+
+    ``seen_filenames`` maps every output filename to the source that produced
+    it and is shared across sources so collisions between them are caught.
+    """
+    written_files = 0
+    unchanged_files = 0
+    skipped_entries = 0
+    total_entries = 0
+
+    for record in records:
+        total_entries += 1
+        bib_id = record.bib_id
+
+        if record.warning:
+            skipped_entries += 1
+            print(f"WARNING source={source_name} id={bib_id}: {record.warning}", file=sys.stderr)
+            continue
+
+        md_filename = output_filename(record)
+        html_filename = md_filename[: -len(".md")]
+
+        owner = seen_filenames.get(md_filename)
+        if owner is not None:
+            skipped_entries += 1
+            claimed = "" if owner == source_name else f" (already generated from source={owner})"
+            print(
+                f"WARNING source={source_name} id={bib_id}: duplicate output filename {md_filename}{claimed}",
+                file=sys.stderr,
+            )
+            continue
+
+        seen_filenames[md_filename] = source_name
+
+        started = time.perf_counter()
+        citation = build_citation(
+            authors=record.authors, title=record.title, venue=record.venue, year=record.pub_date[:4]
+        )
+        permalink = f"{config.collection_permalink}{html_filename}"
+
+        markdown = render_markdown(
+            title=record.title,
+            pub_date=record.pub_date,
+            venue=record.venue,
+            citation=citation,
+            permalink=permalink,
+            collection_name=config.collection_name,
+            note=record.note,
+            paper_url=record.paper_url,
+        )
+        if stats:
+            stats.add("render", time.perf_counter() - started)
+
+        status = manifest.write_if_changed(output_dir / md_filename, markdown, dry_run=dry_run, stats=stats)
+        if status == "unchanged":
+            unchanged_files += 1
+        else:
+            written_files += 1
+
+        print(f"parsed source={source_name} id={bib_id} file={md_filename}")
+
+    return total_entries, written_files, unchanged_files, skipped_entries
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate publication markdown files from BibTeX sources."
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        help="Source names to process (default: all configured sources).",
+    )
+    parser.add_argument(
+        "--sources-file",
+        default=str(GENERATOR_DIR / "bib-sources.json"),
+        help=(
+            'JSON object of BibTeX sources, e.g. {"journal": {"file": "pubs.bib", "venue_key": "journal"}}; '
+            "the built-in proceeding/journal sources are used when it does not exist."
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=str(REPO_ROOT / "_publications"),
+        help="Directory where generated markdown files are written.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate and render without writing files.",
+    )
+    parser.add_argument(
+        "--bib-engine",
+        choices=("auto", "builtin", "pybtex"),
+        default="auto",
+        help="BibTeX reader: the built-in streaming reader, pybtex, or built-in with pybtex as fallback.",
+    )
+    parser.add_argument(
+        "--bib-cache-dir",
+        default=str(GENERATOR_DIR / ".bib-cache"),
+        help="Directory for parsed-bibliography caches, keyed by each .bib file's content hash.",
+    )
+    parser.add_argument(
+        "--no-bib-cache",
+        action="store_true",
+        help="Always parse the .bib files instead of reusing cached entries.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse up to this many sources at once, each in its own process.",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Do not suppress entries that share a DOI, arXiv id or title with another publication.",
+    )
+    parser.add_argument(
+        "--dedup-report",
+        help="Write a JSON report of every duplicate found and which source was kept.",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help=(
+            "Write into a hard-linked copy of the output directory and swap it in with one rename, "
+            "so a concurrent site build never sees a half-updated collection."
+        ),
+    )
+    add_instrumentation_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None, context: BuildContext | None = None) -> int:
+    args = parse_args(argv)
+    output_dir = pathlib.Path(args.output_dir)
+
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1", file=sys.stderr)
+        return 1
+
+    if args.bib_engine == "pybtex" and create_bib_parser() is None:
+        print(
+            "WARNING: pybtex is not installed. Install with `pip install pybtex` to enable BibTeX generation.",
+            file=sys.stderr,
+        )
+        print("pubsFromBib: mode=skipped entries=0 written=0 unchanged=0 skipped=0")
+        return 0
+
+    try:
+        sources = load_source_config(pathlib.Path(args.sources_file))
+        source_iter = list(iter_sources(sources, args.sources or sources.keys()))
+    except ValueError as error:
+        print(f"ERROR: {error}", file=sys.stderr)
+        return 1
+
+    context = context or BuildContext()
+    stats = context.stats.pipeline("pubsFromBib")
+
+    def run(output_dir: pathlib.Path) -> int:
+        total_entries = 0
+        written_files = 0
+        unchanged_files = 0
+        skipped_entries = 0
+
+        with stats.phase("cache_load"):
+            manifest = output_manifest(context, output_dir)
+        loaded = load_all_sources(
+            source_iter,
+            engine=args.bib_engine,
+            cache_dir=None if args.no_bib_cache else pathlib.Path(args.bib_cache_dir),
+            dry_run=args.dry_run,
+            jobs=args.jobs,
+        )
+        for _, _, phases in loaded:
+            for phase, seconds in phases.items():
+                stats.add(phase, seconds)
+
+        dedup = None
+        if not args.no_dedup:
+            with stats.phase("cache_load"):
+                dedup = DedupIndex(output_dir / DEDUP_INDEX_NAME, "pubsFromBib")
+            # Sources that could not be read keep their claims, and so their pages.
+            batches = [
+                (source_name, records, BIB_PRIORITY_BASE + list(sources).index(source_name))
+                for (source_name, _), (records, _, _) in zip(source_iter, loaded)
+                if records is not None
+            ]
+            with stats.phase("dedup"):
+                dedup.release(source_name for source_name, _, _ in batches)
+                deduplicate(dedup, batches)
+
+        # Output is merged in source order so runs are reproducible whatever the number of jobs.
+        seen_filenames: Dict[str, str] = {}
+        for (source_name, config), (records, warnings, _) in zip(source_iter, loaded):
+            for warning in warnings:
+                print(warning, file=sys.stderr)
+            if records is None:
+                continue
+
+            total, written, unchanged, skipped = process_records(
+                source_name, config, output_dir, args.dry_run, manifest, records, seen_filenames, stats
+            )
+            total_entries += total
+            written_files += written
+            unchanged_files += unchanged
+            skipped_entries += skipped
+
+        if dedup is not None:
+            if not args.dry_run:
+                with stats.phase("write"):
+                    for stale_file in dedup.stale_files(set(seen_filenames)):
+                        manifest.remove(output_dir / stale_file)
+                with stats.phase("cache_save"):
+                    dedup.save()
+            if args.dedup_report:
+                dedup.write_report(pathlib.Path(args.dedup_report))
+
+        if not args.dry_run:
+            with stats.phase("cache_save"):
+                manifest.save()
+
+        stats.count(
+            entries=total_entries, written=written_files, unchanged=unchanged_files, skipped=skipped_entries
+        )
+
+        mode_text = "dry-run" if args.dry_run else "write"
+        print(
+            f"pubsFromBib: mode={mode_text} entries={total_entries} written={written_files} "
+            f"unchanged={unchanged_files} skipped={skipped_entries}"
+        )
+
+        return 0
+
+    return run_instrumented(
+        args,
+        context.stats,
+        "pubsFromBib",
+        lambda: run_staged(output_dir, args.staged and not args.dry_run, context, run),
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+ROW_INDEX_VERSION = 1
+
+
+def row_fingerprint(row: Mapping[str, object]) -> str:
+    text = "\x1e".join(f"{column}\x1f{value or ''}" for column, value in row.items())
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def generator_fingerprint(*paths: pathlib.Path) -> str:
+    """Hash of the generator's source files, so editing the renderer invalidates every row."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        hasher.update(path.read_bytes())
+    return hasher.hexdigest()
+
+
+class RowIndex:
+    """Maps a stable TSV row key to the row's fingerprint and output filename."""
+
+    def __init__(self, path: pathlib.Path, generator: str) -> None:
+        self.path = path
+        self.generator = generator
+        self.rows: Dict[str, Dict[str, str]] = {}
+        # Rows are still loaded when the generator changed so their outputs can
+        # be cleaned up, but none of them may be reused without re-rendering.
+        self.reusable = False
+
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == ROW_INDEX_VERSION:
+            self.rows = dict(payload.get("rows", {}))
+            self.reusable = payload.get("generator") == generator
+
+    def reusable_entry(self, key: str, fingerprint: str) -> Dict[str, str] | None:
+        entry = self.rows.get(key)
+        if self.reusable and entry and entry.get("hash") == fingerprint:
+            return entry
+        return None
+
+    def save(self, rows: Dict[str, Dict[str, str]]) -> None:
+        if rows == self.rows and self.reusable:
+            return
+        payload = {"version": ROW_INDEX_VERSION, "generator": self.generator, "rows": rows}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, sort_keys=True) + "\n")
+        self.rows = rows
+        self.reusable = True
+
+
+def row_index_path(output_dir: pathlib.Path, input_path: pathlib.Path) -> pathlib.Path:
+    return output_dir / f".{input_path.stem}.row-index.json"
+
+
+def keep_skipped_rows(
+    previous: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]], skipped_keys: Iterable[str]
+) -> None:
+    """Carry the previous entries of rows skipped this run into ``current``.
+
+    A row rejected by validation or a filename clash still exists in the
+    TSV, so its last good page stays until the row is fixed or deleted.
+    Rows dropped as duplicates are not passed here: their page goes.
+    """
+    for key in skipped_keys:
+        if key in previous and key not in current:
+            current[key] = previous[key]
+
+
+def stale_outputs(
+    previous: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]], produced: Set[str]
+) -> Tuple[int, List[str]]:
+    """Count rows that disappeared and list previously generated files no current row owns any more."""
+    removed_rows = sum(1 for key in previous if key not in current)
+    owned = set(produced) | {entry.get("file") for entry in current.values()}
+    files = sorted({entry["file"] for entry in previous.values() if entry.get("file") not in owned})
+    return removed_rows, files
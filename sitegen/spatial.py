@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import pathlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from sitegen.fileio import atomic_write_text
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+INDEX_PRECISION = 9
+INDEX_VERSION = 1
+EARTH_RADIUS_KM = 6371.0088
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+MAX_QUERY_CELLS = 32
+
+
+@dataclass(frozen=True)
+class Venue:
+    location: str
+    latitude: float
+    longitude: float
+    talks: Tuple[str, ...] = ()
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = INDEX_PRECISION) -> str:
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    characters = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(characters) < precision:
+        interval, coordinate = (longitude_range, longitude) if even else (latitude_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            characters.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+
+    return "".join(characters)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Return the (latitude, longitude) size in degrees of a cell at ``precision``."""
+    total_bits = 5 * precision
+    longitude_bits = (total_bits + 1) // 2
+    latitude_bits = total_bits // 2
+    return 180.0 / 2**latitude_bits, 360.0 / 2**longitude_bits
+
+
+def haversine_km(latitude_a: float, longitude_a: float, latitude_b: float, longitude_b: float) -> float:
+    phi_a = math.radians(latitude_a)
+    phi_b = math.radians(latitude_b)
+    delta_phi = phi_b - phi_a
+    delta_lambda = math.radians(longitude_b - longitude_a)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi_a) * math.cos(phi_b) * math.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _longitude_spans(west: float, east: float) -> List[Tuple[float, float]]:
+    if east - west >= 360.0:
+        return [(-180.0, 180.0)]
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def _cell_range(low: float, high: float, origin: float, size: float, cells: int) -> range:
+    first = max(math.floor((low - origin) / size), 0)
+    last = min(math.floor((high - origin) / size), cells - 1)
+    return range(first, last + 1)
+
+
+def covering_prefixes(south: float, west: float, north: float, east: float) -> Set[str]:
+    """Geohash prefixes covering the box, at the finest precision that needs few cells."""
+    spans = _longitude_spans(west, east)
+
+    for precision in range(INDEX_PRECISION, 0, -1):
+        cell_height, cell_width = geohash_cell_size(precision)
+        rows = _cell_range(south, north, -90.0, cell_height, round(180.0 / cell_height))
+        columns = [
+            _cell_range(span_west, span_east, -180.0, cell_width, round(360.0 / cell_width))
+            for span_west, span_east in spans
+        ]
+        if len(rows) * sum(len(span) for span in columns) <= MAX_QUERY_CELLS:
+            break
+
+    return {
+        geohash_encode(-90.0 + (row + 0.5) * cell_height, -180.0 + (column + 0.5) * cell_width, precision)
+        for row in rows
+        for span in columns
+        for column in span
+    }
+
+
+class SpatialIndex:
+    """Venues sorted by geohash so any cell prefix is one binary-search range."""
+
+    def __init__(self, venues: Iterable[Venue]) -> None:
+        # Venues at the same coordinates share a geohash; Venue itself has no ordering.
+        entries = sorted(
+            ((geohash_encode(venue.latitude, venue.longitude), venue) for venue in venues),
+            key=lambda entry: (entry[0], entry[1].location),
+        )
+        self.geohashes = [geohash for geohash, _ in entries]
+        self.venues = [venue for _, venue in entries]
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    def _prefix_range(self, prefix: str) -> Iterator[Venue]:
+        start = bisect.bisect_left(self.geohashes, prefix)
+        end = bisect.bisect_left(self.geohashes, prefix + "~")
+        return iter(self.venues[start:end])
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> Iterator[Venue]:
+        for prefix in sorted(covering_prefixes(south, west, north, east)):
+            yield from self._prefix_range(prefix)
+
+    def within_bbox(self, south: float, west: float, north: float, east: float) -> List[Venue]:
+        spans = _longitude_spans(west, east)
+        return [
+            venue
+            for venue in self._candidates(south, west, north, east)
+            if south <= venue.latitude <= north
+            and any(span_west <= venue.longitude <= span_east for span_west, span_east in spans)
+        ]
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, Venue]]:
+        delta_latitude = math.degrees(radius_km / EARTH_RADIUS_KM)
+        south = latitude - delta_latitude
+        north = latitude + delta_latitude
+        if south <= -90.0 or north >= 90.0 or radius_km >= HALF_CIRCUMFERENCE_KM:
+            west, east = -180.0, 180.0
+        else:
+            delta_longitude = math.degrees(
+                math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))))
+            )
+            west, east = longitude - delta_longitude, longitude + delta_longitude
+
+        matches = []
+        for venue in self._candidates(south, west, north, east):
+            distance = haversine_km(latitude, longitude, venue.latitude, venue.longitude)
+            if distance <= radius_km:
+                matches.append((distance, venue))
+        matches.sort(key=lambda match: (match[0], match[1].location))
+        return matches
+
+    def nearest(self, latitude: float, longitude: float, count: int) -> List[Tuple[float, Venue]]:
+        if count <= 0 or not self.venues:
+            return []
+
+        radius_km = 10.0
+        while True:
+            matches = self.within_radius(latitude, longitude, radius_km)
+            if len(matches) >= count or radius_km >= HALF_CIRCUMFERENCE_KM:
+                return matches[:count]
+            radius_km *= 4
+
+    def to_payload(self) -> Dict[str, object]:
+        return {
+            "version": INDEX_VERSION,
+            "precision": INDEX_PRECISION,
+            "entries": [
+                [geohash, venue.location, venue.latitude, venue.longitude, list(venue.talks)]
+                for geohash, venue in zip(self.geohashes, self.venues)
+            ],
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, object]) -> "SpatialIndex":
+        if payload.get("version") != INDEX_VERSION or payload.get("precision") != INDEX_PRECISION:
+            raise ValueError("unsupported spatial index version")
+
+        index = cls(())
+        for geohash, location, latitude, longitude, talks in payload["entries"]:
+            index.geohashes.append(geohash)
+            index.venues.append(Venue(location, float(latitude), float(longitude), tuple(talks)))
+        return index
+
+
+def build_venues(points: Sequence[Sequence], talks_by_location: Dict[str, List[str]]) -> List[Venue]:
+    return [
+        Venue(
+            location=str(location),
+            latitude=float(latitude),
+            longitude=float(longitude),
+            talks=tuple(sorted(talks_by_location.get(location, ()))),
+        )
+        for location, latitude, longitude in points
+    ]
+
+
+def save_spatial_index(path: pathlib.Path, index: SpatialIndex) -> bool:
+    content = json.dumps(index.to_payload(), ensure_ascii=False, separators=(",", ":")) + "\n"
+    if path.exists() and path.read_text(encoding="utf-8") == content:
+        return False
+    atomic_write_text(path, content)
+    return True
+
+
+def load_spatial_index(path: pathlib.Path) -> SpatialIndex:
+    return SpatialIndex.from_payload(json.loads(path.read_text(encoding="utf-8")))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import tempfile
+from typing import Callable
+
+from sitegen.context import BuildContext
+from sitegen.fileio import default_mode, replace_directory
+
+
+def link_or_copy(source: str, destination: str) -> None:
+    try:
+        os.link(source, destination, follow_symlinks=False)
+    except OSError:
+        shutil.copy2(source, destination, follow_symlinks=False)
+
+
+class StagedDirectory:
+    """A sibling copy of an output directory that replaces it in one rename.
+
+    Existing files are hard-linked into the copy rather than copied, so a
+    generator that rewrites a few pages touches only those. Writers must
+    replace files (new inode) instead of rewriting them in place, or the
+    change would show through the link in the live directory.
+    """
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        self.directory = directory
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        self.path = pathlib.Path(
+            tempfile.mkdtemp(prefix=f".{directory.name}.staging-", dir=directory.parent)
+        )
+        os.chmod(self.path, default_mode(directory, 0o777))
+        if not directory.is_dir():
+            return
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    destination = os.path.join(self.path, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.copytree(entry.path, destination, symlinks=True, copy_function=link_or_copy)
+                    else:
+                        link_or_copy(entry.path, destination)
+        except BaseException:
+            self.discard()
+            raise
+
+    def commit(self) -> None:
+        previous = replace_directory(self.path, self.directory)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def discard(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def run_staged(
+    directory: pathlib.Path,
+    enabled: bool,
+    context: BuildContext | None,
+    run: Callable[[pathlib.Path], int],
+) -> int:
+    """Call ``run`` with the directory to write into.
+
+    When ``enabled``, that is a :class:`StagedDirectory` which replaces
+    ``directory`` only if ``run`` returns 0; otherwise the live directory is
+    left exactly as it was.
+    """
+    if not enabled:
+        return run(directory)
+
+    staged = StagedDirectory(directory)
+    try:
+        status = run(staged.path)
+        if status == 0:
+            staged.commit()
+    finally:
+        if staged.path.exists():
+            staged.discard()
+        if context:
+            context.forget(staged.path)
+            context.forget(directory)
+    return status
@@ -0,0 +1,969 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import pathlib
+import sys
+import time
+from stat import S_ISREG
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from sitegen.clusters import (
+    DEFAULT_MAX_ZOOM,
+    build_cluster_shards,
+    cluster_points_by_zoom,
+    remove_cluster_shards,
+    write_cluster_shards,
+)
+from sitegen.context import BuildContext, pipeline_stats
+from sitegen.fileio import atomic_write_bytes, atomic_write_text
+from sitegen.frontmatter import decode_text, parse_front_matter, read_front_matter, read_front_matter_lines
+from sitegen.geocache import (
+    GeocodeCacheStore,
+    export_json_cache,
+    failure_retry_at,
+    load_json_cache,
+    open_cache_store,
+    record_failure,
+)
+from sitegen.gazetteer import load_gazetteer
+from sitegen.instrumentation import PipelineStats, add_instrumentation_args, run_instrumented
+from sitegen.geocoding import (
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_WAIT,
+    GeocodeFunction,
+    GeocodeOutcome,
+    TokenBucket,
+    create_nominatim_geocoder,
+    geocode_concurrently,
+)
+from sitegen.locations import canonicalize_locations, load_alias_index, load_alias_table, save_alias_index
+from sitegen.spatial import SpatialIndex, Venue, build_venues, load_spatial_index, save_spatial_index
+from sitegen.text import REPO_ROOT
+
+SCAN_MANIFEST_VERSION = 2
+COLUMNAR_SCALE = 100000
+COLUMNAR_DECODER = (
+    "(function(c){for(var p=[],i=0;i<c.i.length;i++)"
+    "p.push([c.s[c.i[i]],c.a[i]/c.q,c.o[i]/c.q]);return p})"
+)
+
+
+def location_from_fields(fields: Dict[str, str]) -> str:
+    for key, value in fields.items():
+        if key.lower() == "location" and value.strip():
+            return value.strip()
+
+    return ""
+
+
+def extract_location(markdown_path: pathlib.Path) -> str:
+    return location_from_fields(read_front_matter(markdown_path))
+
+
+def read_locations_js(path: pathlib.Path) -> str:
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+
+    gzip_path = path.with_name(path.name + ".gz")
+    if gzip_path.exists():
+        return gzip.decompress(gzip_path.read_bytes()).decode("utf-8")
+
+    brotli_path = path.with_name(path.name + ".br")
+    if brotli_path.exists():
+        brotli = load_brotli()
+        if brotli is not None:
+            return brotli.decompress(brotli_path.read_bytes()).decode("utf-8")
+
+    return ""
+
+
+def parse_locations_js(text: str) -> List[list]:
+    if "=" not in text:
+        return []
+
+    _, payload = text.split("=", 1)
+    payload = payload.strip()
+    if payload.endswith(";"):
+        payload = payload[:-1].strip()
+
+    columnar = payload.startswith(COLUMNAR_DECODER)
+    if columnar:
+        payload = payload[len(COLUMNAR_DECODER) :].strip()
+        if payload.startswith("(") and payload.endswith(")"):
+            payload = payload[1:-1]
+
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return []
+
+    if not columnar:
+        return data if isinstance(data, list) else []
+
+    try:
+        scale = float(data["q"])
+        return [
+            [data["s"][name_index], latitude / scale, longitude / scale]
+            for name_index, latitude, longitude in zip(data["i"], data["a"], data["o"])
+        ]
+    except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+        return []
+
+
+def load_existing_output_cache(path: pathlib.Path) -> Dict[str, Dict[str, float]]:
+    points = parse_locations_js(read_locations_js(path))
+
+    cache: Dict[str, Dict[str, float]] = {}
+    for point in points:
+        if not isinstance(point, list) or len(point) < 3:
+            continue
+
+        location = str(point[0]).strip()
+        if not location:
+            continue
+
+        try:
+            latitude = float(point[1])
+            longitude = float(point[2])
+        except (TypeError, ValueError):
+            continue
+
+        cache[location] = {"latitude": latitude, "longitude": longitude}
+
+    return cache
+
+
+def seed_cache_store(
+    store: GeocodeCacheStore, backend: str, cache_file: pathlib.Path, output_js: pathlib.Path
+) -> int:
+    if backend == "json":
+        return store.insert_missing(load_existing_output_cache(output_js))
+
+    if not store.is_empty():
+        return 0
+
+    imported = store.insert_missing(load_json_cache(cache_file))
+    return imported + store.insert_missing(load_existing_output_cache(output_js))
+
+
+def load_scan_manifest(path: pathlib.Path, talks_dir: pathlib.Path) -> Dict[str, Dict[str, object]]:
+    if not path.exists():
+        return {}
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+    if not isinstance(payload, dict) or payload.get("version") != SCAN_MANIFEST_VERSION:
+        return {}
+
+    if payload.get("talks_dir") != str(talks_dir.resolve()):
+        return {}
+
+    files = payload.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_scan_manifest(
+    path: pathlib.Path, talks_dir: pathlib.Path, files: Dict[str, Dict[str, object]]
+) -> None:
+    payload = {"version": SCAN_MANIFEST_VERSION, "talks_dir": str(talks_dir.resolve()), "files": files}
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+def header_digest(header_lines: Iterable[bytes]) -> str:
+    return hashlib.blake2b(b"".join(header_lines), digest_size=16).hexdigest()
+
+
+def scan_talk_locations(
+    talks_dir: pathlib.Path,
+    manifest: Dict[str, Dict[str, object]],
+    rendered: Dict[str, tuple[str, str]] | None = None,
+    names: Iterable[str] | None = None,
+) -> tuple[Dict[str, Dict[str, object]], int]:
+    """Return manifest entries for every talk file and how many were parsed from disk.
+
+    ``rendered`` maps file names to ``(markdown, location)`` pairs the caller
+    has just written; those files are hashed from memory and never re-read.
+    ``names`` is an already known listing of ``talks_dir``.
+    """
+    rendered = rendered or {}
+    scanned: Dict[str, Dict[str, object]] = {}
+    parsed_files = 0
+
+    if names is None:
+        with os.scandir(talks_dir) as entries:
+            names = [entry.name for entry in entries]
+
+    for name in sorted(name for name in names if name.endswith(".md")):
+        path = talks_dir / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if not S_ISREG(stat.st_mode):
+            continue
+        previous = manifest.get(name)
+
+        if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+            scanned[name] = previous
+            continue
+
+        if name in rendered:
+            markdown, location = rendered[name]
+            header_lines = read_front_matter_lines(io.BytesIO(markdown.encode("utf-8"))) or []
+            scanned[name] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "hash": header_digest(header_lines),
+                "location": location,
+            }
+            continue
+
+        with open(path, "rb") as handle:
+            header_lines = read_front_matter_lines(handle) or []
+        digest = header_digest(header_lines)
+
+        if previous and previous.get("hash") == digest:
+            location = str(previous.get("location", ""))
+        else:
+            fields = parse_front_matter(decode_text(line) for line in header_lines)
+            location = location_from_fields(fields)
+            parsed_files += 1
+
+        scanned[name] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": digest,
+            "location": location,
+        }
+
+    return scanned, parsed_files
+
+
+def manifest_locations(files: Dict[str, Dict[str, object]]) -> List[str]:
+    return sorted({str(entry["location"]) for entry in files.values() if entry.get("location")})
+
+
+def load_locations(
+    talks_dir: pathlib.Path, manifest: Dict[str, Dict[str, object]] | None = None
+) -> List[str]:
+    scanned, _ = scan_talk_locations(talks_dir, manifest or {})
+    return manifest_locations(scanned)
+
+
+def apply_geocode_outcome(
+    outcome: GeocodeOutcome,
+    cache: Dict[str, Dict[str, float]],
+    failures: Dict[str, Dict[str, object]],
+    now: float,
+) -> bool:
+    if outcome.error:
+        print(f"WARNING geocode {outcome.location!r}: {outcome.error}", file=sys.stderr)
+
+    if outcome.coordinates is None:
+        # Transport errors are retried on the next run; only "not found" answers back off.
+        if not outcome.error:
+            failures[outcome.location] = record_failure(failures.get(outcome.location), now)
+        return False
+
+    latitude, longitude = outcome.coordinates
+    cache[outcome.location] = {"latitude": latitude, "longitude": longitude}
+    failures.pop(outcome.location, None)
+    return True
+
+
+def persist_cache_changes(
+    store: GeocodeCacheStore,
+    cache: Dict[str, Dict[str, float]],
+    cache_snapshot: Dict[str, Dict[str, float]],
+    failures: Dict[str, Dict[str, object]],
+    failures_snapshot: Dict[str, Dict[str, object]],
+) -> None:
+    store.upsert_many(
+        {
+            location: coordinates
+            for location, coordinates in cache.items()
+            if cache_snapshot.get(location) != coordinates
+        }
+    )
+    store.record_failures(
+        {
+            location: entry
+            for location, entry in failures.items()
+            if failures_snapshot.get(location) != entry
+        }
+    )
+    store.clear_failures(location for location in failures_snapshot if location not in failures)
+    store.flush()
+
+    cache_snapshot.clear()
+    cache_snapshot.update(cache)
+    failures_snapshot.clear()
+    failures_snapshot.update(failures)
+
+
+def geocode_missing_locations(
+    locations: List[str],
+    cache: Dict[str, Dict[str, float]],
+    user_agent: str,
+    min_delay: float,
+    lookup_limit: int,
+    workers: int = 1,
+    burst: int = 1,
+    endpoint: str = "",
+    failures: Dict[str, Dict[str, object]] | None = None,
+    failure_backoff: float = 0.0,
+    checkpoint: Callable[[], None] | None = None,
+    checkpoint_every: int = 0,
+    checkpoint_interval: float = 0.0,
+    geocode: GeocodeFunction | None = None,
+    stats: PipelineStats | None = None,
+    retries: int = DEFAULT_RETRIES,
+    retry_wait: float = DEFAULT_RETRY_WAIT,
+) -> tuple[int, int, int]:
+    missing_locations = [
+        location
+        for location in locations
+        if not cache.get(location) or "latitude" not in cache[location] or "longitude" not in cache[location]
+    ]
+
+    now = time.time()
+    failures = failures if failures is not None else {}
+    backing_off = {
+        location
+        for location in missing_locations
+        if location in failures and failure_retry_at(failures[location], failure_backoff) > now
+    }
+    missing_locations = [location for location in missing_locations if location not in backing_off]
+
+    if lookup_limit > 0:
+        missing_locations = missing_locations[:lookup_limit]
+
+    if not missing_locations:
+        return 0, 0, len(backing_off)
+
+    if geocode is None:
+        geocode = create_nominatim_geocoder(user_agent=user_agent, endpoint=endpoint, pool_size=workers)
+    if geocode is None:
+        print(
+            "ERROR: geopy is required for geocoding. Install it with `pip install geopy`.",
+            file=sys.stderr,
+        )
+        return 0, len(missing_locations), len(backing_off)
+
+    limiter = TokenBucket.from_min_delay(min_delay, burst=burst)
+
+    resolved = 0
+    unresolved = 0
+    since_checkpoint = 0
+    last_checkpoint = time.monotonic()
+
+    outcomes = geocode_concurrently(
+        missing_locations, geocode, limiter, concurrency=workers, retries=retries, retry_wait=retry_wait
+    )
+    for outcome in outcomes:
+        if stats:
+            stats.add("rate_limit_wait", outcome.waited)
+        if apply_geocode_outcome(outcome, cache, failures, now):
+            resolved += 1
+        else:
+            unresolved += 1
+
+        if checkpoint is None:
+            continue
+
+        since_checkpoint += 1
+        due_by_count = checkpoint_every > 0 and since_checkpoint >= checkpoint_every
+        due_by_time = checkpoint_interval > 0 and time.monotonic() - last_checkpoint >= checkpoint_interval
+        if due_by_count or due_by_time:
+            checkpoint()
+            since_checkpoint = 0
+            last_checkpoint = time.monotonic()
+
+    return resolved, unresolved, len(backing_off)
+
+
+def build_address_points(
+    locations: List[str], cache: Dict[str, Dict[str, float]]
+) -> tuple[List[List[float]], int]:
+    points: List[List[float]] = []
+    unresolved = 0
+
+    for location in locations:
+        location_data = cache.get(location)
+        if not location_data:
+            unresolved += 1
+            continue
+
+        latitude = location_data.get("latitude")
+        longitude = location_data.get("longitude")
+
+        if latitude is None or longitude is None:
+            unresolved += 1
+            continue
+
+        points.append([location, float(latitude), float(longitude)])
+
+    return points, unresolved
+
+
+def load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def render_locations_js(points: List[List[float]], layout: str = "pretty") -> str:
+    if layout == "pretty":
+        return "var addressPoints = " + json.dumps(points, ensure_ascii=False, indent=2) + ";\n"
+
+    if layout != "columnar":
+        raise ValueError(f"unknown output layout: {layout}")
+
+    names: Dict[str, int] = {}
+    columns = {"q": COLUMNAR_SCALE, "s": [], "i": [], "a": [], "o": []}
+    for location, latitude, longitude in points:
+        if location not in names:
+            names[location] = len(columns["s"])
+            columns["s"].append(location)
+        columns["i"].append(names[location])
+        columns["a"].append(round(float(latitude) * COLUMNAR_SCALE))
+        columns["o"].append(round(float(longitude) * COLUMNAR_SCALE))
+
+    payload = json.dumps(columns, ensure_ascii=False, separators=(",", ":"))
+    return f"var addressPoints={COLUMNAR_DECODER}({payload});\n"
+
+
+def write_locations_js(
+    path: pathlib.Path,
+    points: List[List[float]],
+    layout: str = "pretty",
+    compressions: Iterable[str] = (),
+) -> Dict[str, int]:
+    data = render_locations_js(points, layout).encode("utf-8")
+    atomic_write_bytes(path, data)
+    sizes = {"js": len(data)}
+
+    requested = set(compressions)
+    for compression, suffix in (("gzip", ".gz"), ("brotli", ".br")):
+        sibling = path.with_name(path.name + suffix)
+        if compression not in requested:
+            if sibling.exists():
+                sibling.unlink()
+            continue
+
+        if compression == "gzip":
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            brotli = load_brotli()
+            if brotli is None:
+                print(
+                    "WARNING: brotli is not installed; skipping .br output. "
+                    "Install it with `pip install brotli`.",
+                    file=sys.stderr,
+                )
+                # A .br left from an earlier run would no longer match the .js beside it.
+                if sibling.exists():
+                    sibling.unlink()
+                continue
+            compressed = brotli.compress(data, quality=11)
+
+        atomic_write_bytes(sibling, compressed)
+        sizes[compression] = len(compressed)
+
+    return sizes
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate talk map data from location fields in talk markdown files."
+    )
+    parser.add_argument(
+        "--talks-dir",
+        default=str(REPO_ROOT / "_talks"),
+        help="Directory containing talk markdown files.",
+    )
+    parser.add_argument(
+        "--output-js",
+        default=str(REPO_ROOT / "talkmap/org-locations.js"),
+        help="Path to generated JavaScript data file.",
+    )
+    parser.add_argument(
+        "--cache-file",
+        default=str(REPO_ROOT / "talkmap/geocode-cache.json"),
+        help="Path to geocode cache JSON file.",
+    )
+    parser.add_argument(
+        "--aliases-file",
+        default=str(REPO_ROOT / "talkmap/location-aliases.json"),
+        help=(
+            "Optional JSON object mapping location variants to a canonical location, "
+            'e.g. {"NYC": "New York, USA"}.'
+        ),
+    )
+    parser.add_argument(
+        "--alias-index",
+        default=str(REPO_ROOT / "talkmap/.location-index.json"),
+        help="Path to the persistent index mapping normalized location keys to their canonical spelling.",
+    )
+    parser.add_argument(
+        "--cache-backend",
+        choices=("json", "sqlite"),
+        default="json",
+        help="Geocode cache storage. sqlite imports the JSON cache and output file on first use.",
+    )
+    parser.add_argument(
+        "--cache-db",
+        default=str(REPO_ROOT / "talkmap/.geocode-cache.sqlite"),
+        help="Path to the SQLite geocode cache used with --cache-backend sqlite.",
+    )
+    parser.add_argument(
+        "--export-cache",
+        action="store_true",
+        help="With --cache-backend sqlite, also write the full cache to --cache-file as JSON.",
+    )
+    parser.add_argument(
+        "--scan-manifest",
+        default=str(REPO_ROOT / "talkmap/.scan-manifest.json"),
+        help="Path to the manifest used to skip re-parsing unchanged talk files.",
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Ignore the scan manifest and re-parse every talk file.",
+    )
+    parser.add_argument(
+        "--user-agent",
+        default="smile232323-talkmap-generator",
+        help="Nominatim user-agent used for geocoding requests.",
+    )
+    parser.add_argument(
+        "--min-delay",
+        type=float,
+        default=1.1,
+        help="Minimum delay in seconds between geocode requests.",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Number of geocode requests allowed back to back before --min-delay applies.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of geocode requests in flight at once.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retry a lookup this many times after a timeout, server error or rate limit.",
+    )
+    parser.add_argument(
+        "--retry-wait",
+        type=float,
+        default=DEFAULT_RETRY_WAIT,
+        help="Seconds to wait before retrying a failed lookup, unless the server says otherwise.",
+    )
+    parser.add_argument(
+        "--geocoder",
+        choices=("nominatim", "offline"),
+        default="nominatim",
+        help="Geocoding backend. offline answers from --gazetteer without network access.",
+    )
+    parser.add_argument(
+        "--gazetteer",
+        default="",
+        help=(
+            "GeoNames-style TSV or prebuilt .idx file used by --geocoder offline. "
+            "A TSV is indexed once into a sibling .idx file."
+        ),
+    )
+    parser.add_argument(
+        "--geocoder-url",
+        default="",
+        help="Base URL of a Nominatim-compatible server to use instead of the public one.",
+    )
+    parser.add_argument(
+        "--lookup-limit",
+        type=int,
+        default=0,
+        help="Maximum number of uncached locations to geocode in this run. 0 means no limit.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=25,
+        help="Save the geocode cache after this many lookups. 0 disables count-based checkpoints.",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=30.0,
+        help="Save the geocode cache at least this often in seconds. 0 disables time-based checkpoints.",
+    )
+    parser.add_argument(
+        "--failures-file",
+        default=str(REPO_ROOT / "talkmap/.geocode-failures.json"),
+        help="Path to the JSON file recording locations the geocoder could not resolve.",
+    )
+    parser.add_argument(
+        "--failure-backoff",
+        type=float,
+        default=24.0,
+        help="Hours to wait before retrying an unresolvable location; doubles after each failed retry.",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Retry previously unresolvable locations now instead of waiting for their backoff to expire.",
+    )
+    parser.add_argument(
+        "--skip-geocode",
+        action="store_true",
+        help="Do not call external geocoding APIs; use cache only.",
+    )
+    parser.add_argument(
+        "--output-layout",
+        choices=("pretty", "columnar"),
+        default="pretty",
+        help=(
+            "Layout of --output-js: pretty-printed points, or a minified string table with "
+            "fixed-point coordinate columns."
+        ),
+    )
+    parser.add_argument(
+        "--output-compression",
+        nargs="*",
+        choices=("gzip", "brotli"),
+        default=(),
+        help="Also write precompressed .gz and/or .br siblings of --output-js.",
+    )
+    parser.add_argument(
+        "--write-clusters",
+        action="store_true",
+        help="Also write per-zoom pre-clustered marker shards that map.html loads by viewport.",
+    )
+    parser.add_argument(
+        "--clusters-dir",
+        default=str(REPO_ROOT / "talkmap/clusters"),
+        help="Directory for the per-zoom cluster shards written by --write-clusters; emptied without it.",
+    )
+    parser.add_argument(
+        "--max-cluster-zoom",
+        type=int,
+        default=DEFAULT_MAX_ZOOM,
+        help="Highest zoom level to precompute clusters for.",
+    )
+    parser.add_argument(
+        "--allow-empty-output",
+        action="store_true",
+        help="Allow writing an empty addressPoints list when no coordinates are resolved.",
+    )
+    parser.add_argument(
+        "--spatial-index",
+        default=str(REPO_ROOT / "talkmap/.spatial-index.json"),
+        help="Path to the geohash index of venues and their talks used by the query subcommand.",
+    )
+    add_instrumentation_args(parser)
+
+    subparsers = parser.add_subparsers(dest="command")
+    query_parser = subparsers.add_parser(
+        "query",
+        help="Query venues and talks by location from the spatial index written by the last run.",
+        description="Query venues and talks by location. Results are printed as JSON.",
+    )
+    query_parser.add_argument(
+        "--index",
+        default=str(REPO_ROOT / "talkmap/.spatial-index.json"),
+        help="Path to the spatial index written by talkmap.py.",
+    )
+    query_parser.add_argument(
+        "--near",
+        metavar="LAT,LON",
+        help="Reference point for --radius and --nearest.",
+    )
+    query_parser.add_argument(
+        "--radius",
+        type=float,
+        metavar="KM",
+        help="Return venues within KM of --near.",
+    )
+    query_parser.add_argument(
+        "--nearest",
+        type=int,
+        metavar="K",
+        help="Return the K venues closest to --near.",
+    )
+    query_parser.add_argument(
+        "--bbox",
+        metavar="SOUTH,WEST,NORTH,EAST",
+        help="Return venues inside the bounding box (WEST > EAST crosses the antimeridian).",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_coordinates(value: str, count: int) -> List[float]:
+    parts = [part.strip() for part in value.split(",")]
+    if len(parts) != count:
+        raise ValueError(f"expected {count} comma-separated numbers: {value}")
+    return [float(part) for part in parts]
+
+
+def venue_result(venue: Venue, distance_km: float | None = None) -> Dict[str, object]:
+    result: Dict[str, object] = {
+        "location": venue.location,
+        "latitude": venue.latitude,
+        "longitude": venue.longitude,
+        "talks": list(venue.talks),
+    }
+    if distance_km is not None:
+        result["distance_km"] = round(distance_km, 3)
+    return result
+
+
+def run_query(args: argparse.Namespace) -> int:
+    try:
+        index = load_spatial_index(pathlib.Path(args.index))
+    except (OSError, ValueError) as error:
+        print(
+            f"ERROR: cannot load spatial index {args.index}: {error}; run talkmap.py first",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        if args.bbox:
+            south, west, north, east = parse_coordinates(args.bbox, 4)
+            results = [venue_result(venue) for venue in index.within_bbox(south, west, north, east)]
+        elif args.near and args.radius is not None:
+            latitude, longitude = parse_coordinates(args.near, 2)
+            matches = index.within_radius(latitude, longitude, args.radius)
+            results = [venue_result(venue, distance) for distance, venue in matches]
+        elif args.near and args.nearest is not None:
+            latitude, longitude = parse_coordinates(args.near, 2)
+            matches = index.nearest(latitude, longitude, args.nearest)
+            results = [venue_result(venue, distance) for distance, venue in matches]
+        else:
+            print("ERROR: use --bbox, or --near with --radius or --nearest", file=sys.stderr)
+            return 1
+    except ValueError as error:
+        print(f"ERROR: {error}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_talkmap(
+    args: argparse.Namespace,
+    rendered: Dict[str, tuple[str, str]] | None = None,
+    context: BuildContext | None = None,
+) -> int:
+    talks_dir = pathlib.Path(args.talks_dir)
+    output_js = pathlib.Path(args.output_js)
+    cache_file = pathlib.Path(args.cache_file)
+
+    if args.workers < 1 or args.burst < 1:
+        print("ERROR: --workers and --burst must be at least 1", file=sys.stderr)
+        return 1
+    if args.retries < 0 or args.retry_wait < 0:
+        print("ERROR: --retries and --retry-wait must not be negative", file=sys.stderr)
+        return 1
+
+    if not talks_dir.exists():
+        print(f"talkmap: talks directory not found: {talks_dir}; skip updating {output_js}")
+        return 0
+
+    stats = pipeline_stats(context, "talkmap")
+    scan_manifest_path = pathlib.Path(args.scan_manifest)
+    with stats.phase("cache_load"):
+        previous_manifest = {} if args.full_scan else load_scan_manifest(scan_manifest_path, talks_dir)
+    names = context.listing(talks_dir) if context else None
+    # Files whose stat still matches the scan manifest are not re-read.
+    with stats.phase("read"):
+        scanned_files, parsed_files = scan_talk_locations(talks_dir, previous_manifest, rendered, names)
+    if scanned_files != previous_manifest:
+        with stats.phase("cache_save"):
+            save_scan_manifest(scan_manifest_path, talks_dir, scanned_files)
+
+    talk_locations = manifest_locations(scanned_files)
+
+    try:
+        with stats.phase("cache_load"):
+            aliases = load_alias_table(pathlib.Path(args.aliases_file))
+    except ValueError as error:
+        print(f"ERROR: invalid location alias table: {error}", file=sys.stderr)
+        return 1
+
+    offline_geocode: GeocodeFunction | None = None
+    if args.geocoder == "offline" and not args.skip_geocode:
+        if not args.gazetteer:
+            print("ERROR: --geocoder offline requires --gazetteer", file=sys.stderr)
+            return 1
+        try:
+            with stats.phase("cache_load"):
+                offline_geocode = load_gazetteer(pathlib.Path(args.gazetteer)).geocode
+        except (OSError, ValueError) as error:
+            print(f"ERROR: cannot load gazetteer: {error}", file=sys.stderr)
+            return 1
+
+    alias_index_path = pathlib.Path(args.alias_index)
+    with stats.phase("cache_load"):
+        alias_index = load_alias_index(alias_index_path)
+    alias_index_before = dict(alias_index)
+
+    store_path = cache_file if args.cache_backend == "json" else pathlib.Path(args.cache_db)
+
+    with open_cache_store(args.cache_backend, store_path, pathlib.Path(args.failures_file)) as store:
+        with stats.phase("cache_load"):
+            seed_cache_store(store, args.cache_backend, cache_file, output_js)
+            cached_variants = store.get_many(talk_locations)
+
+        with stats.phase("canonicalize"):
+            canonical_locations = canonicalize_locations(
+                talk_locations, aliases, alias_index, cached=cached_variants
+            )
+        locations = sorted(set(canonical_locations.values()))
+        if alias_index != alias_index_before:
+            with stats.phase("cache_save"):
+                save_alias_index(alias_index_path, alias_index)
+
+        with stats.phase("cache_load"):
+            cache = store.get_many(locations)
+            cache_snapshot = dict(cache)
+            failures = store.get_failures(location for location in locations if location not in cache)
+            failures_snapshot = dict(failures)
+
+        def checkpoint() -> None:
+            with stats.phase("cache_save"):
+                persist_cache_changes(store, cache, cache_snapshot, failures, failures_snapshot)
+
+        resolved = 0
+        geocode_unresolved = 0
+        negative_skipped = 0
+
+        try:
+            if not args.skip_geocode:
+                # Includes checkpoint saves and the time lookups wait for the rate limiter.
+                with stats.phase("geocode"):
+                    resolved, geocode_unresolved, negative_skipped = geocode_missing_locations(
+                        locations=locations,
+                        cache=cache,
+                        user_agent=args.user_agent,
+                        min_delay=0.0 if offline_geocode else args.min_delay,
+                        lookup_limit=args.lookup_limit,
+                        workers=1 if offline_geocode else args.workers,
+                        burst=args.burst,
+                        endpoint=args.geocoder_url,
+                        failures=failures,
+                        failure_backoff=0.0 if args.retry_failed else args.failure_backoff * 3600,
+                        checkpoint=checkpoint,
+                        checkpoint_every=args.checkpoint_every,
+                        checkpoint_interval=args.checkpoint_interval,
+                        geocode=offline_geocode,
+                        stats=stats,
+                        retries=args.retries,
+                        retry_wait=args.retry_wait,
+                    )
+        finally:
+            checkpoint()
+
+        if args.export_cache and args.cache_backend == "sqlite":
+            with stats.phase("cache_save"):
+                export_json_cache(store, cache_file)
+
+    with stats.phase("render"):
+        points, unresolved_from_cache = build_address_points(locations, cache)
+
+    if locations and not points and not args.allow_empty_output:
+        print(
+            f"talkmap: locations={len(locations)} points=0 unresolved={len(locations)}; "
+            f"skip updating {output_js} (use --allow-empty-output to force)"
+        )
+        return 0
+
+    with stats.phase("write"):
+        output_sizes = write_locations_js(output_js, points, args.output_layout, args.output_compression)
+    output_summary = f" output_bytes={output_sizes['js']}"
+    if args.output_layout != "pretty":
+        # Rendering the pretty layout again only to size it is skipped when that is what was written.
+        with stats.phase("render"):
+            pretty_size = len(render_locations_js(points).encode("utf-8"))
+        # The columnar decoder can outweigh its savings on a handful of points.
+        output_summary += f" saved_bytes={max(pretty_size - output_sizes['js'], 0)}"
+    for compression in ("gzip", "brotli"):
+        if compression in output_sizes:
+            output_summary += f" {compression}_bytes={output_sizes[compression]}"
+
+    talks_by_location: Dict[str, List[str]] = {}
+    for talk_file, entry in scanned_files.items():
+        canonical = canonical_locations.get(str(entry.get("location", "")))
+        if canonical:
+            talks_by_location.setdefault(canonical, []).append(talk_file)
+    with stats.phase("render"):
+        venues = build_venues(points, talks_by_location)
+    with stats.phase("write"):
+        save_spatial_index(pathlib.Path(args.spatial_index), SpatialIndex(venues))
+
+    cluster_summary = ""
+    if args.write_clusters:
+        with stats.phase("render"):
+            clusters_by_zoom = cluster_points_by_zoom(points, max_zoom=args.max_cluster_zoom)
+            shards, shard_index = build_cluster_shards(clusters_by_zoom)
+        with stats.phase("write"):
+            written_shards, removed_shards = write_cluster_shards(
+                pathlib.Path(args.clusters_dir), shards, shard_index
+            )
+        cluster_summary = (
+            f" cluster_shards={len(shards)} shards_written={written_shards} shards_removed={removed_shards}"
+        )
+    elif pathlib.Path(args.clusters_dir).exists():
+        # map.html prefers shards whenever clusters/index.json exists, so leftovers would show stale markers.
+        with stats.phase("write"):
+            removed_shards = remove_cluster_shards(pathlib.Path(args.clusters_dir))
+        cluster_summary = f" shards_removed={removed_shards}"
+
+    unresolved_total = geocode_unresolved + unresolved_from_cache
+    stats.count(
+        locations=len(locations),
+        points=len(points),
+        new_geocodes=resolved,
+        unresolved=unresolved_total,
+        negative_skipped=negative_skipped,
+        talk_files=len(scanned_files),
+        parsed=parsed_files,
+    )
+    print(
+        f"talkmap: locations={len(locations)} points={len(points)} "
+        f"new_geocodes={resolved} unresolved={unresolved_total} "
+        f"negative_skipped={negative_skipped} variants={len(talk_locations)} "
+        f"talk_files={len(scanned_files)} parsed={parsed_files}{output_summary}{cluster_summary}"
+    )
+
+    return 0
+
+
+def main(argv: Sequence[str] | None = None, context: BuildContext | None = None) -> int:
+    args = parse_args(argv)
+
+    context = context or BuildContext()
+    if args.command == "query":
+        return run_instrumented(args, context.stats, "talkmap", lambda: run_query(args))
+
+    return run_instrumented(args, context.stats, "talkmap", lambda: run_talkmap(args, context=context))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import pathlib
+import shlex
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sitegen.context import BuildContext, directory_listing, output_manifest, pipeline_stats
+from sitegen.instrumentation import add_instrumentation_args, run_instrumented
+from sitegen.parallel import render_rows, write_outputs
+from sitegen.rowindex import (
+    RowIndex,
+    generator_fingerprint,
+    keep_skipped_rows,
+    row_fingerprint,
+    row_index_path,
+    stale_outputs,
+)
+from sitegen.staging import run_staged
+from sitegen.text import GENERATOR_DIR, REPO_ROOT, normalize, parse_iso_date, slugify, yaml_quote
+from sitegen.validation import report_problems, validate_rows
+
+REQUIRED_COLUMNS = ("title", "date")
+RENDERER_FILES = (pathlib.Path(__file__), pathlib.Path(__file__).with_name("text.py"))
+
+
+def output_slug(row: Dict[str, str]) -> str:
+    return normalize(row.get("url_slug")) or slugify(normalize(row.get("title")), "talk")
+
+
+def output_filename(row: Dict[str, str]) -> str:
+    return f"{normalize(row.get('date'))}-{output_slug(row)}.md"
+
+
+def render_markdown(row: Dict[str, str]) -> tuple[str, str]:
+    talk_date = parse_iso_date(normalize(row.get("date")))
+    title = normalize(row.get("title"))
+    talk_type = normalize(row.get("type")) or "Talk"
+    venue = normalize(row.get("venue"))
+    location = normalize(row.get("location"))
+    talk_url = normalize(row.get("talk_url"))
+    description = normalize(row.get("description"))
+    url_slug = output_slug(row)
+
+    html_filename = f"{talk_date}-{url_slug}"
+    md_filename = f"{html_filename}.md"
+
+    front_matter = [
+        "---",
+        f"title: {yaml_quote(title)}",
+        "collection: talks",
+        f"type: {yaml_quote(talk_type)}",
+        f"permalink: /talks/{html_filename}",
+        f"date: {talk_date}",
+    ]
+
+    if venue:
+        front_matter.append(f"venue: {yaml_quote(venue)}")
+    if location:
+        front_matter.append(f"location: {yaml_quote(location)}")
+
+    front_matter.append("---")
+
+    body = []
+    if talk_url:
+        body.append(f"[More information here]({talk_url})")
+    if description:
+        body.append(description)
+
+    markdown = "\n".join(front_matter)
+    if body:
+        markdown += "\n\n" + "\n\n".join(body)
+    markdown = markdown.rstrip() + "\n"
+
+    return md_filename, markdown
+
+
+def row_key(row: Dict[str, str]) -> str:
+    url_slug = normalize(row.get("url_slug"))
+    if url_slug:
+        return f"slug:{url_slug}"
+    return f"date:{normalize(row.get('date'))}|{normalize(row.get('title'))}"
+
+
+def process_file(
+    input_path: pathlib.Path,
+    output_dir: pathlib.Path,
+    dry_run: bool,
+    rendered: Dict[str, tuple[str, str]] | None = None,
+    full_rebuild: bool = False,
+    jobs: int = 1,
+    context: BuildContext | None = None,
+    validation_report: Optional[pathlib.Path] = None,
+) -> int:
+    stats = pipeline_stats(context, "talks")
+    with stats.phase("read"), input_path.open("r", encoding="utf-8-sig", newline="") as file_handle:
+        text = file_handle.read()
+    with stats.phase("parse"):
+        reader = csv.DictReader(io.StringIO(text, newline=""), delimiter="\t")
+        rows = list(reader)
+    if not reader.fieldnames:
+        print("ERROR: TSV header is missing.", file=sys.stderr)
+        return 1
+
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing_columns:
+        print(f"ERROR: Missing required TSV columns: {', '.join(missing_columns)}", file=sys.stderr)
+        return 1
+
+    with stats.phase("validate"):
+        problems = validate_rows(rows, REQUIRED_COLUMNS, "date", output_filename)
+    report_problems("talks", problems, len(rows), validation_report)
+
+    with stats.phase("cache_load"):
+        manifest = output_manifest(context, output_dir)
+        index = RowIndex(
+            row_index_path(output_dir, input_path), generator_fingerprint(*RENDERER_FILES)
+        )
+        if full_rebuild:
+            index.reusable = False
+        existing_files = directory_listing(context, output_dir)
+    current_rows: Dict[str, Dict[str, str]] = {}
+    key_counts: Dict[str, int] = {}
+    skipped_keys: List[str] = []
+
+    seen_filenames = set()
+    total_rows = 0
+    skipped_rows = 0
+    written_files = 0
+    unchanged_files = 0
+    added_rows = 0
+    changed_rows = 0
+    untouched_rows = 0
+
+    # (row_index, key, fingerprint, reused index entry, render queue position)
+    steps: List[tuple] = []
+    render_queue: List[Dict[str, str]] = []
+    checked_rows = 0
+    detect_seconds = 0.0
+
+    for row_index, row in enumerate(rows, start=2):
+        total_rows += 1
+        key = row_key(row)
+        key_counts[key] = key_counts.get(key, 0) + 1
+        if key_counts[key] > 1:
+            key = f"{key}#{key_counts[key]}"
+
+        if row_index in problems:
+            skipped_keys.append(key)
+            skipped_rows += 1
+            continue
+
+        detect_started = time.perf_counter()
+        fingerprint = row_fingerprint(row)
+        previous = index.reusable_entry(key, fingerprint)
+        reusable = previous and previous["file"] in existing_files
+        detect_seconds += time.perf_counter() - detect_started
+        checked_rows += 1
+        if reusable:
+            steps.append((row_index, key, fingerprint, previous, -1))
+        else:
+            steps.append((row_index, key, fingerprint, None, len(render_queue)))
+            render_queue.append(row)
+
+    stats.add("change_detect", detect_seconds, calls=checked_rows)
+    with stats.phase("render"):
+        render_results = render_rows(render_markdown, render_queue, jobs)
+    writes: List[tuple[pathlib.Path, str]] = []
+
+    # Warnings and duplicate detection run in row order whatever the number of jobs.
+    for row_index, key, fingerprint, reused, position in steps:
+        if reused:
+            md_filename = reused["file"]
+        else:
+            result, error = render_results[position]
+            if result is None:
+                skipped_keys.append(key)
+                skipped_rows += 1
+                print(f"WARNING row {row_index}: {error}", file=sys.stderr)
+                continue
+            md_filename, markdown = result
+
+        # validate_rows already rejected rows sharing an output filename, so this only catches a
+        # reused row-index entry whose recorded file another row now renders to.
+        if md_filename in seen_filenames:
+            skipped_keys.append(key)
+            skipped_rows += 1
+            print(f"WARNING row {row_index}: duplicate output filename {md_filename}", file=sys.stderr)
+            continue
+
+        seen_filenames.add(md_filename)
+
+        if reused:
+            current_rows[key] = reused
+            untouched_rows += 1
+            continue
+
+        if rendered is not None:
+            rendered[md_filename] = (markdown, normalize(render_queue[position].get("location")))
+
+        writes.append((output_dir / md_filename, markdown))
+        current_rows[key] = {"hash": fingerprint, "file": md_filename}
+        if key in index.rows:
+            changed_rows += 1
+        else:
+            added_rows += 1
+
+    for status in write_outputs(manifest, writes, dry_run=dry_run, jobs=jobs, stats=stats):
+        if status == "unchanged":
+            unchanged_files += 1
+        else:
+            written_files += 1
+
+    keep_skipped_rows(index.rows, current_rows, skipped_keys)
+    removed_rows, stale_files = stale_outputs(index.rows, current_rows, seen_filenames)
+    if not dry_run:
+        existing_files.update(path.name for path, _ in writes)
+        with stats.phase("write"):
+            for stale_file in stale_files:
+                manifest.remove(output_dir / stale_file)
+                existing_files.discard(stale_file)
+        with stats.phase("cache_save"):
+            manifest.save()
+            index.save(current_rows)
+
+    stats.count(
+        rows=total_rows,
+        added=added_rows,
+        changed=changed_rows,
+        removed=removed_rows,
+        untouched=untouched_rows,
+        written=written_files,
+        unchanged=unchanged_files,
+        skipped=skipped_rows,
+    )
+    mode_text = "dry-run" if dry_run else "write"
+    print(
+        f"talks: mode={mode_text} rows={total_rows} added={added_rows} changed={changed_rows} "
+        f"removed={removed_rows} untouched={untouched_rows} written={written_files} "
+        f"unchanged={unchanged_files} skipped={skipped_rows}"
+    )
+
+    return 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate talk markdown files from a TSV source.")
+    parser.add_argument(
+        "--input",
+        default=str(GENERATOR_DIR / "talks.tsv"),
+        help="Path to the talks TSV file.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=str(REPO_ROOT / "_talks"),
+        help="Directory where generated markdown files are written.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate and render without writing files.",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Re-render every row instead of only rows that changed since the last run.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render rows in this many processes and write files from this many threads.",
+    )
+    parser.add_argument(
+        "--talkmap",
+        action="store_true",
+        help="Also update the talk map from the rows parsed here instead of re-reading the markdown files.",
+    )
+    parser.add_argument(
+        "--talkmap-args",
+        default="",
+        help="Extra talkmap.py options for --talkmap, as one string (e.g. --talkmap-args='--skip-geocode').",
+    )
+    parser.add_argument(
+        "--validation-report",
+        help="Write every row rejected by validation, with the reason, as JSON to this file.",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help=(
+            "Write into a hard-linked copy of the output directory and swap it in with one rename, "
+            "so a concurrent site build never sees a half-updated collection."
+        ),
+    )
+    add_instrumentation_args(parser)
+    return parser.parse_args(argv)
+
+
+def run_talkmap(
+    output_dir: pathlib.Path,
+    rendered: Dict[str, tuple[str, str]],
+    extra_args: str,
+    context: BuildContext | None = None,
+) -> int:
+    from sitegen import talkmap
+
+    talkmap_args = talkmap.parse_args([*shlex.split(extra_args), "--talks-dir", str(output_dir)])
+    return talkmap.run_talkmap(talkmap_args, rendered=rendered, context=context)
+
+
+def main(argv: Sequence[str] | None = None, context: BuildContext | None = None) -> int:
+    args = parse_args(argv)
+    input_path = pathlib.Path(args.input)
+    output_dir = pathlib.Path(args.output_dir)
+
+    if not input_path.exists():
+        print(f"ERROR: Input TSV does not exist: {input_path}", file=sys.stderr)
+        return 1
+
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1", file=sys.stderr)
+        return 1
+
+    context = context or BuildContext()
+    rendered: Dict[str, tuple[str, str]] | None = {} if args.talkmap else None
+
+    def run() -> int:
+        status = run_staged(
+            output_dir,
+            args.staged and not args.dry_run,
+            context,
+            lambda target_dir: process_file(
+                input_path=input_path,
+                output_dir=target_dir,
+                dry_run=args.dry_run,
+                rendered=rendered,
+                full_rebuild=args.full_rebuild,
+                jobs=args.jobs,
+                context=context,
+                validation_report=pathlib.Path(args.validation_report) if args.validation_report else None,
+            ),
+        )
+        if status != 0 or rendered is None:
+            return status
+
+        if args.dry_run:
+            print("talkmap: skipped in dry-run mode")
+            return 0
+
+        return run_talkmap(output_dir, rendered, args.talkmap_args, context)
+
+    return run_instrumented(args, context.stats, "talks", run)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import datetime as dt
+import pathlib
+import re
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+GENERATOR_DIR = REPO_ROOT / "markdown_generator"
+
+
+def normalize(value: object) -> str:
+    if value is None:
+        return ""
+    text = str(value).strip()
+    return "" if text.lower() in {"nan", "none"} else text
+
+
+def slugify(text: str, fallback: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug or fallback
+
+
+def yaml_quote(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def parse_iso_date(value: str) -> str:
+    dt.date.fromisoformat(value)
+    return value
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import pathlib
+import sys
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sitegen.fileio import atomic_write_text
+from sitegen.text import normalize
+
+# TSV line number of each rejected row (the first data row is 2, as in warnings) and why.
+Problems = Dict[int, str]
+
+
+def date_error(value: str) -> str:
+    try:
+        dt.date.fromisoformat(value)
+    except ValueError as error:
+        return str(error)
+    return ""
+
+
+def invalid_dates(dates: Sequence[str]) -> Dict[int, str]:
+    """Positions of values ``date.fromisoformat`` rejects, with its message.
+
+    Each distinct value is parsed once, however many rows share it.
+    """
+    errors: Dict[str, str] = {}
+    problems = {}
+    for position, value in enumerate(dates):
+        if value not in errors:
+            errors[value] = date_error(value)
+        if errors[value]:
+            problems[position] = errors[value]
+    return problems
+
+
+def repeated_values(values: Sequence[str]) -> Dict[int, int]:
+    """Map each position whose value already occurred to the position where it first did."""
+    seen: Dict[str, int] = {}
+    repeated = {}
+    for position, value in enumerate(values):
+        first = seen.setdefault(value, position)
+        if first != position:
+            repeated[position] = first
+    return repeated
+
+
+def missing_values(columns: Dict[str, List[str]], size: int) -> Dict[int, List[str]]:
+    """Positions with an empty value in any of ``columns``, with the names of those columns."""
+    missing: Dict[int, List[str]] = {}
+    for name, values in columns.items():
+        for position in range(size):
+            if not values[position]:
+                missing.setdefault(position, []).append(name)
+    return missing
+
+
+def validate_rows(
+    rows: Sequence[Dict[str, str]],
+    required_columns: Sequence[str],
+    date_column: str,
+    output_filename: Callable[[Dict[str, str]], str],
+) -> Problems:
+    """Check all rows column by column before anything is rendered.
+
+    A row is rejected for an empty required value, a date that is not ISO
+    ``YYYY-MM-DD``, or an output filename an earlier valid row already has.
+    Each row gets at most one problem, in that order, so the first valid row
+    keeps a contested filename.
+    """
+    columns = {name: [normalize(row.get(name)) for row in rows] for name in required_columns}
+    problems: Problems = {
+        position + 2: f"missing required values: {', '.join(names)}"
+        for position, names in missing_values(columns, len(rows)).items()
+    }
+
+    candidates = [position for position in range(len(rows)) if position + 2 not in problems]
+    dates = columns.get(date_column) or [normalize(row.get(date_column)) for row in rows]
+    for index, error in invalid_dates([dates[position] for position in candidates]).items():
+        problems[candidates[index] + 2] = error
+
+    candidates = [position for position in candidates if position + 2 not in problems]
+    filenames = [output_filename(rows[position]) for position in candidates]
+    for index, first in repeated_values(filenames).items():
+        problems[candidates[index] + 2] = (
+            f"duplicate output filename {filenames[index]} (first used by row {candidates[first] + 2})"
+        )
+    return dict(sorted(problems.items()))
+
+
+def report_problems(
+    pipeline: str, problems: Problems, total_rows: int, report_path: Optional[pathlib.Path] = None
+) -> None:
+    """Print all problems as one block in row order, and save them as JSON when asked."""
+    if problems:
+        print(
+            f"WARNING {pipeline}: {len(problems)} of {total_rows} rows failed validation and are skipped",
+            file=sys.stderr,
+        )
+        for row_index, message in problems.items():
+            print(f"WARNING row {row_index}: {message}", file=sys.stderr)
+
+    if report_path is not None:
+        report = {
+            "pipeline": pipeline,
+            "rows": total_rows,
+            "problems": [{"row": row_index, "message": message} for row_index, message in problems.items()],
+        }
+        atomic_write_text(report_path, json.dumps(report, ensure_ascii=False, indent=2) + "\n")
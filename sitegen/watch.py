@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import select
+import shlex
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sitegen.context import BuildContext
+from sitegen.text import GENERATOR_DIR
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+TARGET_NAMES = ("publications", "pubsFromBib", "talks", "talkmap")
+
+
+@dataclass(frozen=True)
+class WatchTarget:
+    """A generator, the inputs it depends on, and the targets that must re-run after it."""
+
+    name: str
+    paths: Callable[[], Iterable[pathlib.Path]]
+    run: Callable[[], int]
+    then: Tuple[str, ...] = ()
+
+
+class InotifyWatcher:
+    """Wakes up on any change in the watched directories; events are not decoded, only counted."""
+
+    backend = "inotify"
+
+    def __init__(self, directories: Iterable[pathlib.Path]) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc has no inotify support")
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        for directory in directories:
+            if libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"cannot watch {directory}")
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        while True:
+            try:
+                if not os.read(self._fd, 1 << 16):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback that simply wakes every ``interval`` seconds; callers diff stat snapshots."""
+
+    backend = "poll"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        if timeout == 0:
+            # Nothing queues up between scans, so there is never anything to drain.
+            return False
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(directories: Iterable[pathlib.Path], backend: str = "auto", poll_interval: float = 1.0):
+    if backend in {"auto", "inotify"}:
+        try:
+            return InotifyWatcher(directories)
+        except OSError as error:
+            if backend == "inotify":
+                raise
+            print(f"WARNING watch: inotify unavailable ({error}); polling instead", file=sys.stderr)
+    return PollingWatcher(poll_interval)
+
+
+def snapshot(paths: Iterable[pathlib.Path]) -> Snapshot:
+    """``(mtime_ns, size)`` of each file, and of each non-hidden file directly inside each directory."""
+    state: Snapshot = {}
+    for path in paths:
+        if path.is_dir():
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        state[str(path)] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def watched_directories(targets: Iterable[WatchTarget]) -> List[pathlib.Path]:
+    directories = set()
+    for target in targets:
+        for path in target.paths():
+            directories.add(path if path.is_dir() else path.parent)
+    return sorted(directory for directory in directories if directory.is_dir())
+
+
+def run_targets(
+    targets: Sequence[WatchTarget], names: Iterable[str], context: BuildContext | None = None
+) -> bool:
+    """Run the named targets and everything they pull in, in ``targets`` order; True if all succeeded."""
+    if context is not None:
+        # Outputs may have been edited or deleted by hand since the last run.
+        context.forget_listings()
+    selected = set(names)
+    for target in targets:
+        if target.name in selected:
+            selected.update(target.then)
+
+    succeeded = True
+    for target in targets:
+        if target.name not in selected:
+            continue
+        started = time.perf_counter()
+        try:
+            status = target.run()
+        except Exception as error:
+            print(f"ERROR: watch: {target.name} failed: {error}", file=sys.stderr)
+            status = 1
+        succeeded = succeeded and status == 0
+        print(f"watch: ran={target.name} status={status} seconds={time.perf_counter() - started:.2f}")
+    return succeeded
+
+
+def touch(path: pathlib.Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+
+def watch(
+    targets: Sequence[WatchTarget],
+    watcher,
+    debounce: float,
+    trigger_file: Optional[pathlib.Path] = None,
+    context: BuildContext | None = None,
+) -> None:
+    """Re-run targets whose inputs changed until interrupted.
+
+    A burst of edits is handled once its inputs stay unchanged for ``debounce``
+    seconds. Snapshots are retaken after every run, so files the generators
+    write themselves (e.g. ``_talks`` for talkmap) do not trigger another run.
+    """
+    baseline = {target.name: snapshot(target.paths()) for target in targets}
+    while True:
+        watcher.wait(None)
+        current = {target.name: snapshot(target.paths()) for target in targets}
+        if current == baseline:
+            continue
+
+        while True:
+            watcher.wait(debounce)
+            settled = {target.name: snapshot(target.paths()) for target in targets}
+            if settled == current:
+                break
+            current = settled
+
+        changed = [target.name for target in targets if current[target.name] != baseline[target.name]]
+        print(f"watch: changed={','.join(changed)}")
+        if run_targets(targets, changed, context) and trigger_file is not None:
+            touch(trigger_file)
+        baseline = {target.name: snapshot(target.paths()) for target in targets}
+        while watcher.wait(0):
+            pass
+
+
+def build_targets(selected: Sequence[str], talkmap_args: str, context: BuildContext) -> List[WatchTarget]:
+    """Watch targets for the selected generators, imported once so later runs start warm."""
+    targets: Dict[str, WatchTarget] = {}
+
+    if "publications" in selected:
+        from sitegen import publications
+
+        targets["publications"] = WatchTarget(
+            name="publications",
+            paths=lambda: [GENERATOR_DIR / "publications.tsv"],
+            run=lambda: publications.main([], context),
+            # pubsFromBib drops entries a TSV row now claims, so it follows any TSV change.
+            then=("pubsFromBib",) if "pubsFromBib" in selected else (),
+        )
+
+    if "pubsFromBib" in selected:
+        from sitegen import pubs_from_bib
+
+        sources_file = GENERATOR_DIR / "bib-sources.json"
+
+        def bib_paths() -> List[pathlib.Path]:
+            try:
+                sources = pubs_from_bib.load_source_config(sources_file)
+            except ValueError:
+                sources = {}
+            return [sources_file, *(config.file for config in sources.values())]
+
+        targets["pubsFromBib"] = WatchTarget(
+            name="pubsFromBib", paths=bib_paths, run=lambda: pubs_from_bib.main([], context)
+        )
+
+    if "talks" in selected:
+        from sitegen import talks
+
+        # With the map selected too, talks.py feeds it the rows it just rendered.
+        talks_argv = ["--talkmap", f"--talkmap-args={talkmap_args}"] if "talkmap" in selected else []
+        targets["talks"] = WatchTarget(
+            name="talks",
+            paths=lambda: [GENERATOR_DIR / "talks.tsv"],
+            run=lambda: talks.main(talks_argv, context),
+        )
+
+    if "talkmap" in selected:
+        from sitegen import talkmap
+
+        talkmap_argv = shlex.split(talkmap_args)
+        talks_dir = pathlib.Path(talkmap.parse_args(talkmap_argv).talks_dir)
+        targets["talkmap"] = WatchTarget(
+            name="talkmap",
+            paths=lambda: [talks_dir],
+            run=lambda: talkmap.main(talkmap_argv, context),
+        )
+
+    return [targets[name] for name in TARGET_NAMES if name in targets]
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Regenerate publications, talks and the talk map whenever their sources change."
+    )
+    parser.add_argument(
+        "--targets",
+        nargs="+",
+        choices=TARGET_NAMES,
+        default=list(TARGET_NAMES),
+        help="Generators to keep up to date (default: all).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("auto", "inotify", "poll"),
+        default="auto",
+        help="Change detection: inotify on Linux, stat polling elsewhere (auto), or force either.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between stat scans with the polling backend.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Wait until inputs have been quiet for this many seconds before regenerating.",
+    )
+    parser.add_argument(
+        "--trigger-file",
+        help="File to touch after each successful regeneration, e.g. for `jekyll build --incremental`.",
+    )
+    parser.add_argument(
+        "--initial-build",
+        action="store_true",
+        help="Run every selected generator once before watching.",
+    )
+    parser.add_argument(
+        "--talkmap-args",
+        default="",
+        help="Extra talkmap.py options as one string (e.g. --talkmap-args='--skip-geocode').",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.poll_interval <= 0 or args.debounce < 0:
+        print("ERROR: --poll-interval must be positive and --debounce non-negative", file=sys.stderr)
+        return 1
+
+    context = BuildContext()
+    targets = build_targets(args.targets, args.talkmap_args, context)
+    try:
+        watcher = create_watcher(watched_directories(targets), args.backend, args.poll_interval)
+    except OSError as error:
+        print(f"ERROR: cannot start {args.backend} watcher: {error}", file=sys.stderr)
+        return 1
+
+    trigger_file = pathlib.Path(args.trigger_file) if args.trigger_file else None
+    print(
+        f"watch: backend={watcher.backend} targets={','.join(target.name for target in targets)} "
+        f"debounce={args.debounce}"
+    )
+    try:
+        initial = [target.name for target in targets]
+        if args.initial_build and run_targets(targets, initial, context) and trigger_file:
+            touch(trigger_file)
+        watch(targets, watcher, args.debounce, trigger_file=trigger_file, context=context)
+    except KeyboardInterrupt:
+        print("watch: stopped")
+    finally:
+        watcher.close()
+    return 0
@@ -0,0 +1,82 @@
+import pathlib
+import shutil
+
+from sitegen import pubs_from_bib
+from sitegen.bibcache import BibRecord, bib_cache_key, load_bib_cache, save_bib_cache
+from sitegen.pubs_from_bib import SourceConfig, load_source_records
+
+SAMPLE = pathlib.Path(__file__).with_name("data") / "sample.bib"
+
+
+def copy_sample(tmp_path):
+    path = tmp_path / "sample.bib"
+    shutil.copyfile(SAMPLE, path)
+    return path
+
+
+def test_records_and_warnings_round_trip(tmp_path):
+    cache = tmp_path / "sample.bin"
+    key = bib_cache_key(SAMPLE, "1", "builtin")
+    records = [
+        BibRecord("a", title="Ünïcode Title", pub_date="2020-01-01", authors=("Jane Smith", "Li Wei")),
+        BibRecord("b", warning="missing title"),
+    ]
+
+    save_bib_cache(cache, key, records, ["WARNING source=sample: retrying with pybtex"])
+
+    assert load_bib_cache(cache, key) == (records, ["WARNING source=sample: retrying with pybtex"])
+    assert load_bib_cache(cache, bib_cache_key(SAMPLE, "2", "builtin")) is None
+    assert load_bib_cache(tmp_path / "missing.bin", key) is None
+
+
+def test_cache_key_follows_content_and_settings(tmp_path):
+    path = copy_sample(tmp_path)
+    key = bib_cache_key(path, "1", "auto", "booktitle", "In ")
+
+    assert bib_cache_key(path, "1", "auto", "booktitle", "In ") == key
+    assert bib_cache_key(path, "2", "auto", "booktitle", "In ") != key
+    assert bib_cache_key(path, "1", "auto", "journal", "In ") != key
+    assert bib_cache_key(path, "1", "auto", "booktitle", "") != key
+    path.write_text(path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    assert bib_cache_key(path, "1", "auto", "booktitle", "In ") != key
+
+
+def test_cache_hit_returns_the_parsed_records(tmp_path):
+    config = SourceConfig(file=copy_sample(tmp_path), venue_key="booktitle", venue_prefix="In ")
+    cache_dir = tmp_path / "cache"
+
+    parsed, _, phases = load_source_records("sample", config, engine="builtin", cache_dir=cache_dir)
+    assert "parse" in phases
+    cached, _, phases = load_source_records("sample", config, engine="builtin", cache_dir=cache_dir)
+    assert "parse" not in phases
+    assert cached == parsed
+
+
+def test_cache_is_rebuilt_when_the_bib_file_changes(tmp_path):
+    config = SourceConfig(file=copy_sample(tmp_path), venue_key="booktitle", venue_prefix="In ")
+    cache_dir = tmp_path / "cache"
+    before, _, _ = load_source_records("sample", config, engine="builtin", cache_dir=cache_dir)
+
+    with config.file.open("a", encoding="utf-8") as handle:
+        handle.write("\n@article{added-2024,\n  title = {An Added Article Here},\n  year = {2024}\n}\n")
+    after, _, phases = load_source_records("sample", config, engine="builtin", cache_dir=cache_dir)
+
+    assert "parse" in phases
+    assert [record.bib_id for record in after] == [record.bib_id for record in before] + ["added-2024"]
+
+
+def test_cache_is_rebuilt_when_the_reader_or_source_config_changes(tmp_path, monkeypatch):
+    config = SourceConfig(file=copy_sample(tmp_path), venue_key="booktitle", venue_prefix="In ")
+    cache_dir = tmp_path / "cache"
+    load_source_records("sample", config, engine="builtin", cache_dir=cache_dir)
+
+    renamed = SourceConfig(file=config.file, venue_key="booktitle", venue_prefix="At ")
+    records, _, phases = load_source_records("sample", renamed, engine="builtin", cache_dir=cache_dir)
+    assert "parse" in phases
+    assert all(not record.venue or record.venue.startswith("At ") for record in records)
+
+    _, _, phases = load_source_records("sample", renamed, engine="builtin", cache_dir=cache_dir)
+    assert "parse" not in phases
+    monkeypatch.setattr(pubs_from_bib, "READER_VERSION", pubs_from_bib.READER_VERSION + 1)
+    _, _, phases = load_source_records("sample", renamed, engine="builtin", cache_dir=cache_dir)
+    assert "parse" in phases
@@ -0,0 +1,46 @@
+import pathlib
+
+import pytest
+
+from sitegen.bibtex import BibSyntaxError, iter_entries
+
+SAMPLE = pathlib.Path(__file__).with_name("data") / "sample.bib"
+NAME_PARTS = ("first_names", "middle_names", "prelast_names", "last_names", "lineage_names")
+
+
+def read_sample(chunk_size=1 << 16):
+    with SAMPLE.open(encoding="utf-8") as handle:
+        return dict(iter_entries(handle, chunk_size=chunk_size))
+
+
+def test_builtin_reader_matches_pybtex():
+    bibtex = pytest.importorskip("pybtex.database.input.bibtex")
+    expected = bibtex.Parser().parse_file(str(SAMPLE)).entries
+    entries = read_sample()
+
+    assert list(entries) == list(expected)
+    for key, reference in expected.items():
+        entry = entries[key]
+        assert entry.type == reference.type
+        assert entry.fields == {name.lower(): value for name, value in reference.fields.items()}
+        assert set(entry.persons) == {role.lower() for role in reference.persons}
+        for role, people in reference.persons.items():
+            for person, reference_person in zip(entry.persons[role.lower()], people, strict=True):
+                for part in NAME_PARTS:
+                    assert getattr(person, part) == list(getattr(reference_person, part)), (key, part)
+
+
+def test_small_chunks_give_the_same_entries():
+    entries = read_sample()
+    chunked = read_sample(chunk_size=7)
+
+    assert list(chunked) == list(entries)
+    assert all(chunked[key].fields == entry.fields for key, entry in entries.items())
+
+
+def test_repeated_key_is_rejected(tmp_path):
+    path = tmp_path / "dup.bib"
+    path.write_text("@misc{a, title={One}}\n@misc{A, title={Two}}\n", encoding="utf-8")
+
+    with path.open(encoding="utf-8") as handle, pytest.raises(BibSyntaxError):
+        list(iter_entries(handle))
@@ -0,0 +1,46 @@
+from sitegen import __main__ as cli
+from sitegen import build
+
+
+def record_stages(monkeypatch, statuses):
+    ran = []
+
+    def run_stage(stage, args, context):
+        ran.append(stage)
+        return statuses.get(stage, 0)
+
+    monkeypatch.setattr(build, "run_stage", run_stage)
+    return ran
+
+
+def test_build_runs_stages_in_pipeline_order(monkeypatch, capsys):
+    ran = record_stages(monkeypatch, {})
+
+    assert cli.main(["build", "--stages", "talkmap", "talks", "publications"]) == 0
+
+    assert ran == ["publications", "talks", "talkmap"]
+    assert "build: stages=publications,talks,talkmap" in capsys.readouterr().out
+
+
+def test_build_stops_at_the_first_failing_stage(monkeypatch, capsys):
+    ran = record_stages(monkeypatch, {"pubsFromBib": 1})
+
+    assert cli.main(["build"]) == 1
+
+    assert ran == ["publications", "pubsFromBib"]
+    captured = capsys.readouterr()
+    assert "ERROR: build: pubsFromBib failed with status 1" in captured.err
+    assert "build: stages=" not in captured.out
+
+
+def test_stage_options_are_passed_on():
+    args = build.parse_args(["--dry-run", "--full-rebuild", "--jobs", "4", "--staged"])
+
+    assert build.stage_argv(args) == ["--jobs", "4", "--dry-run", "--full-rebuild", "--staged"]
+    assert build.stage_argv(args, full_rebuild=False) == ["--jobs", "4", "--dry-run", "--staged"]
+
+
+def test_unknown_command_prints_usage(capsys):
+    assert cli.main(["deploy"]) == 2
+    assert "usage: python -m sitegen {bench,build," in capsys.readouterr().err
+    assert cli.main(["--help"]) == 0
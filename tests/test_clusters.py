@@ -0,0 +1,20 @@
+from sitegen.clusters import (
+    build_cluster_shards,
+    cluster_points_by_zoom,
+    remove_cluster_shards,
+    write_cluster_shards,
+)
+
+POINTS = [["Berkeley CA, USA", 37.8716, -122.2727], ["Paris, France", 48.8566, 2.3522]]
+
+
+def test_remove_cluster_shards_clears_what_write_cluster_shards_wrote(tmp_path):
+    directory = tmp_path / "clusters"
+    shards, index = build_cluster_shards(cluster_points_by_zoom(POINTS, max_zoom=3))
+    written, removed = write_cluster_shards(directory, shards, index)
+    assert (written, removed) == (len(shards) + 1, 0)
+    assert (directory / "index.json").exists()
+
+    assert remove_cluster_shards(directory) == len(shards)
+    assert not directory.exists()
+    assert remove_cluster_shards(directory) == 0
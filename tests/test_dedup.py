@@ -0,0 +1,94 @@
+from sitegen import publications
+from sitegen.dedup import DEDUP_INDEX_NAME, DedupIndex, identity_keys
+from sitegen.rowindex import row_index_path
+
+KEYS = identity_keys(doi="10.1234/abc", title="A Study of Everything")
+
+
+def test_better_priority_keeps_the_key(tmp_path):
+    index = DedupIndex(tmp_path / "index.json", "publications")
+    claim, matched = index.resolve(KEYS, "publications", "slug:a", priority=0)
+    assert matched is None
+
+    winner, matched = index.resolve(KEYS[1:], "publications", "slug:b", priority=0)
+    assert winner is claim
+    assert matched == KEYS[1]
+    assert index.matches[-1]["dropped"] == "source=publications id=slug:b"
+
+
+def test_tsv_row_displaces_a_bibtex_claim(tmp_path):
+    path = tmp_path / "index.json"
+    bib = DedupIndex(path, "pubsFromBib")
+    bib_claim, _ = bib.resolve(KEYS, "synthetic", "paper1", priority=1)
+    bib_claim["file"] = "2020-01-01-a-study.md"
+    bib.save()
+
+    tsv = DedupIndex(path, "publications")
+    claim, matched = tsv.resolve(KEYS, "publications", "slug:a", priority=0)
+    assert matched is None
+    assert all(tsv.claims[key] is claim for key in KEYS)
+    tsv.save()
+
+    # The next BibTeX run finds its entry taken and drops the page it made before.
+    bib = DedupIndex(path, "pubsFromBib")
+    bib.release(["synthetic"])
+    winner, matched = bib.resolve(KEYS, "synthetic", "paper1", priority=1)
+    assert matched == KEYS[0]
+    assert winner["source"] == "publications"
+    assert bib.stale_files(produced=set()) == ["2020-01-01-a-study.md"]
+
+
+def test_release_only_drops_this_generators_sources(tmp_path):
+    path = tmp_path / "index.json"
+    index = DedupIndex(path, "pubsFromBib")
+    kept, _ = index.resolve(identity_keys(doi="10.1/kept"), "other", "x", priority=2)
+    released, _ = index.resolve(identity_keys(doi="10.1/gone"), "synthetic", "y", priority=1)
+    released["file"] = "gone.md"
+
+    index.release(["synthetic"])
+
+    assert list(index.claims.values()) == [kept]
+    assert index.stale_files(produced={"gone.md"}) == []
+    assert index.stale_files(produced=set()) == ["gone.md"]
+
+
+def test_withdraw_frees_the_keys(tmp_path):
+    index = DedupIndex(tmp_path / "index.json", "publications")
+    claim, _ = index.resolve(KEYS, "publications", "slug:a", priority=0)
+    index.withdraw(claim)
+
+    _, matched = index.resolve(KEYS, "publications", "slug:b", priority=0)
+    assert matched is None
+
+
+def test_tsv_row_that_becomes_a_duplicate_loses_its_page(tmp_path):
+    header = "pub_date\ttitle\tvenue\texcerpt\tcitation\turl_slug\tpaper_url\tslides_url\n"
+    first = "2009-10-01\tThe First Paper\tJournal\t\tCitation one\tpaper-one\t\t\n"
+    second = "2010-10-01\t{}\tJournal\t\tCitation two\tpaper-two\t\t\n"
+    source = tmp_path / "publications.tsv"
+    output_dir = tmp_path / "_publications"
+    source.write_text(header + first + second.format("The Second Paper"), encoding="utf-8")
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+    assert (output_dir / "2010-10-01-paper-two.md").exists()
+
+    # Without the row index only the dedup index remembers which page the row made.
+    row_index_path(output_dir, source).unlink()
+    source.write_text(header + first + second.format("The First Paper"), encoding="utf-8")
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+
+    assert sorted(path.name for path in output_dir.glob("*.md")) == ["2009-10-01-paper-one.md"]
+    claims = DedupIndex(output_dir / DEDUP_INDEX_NAME, "publications").claims
+    assert {claim["file"] for claim in claims.values()} == {"2009-10-01-paper-one.md"}
+
+
+def test_invalid_tsv_row_keeps_its_page_with_dedup(tmp_path):
+    header = "pub_date\ttitle\tvenue\texcerpt\tcitation\turl_slug\tpaper_url\tslides_url\n"
+    row = "{}\tThe First Paper\tJournal\t\tCitation one\tpaper-one\t\t\n"
+    source = tmp_path / "publications.tsv"
+    output_dir = tmp_path / "_publications"
+    source.write_text(header + row.format("2009-10-01"), encoding="utf-8")
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+
+    source.write_text(header + row.format("2009-13-01"), encoding="utf-8")
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+    assert (output_dir / "2009-10-01-paper-one.md").exists()
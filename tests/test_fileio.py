@@ -0,0 +1,38 @@
+import builtins
+import os
+import stat
+
+from sitegen import fileio
+
+
+def expected_umask() -> int:
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def test_process_umask_matches_os_umask():
+    assert fileio.process_umask() == expected_umask()
+
+
+def test_process_umask_without_proc(monkeypatch):
+    real_open = builtins.open
+
+    def open_without_proc(file, *args, **kwargs):
+        if str(file).startswith("/proc/"):
+            raise FileNotFoundError(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", open_without_proc)
+    assert fileio.process_umask.__wrapped__() == expected_umask()
+
+
+def test_atomic_write_uses_umask_mode_and_keeps_existing_mode(tmp_path):
+    path = tmp_path / "out.txt"
+    fileio.atomic_write_text(path, "one")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~expected_umask()
+
+    path.chmod(0o600)
+    fileio.atomic_write_text(path, "two")
+    assert path.read_text() == "two"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
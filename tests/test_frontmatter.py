@@ -0,0 +1,48 @@
+import io
+
+from sitegen.frontmatter import parse_front_matter, read_front_matter, read_front_matter_lines
+
+
+def header(text: str):
+    handle = io.BytesIO(text.encode("utf-8"))
+    lines = read_front_matter_lines(handle)
+    return lines, handle
+
+
+def test_reading_stops_at_the_closing_delimiter():
+    lines, handle = header('---\ntitle: "One"\nlocation: Berkeley CA, USA # city\n---\nbody\n---\n')
+
+    assert lines == [b'title: "One"\n', b"location: Berkeley CA, USA # city\n"]
+    assert handle.read() == b"body\n---\n"
+    assert parse_front_matter(line.decode("utf-8") for line in lines) == {
+        "title": "One",
+        "location": "Berkeley CA, USA",
+    }
+
+
+def test_delimiter_inside_a_quoted_value_does_not_close_the_block(tmp_path):
+    page = tmp_path / "talk.md"
+    page.write_text(
+        '---\ntitle: "Part one\n---\npart two"\nlocation: \'Berkeley CA, USA\'\n---\nbody\n', encoding="utf-8"
+    )
+
+    assert read_front_matter(page) == {"title": "Part one --- part two", "location": "Berkeley CA, USA"}
+
+
+def test_unterminated_quote_falls_back_to_the_first_delimiter(tmp_path):
+    page = tmp_path / "talk.md"
+    page.write_text(
+        '---\ntitle: "Unclosed\nlocation: Berkeley CA, USA\n---\nA "quoted" body.\n', encoding="utf-8"
+    )
+
+    assert read_front_matter(page) == {"title": '"Unclosed', "location": "Berkeley CA, USA"}
+
+
+def test_unterminated_quote_without_a_delimiter_is_not_front_matter():
+    lines, _ = header('---\ntitle: "Unclosed\nlocation: Berkeley CA, USA\n')
+
+    assert lines is None
+    assert parse_front_matter(['title: "Unclosed', "location: Berkeley CA, USA"]) == {
+        "title": '"Unclosed',
+        "location": "Berkeley CA, USA",
+    }
@@ -0,0 +1,77 @@
+import os
+
+from sitegen.gazetteer import INDEX_SUFFIX, GazetteerIndex, load_gazetteer
+
+
+def geonames_row(geoname_id, name, latitude, longitude, country, admin1="", population=0, alternates=""):
+    row = [""] * 19
+    row[0] = str(geoname_id)
+    row[1] = name
+    row[2] = name
+    row[3] = alternates
+    row[4] = str(latitude)
+    row[5] = str(longitude)
+    row[8] = country
+    row[10] = admin1
+    row[14] = str(population)
+    return "\t".join(row)
+
+
+def write_gazetteer(path, *rows):
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+
+def test_index_is_built_beside_the_tsv_and_read_through_mmap(tmp_path):
+    source = tmp_path / "cities.txt"
+    write_gazetteer(
+        source,
+        geonames_row(1, "Paris", 48.85, 2.35, "FR", population=2_000_000, alternates="Lutèce"),
+        geonames_row(2, "Paris", 33.66, -95.56, "US", admin1="TX", population=25_000),
+        geonames_row(3, "São Paulo", -23.55, -46.63, "BR", population=12_000_000),
+    )
+
+    index = load_gazetteer(source)
+
+    assert (tmp_path / f"cities.txt{INDEX_SUFFIX}").exists()
+    assert isinstance(index.keys.blob, memoryview)
+    assert len(index) == 3
+    assert sorted(index.lookup("paris")) == [0, 1]
+    assert index.lookup("lutèce") == [0]
+    assert index.lookup("Paris") == []
+    assert index.lookup("atlantis") == []
+    assert index.geocode("PARIS") == (48.85, 2.35)
+    assert index.geocode("Paris, TX") == (33.66, -95.56)
+    assert index.geocode("  são   paulo ") == (-23.55, -46.63)
+    assert index.geocode("Atlantis") is None
+
+
+def test_index_is_rebuilt_when_the_tsv_changes(tmp_path):
+    source = tmp_path / "cities.txt"
+    write_gazetteer(source, geonames_row(1, "Lyon", 45.76, 4.84, "FR"))
+    assert load_gazetteer(source).geocode("Lyon") == (45.76, 4.84)
+    index_path = tmp_path / f"cities.txt{INDEX_SUFFIX}"
+    built = index_path.stat().st_mtime_ns
+
+    assert load_gazetteer(source).geocode("Lyon") == (45.76, 4.84)
+    assert index_path.stat().st_mtime_ns == built
+
+    write_gazetteer(
+        source, geonames_row(1, "Lyon", 45.75, 4.85, "FR"), geonames_row(2, "Nice", 43.7, 7.27, "FR")
+    )
+    os.utime(source, ns=(built + 1_000_000_000, built + 1_000_000_000))
+
+    index = load_gazetteer(source)
+    assert index.geocode("Lyon") == (45.75, 4.85)
+    assert index.geocode("Nice") == (43.7, 7.27)
+
+
+def test_a_saved_index_loads_directly(tmp_path):
+    index_path = tmp_path / f"cities{INDEX_SUFFIX}"
+    row = geonames_row(1, "Berkeley", 37.87, -122.27, "US", "CA").split("\t")
+    GazetteerIndex.from_rows([row]).save(index_path)
+
+    index = load_gazetteer(index_path)
+
+    assert index.geocode("Berkeley CA") == (37.87, -122.27)
+    assert index.lookup("berkeley") == [0]
+    assert index.lookup("oakland") == []
@@ -0,0 +1,96 @@
+import pytest
+
+from sitegen.geocache import (
+    SQLITE_VARIABLE_LIMIT,
+    GeocodeCacheStore,
+    JsonCacheStore,
+    SqliteCacheStore,
+    export_json_cache,
+    load_json_cache,
+    save_json_cache,
+)
+from sitegen.talkmap import seed_cache_store
+
+
+def point(latitude: float, longitude: float):
+    return {"latitude": latitude, "longitude": longitude}
+
+
+def test_a_backend_missing_methods_cannot_be_created():
+    class PartialStore(GeocodeCacheStore):
+        def is_empty(self) -> bool:
+            return True
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_sqlite_upsert_counts_only_changed_rows(tmp_path):
+    with SqliteCacheStore(tmp_path / "geocode.sqlite") as store:
+        assert store.is_empty()
+        assert store.upsert_many({"Paris": point(48.85, 2.35), "Lyon": point(45.76, 4.84)}) == 2
+        assert store.upsert_many({"Paris": point(48.85, 2.35), "Lyon": point(45.75, 4.85)}) == 1
+        assert store.upsert_many({"Nowhere": {"latitude": 1.0}}) == 0
+        assert store.get("Lyon") == point(45.75, 4.85)
+        assert store.get("Nowhere") is None
+
+
+def test_sqlite_insert_missing_keeps_existing_coordinates(tmp_path):
+    with SqliteCacheStore(tmp_path / "geocode.sqlite") as store:
+        store.upsert_many({"Paris": point(48.85, 2.35)})
+
+        assert store.insert_missing({"Paris": point(0.0, 0.0), "Lyon": point(45.76, 4.84)}) == 1
+        assert dict(store.items()) == {"Lyon": point(45.76, 4.84), "Paris": point(48.85, 2.35)}
+
+
+def test_sqlite_get_many_reads_more_locations_than_one_statement_allows(tmp_path):
+    entries = {
+        f"Place {number:04d}": point(number / 10, -number / 10)
+        for number in range(SQLITE_VARIABLE_LIMIT * 2 + 7)
+    }
+    with SqliteCacheStore(tmp_path / "geocode.sqlite") as store:
+        store.upsert_many(entries)
+
+        assert store.get_many(list(entries) + ["Unknown"]) == entries
+
+
+def test_sqlite_rows_survive_reopening(tmp_path):
+    path = tmp_path / "geocode.sqlite"
+    with SqliteCacheStore(path) as store:
+        store.upsert_many({"Paris": point(48.85, 2.35)})
+        store.record_failures({"Atlantis": {"failed_at": 10.0, "attempts": 2}})
+
+    with SqliteCacheStore(path) as store:
+        assert store.get("Paris") == point(48.85, 2.35)
+        assert store.get_failures(["Atlantis", "Paris"]) == {"Atlantis": {"failed_at": 10.0, "attempts": 2}}
+        store.clear_failures(["Atlantis"])
+        assert store.get_failures(["Atlantis"]) == {}
+
+
+def test_json_cache_is_imported_into_an_empty_sqlite_store_and_exported_back(tmp_path):
+    cache_file = tmp_path / "geocode-cache.json"
+    entries = {"Lyon": point(45.76, 4.84), "Paris": point(48.85, 2.35)}
+    save_json_cache(cache_file, entries)
+
+    with SqliteCacheStore(tmp_path / "geocode.sqlite") as store:
+        assert seed_cache_store(store, "sqlite", cache_file, tmp_path / "missing.js") == 2
+        assert seed_cache_store(store, "sqlite", cache_file, tmp_path / "missing.js") == 0
+
+        exported = tmp_path / "exported.json"
+        assert export_json_cache(store, exported) == 2
+
+    assert load_json_cache(exported) == entries
+    assert exported.read_text(encoding="utf-8") == cache_file.read_text(encoding="utf-8")
+
+
+def test_json_store_matches_the_sqlite_store(tmp_path):
+    entries = {"Lyon": point(45.76, 4.84), "Paris": point(48.85, 2.35)}
+    with JsonCacheStore(tmp_path / "geocode-cache.json") as store:
+        assert store.upsert_many(entries) == 2
+        assert store.insert_missing({"Paris": point(0.0, 0.0)}) == 0
+
+    with JsonCacheStore(tmp_path / "geocode-cache.json") as store, SqliteCacheStore(
+        tmp_path / "geocode.sqlite"
+    ) as sqlite_store:
+        sqlite_store.upsert_many(entries)
+        assert list(store.items()) == list(sqlite_store.items())
@@ -0,0 +1,101 @@
+import pytest
+
+from sitegen.geocoding import TokenBucket, TransientGeocodeError, geocode_concurrently
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def flaky_geocoder(failures: int, error: Exception):
+    calls = []
+
+    def geocode(location: str):
+        calls.append(location)
+        if len(calls) <= failures:
+            raise error
+        return (1.0, 2.0)
+
+    return geocode, calls
+
+
+def test_transient_errors_are_retried_through_the_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, clock=clock, sleep=clock.sleep)
+    geocode, calls = flaky_geocoder(2, TransientGeocodeError("GeocoderTimedOut: timed out"))
+
+    [outcome] = geocode_concurrently(["Paris"], geocode, bucket, retries=2, retry_wait=0)
+
+    assert outcome.coordinates == (1.0, 2.0)
+    assert outcome.error == ""
+    assert calls == ["Paris"] * 3
+    # The first attempt uses the initial token; each retry waits for a new one.
+    assert clock.sleeps == [1.0, 1.0]
+    assert outcome.waited == 2.0
+
+
+def test_retries_are_bounded():
+    bucket = TokenBucket(rate=float("inf"))
+    geocode, calls = flaky_geocoder(5, TransientGeocodeError("GeocoderUnavailable: 503"))
+
+    [outcome] = geocode_concurrently(["Paris"], geocode, bucket, retries=2, retry_wait=0)
+
+    assert outcome.coordinates is None
+    assert outcome.error == "GeocoderUnavailable: 503"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("retries", [0, 2])
+def test_other_errors_are_not_retried(retries):
+    geocode, calls = flaky_geocoder(1, ValueError("bad query"))
+
+    [outcome] = geocode_concurrently(["Paris"], geocode, TokenBucket(rate=float("inf")), retries=retries)
+
+    assert outcome.error == "ValueError: bad query"
+    assert len(calls) == 1
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.acquire() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 0.5]
+    assert clock.now == 1.0
+
+
+def test_bucket_refills_up_to_burst_while_idle():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_bucket_from_min_delay():
+    assert TokenBucket.from_min_delay(0.5).rate == 2.0
+    assert TokenBucket.from_min_delay(0).acquire() == 0.0
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1.0, burst=0)
+
+
+def test_bucket_spaces_concurrent_workers():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10.0, clock=clock, sleep=lambda seconds: None)
+    geocode, calls = flaky_geocoder(0, ValueError())
+
+    outcomes = list(geocode_concurrently([f"place {n}" for n in range(8)], geocode, bucket, concurrency=4))
+
+    assert sorted(calls) == sorted(outcome.location for outcome in outcomes)
+    # Nobody sleeps on the fake clock, so every reservation after the first queues 0.1s behind the last.
+    assert sorted(round(outcome.waited, 6) for outcome in outcomes) == [round(0.1 * n, 6) for n in range(8)]
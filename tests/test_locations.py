@@ -0,0 +1,63 @@
+import json
+
+from sitegen.locations import (
+    canonicalize_locations,
+    load_alias_index,
+    load_alias_table,
+    location_key,
+    save_alias_index,
+)
+
+
+def test_variants_fold_to_one_key():
+    variants = ["Place 1", "place 1 ", "  PLACE   1", "Place\t1", "Ｐｌａｃｅ １", "Place, 1."]
+
+    assert {location_key(variant) for variant in variants} == {"place 1"}
+    assert location_key("Straße") == location_key("STRASSE")
+    assert location_key(" , ") == ""
+
+
+def test_variants_map_to_one_canonical_spelling():
+    index = {}
+
+    mapping = canonicalize_locations(["place 1 ", "Place 1", "PLACE 1", "Other"], {}, index)
+
+    assert mapping == {"place 1 ": "PLACE 1", "Place 1": "PLACE 1", "PLACE 1": "PLACE 1", "Other": "Other"}
+    assert index == {"place 1": "PLACE 1", "other": "Other"}
+
+
+def test_canonical_spelling_prefers_aliases_then_index_then_cached(tmp_path):
+    aliases_file = tmp_path / "location-aliases.json"
+    aliases_file.write_text(json.dumps({"NYC": "New York, USA"}), encoding="utf-8")
+    aliases = load_alias_table(aliases_file)
+
+    mapping = canonicalize_locations(
+        ["nyc", "place 1 ", "Place 1", "Paris", "paris"],
+        aliases,
+        {"paris": "Paris, France"},
+        cached=["Place 1"],
+    )
+
+    assert mapping["nyc"] == "New York, USA"
+    assert mapping["place 1 "] == mapping["Place 1"] == "Place 1"
+    assert mapping["Paris"] == mapping["paris"] == "Paris, France"
+
+
+def test_saved_index_keeps_the_canonical_spelling_on_the_next_run(tmp_path):
+    index_path = tmp_path / "location-index.json"
+    first_index = {}
+    canonicalize_locations(["Place 1", "place 1 "], {}, first_index, cached=["Place 1"])
+    save_alias_index(index_path, first_index)
+
+    index = load_alias_index(index_path)
+    mapping = canonicalize_locations(["PLACE 1", "place 1"], {}, index)
+
+    assert index == {"place 1": "Place 1"}
+    assert mapping == {"PLACE 1": "Place 1", "place 1": "Place 1"}
+
+
+def test_unreadable_index_starts_empty(tmp_path):
+    index_path = tmp_path / "location-index.json"
+    assert load_alias_index(index_path) == {}
+    index_path.write_text("{not json", encoding="utf-8")
+    assert load_alias_index(index_path) == {}
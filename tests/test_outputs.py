@@ -0,0 +1,62 @@
+import os
+import pathlib
+
+from sitegen.outputs import OutputManifest
+
+
+def test_unchanged_file_is_recognised_from_its_stat(tmp_path, monkeypatch):
+    path = tmp_path / "page.md"
+    manifest = OutputManifest(tmp_path)
+    assert manifest.write_if_changed(path, "hello\n", dry_run=False) == "written"
+    manifest.save()
+
+    def fail(self):
+        raise AssertionError(f"{self} was read back")
+
+    monkeypatch.setattr(pathlib.Path, "read_bytes", fail)
+    manifest = OutputManifest(tmp_path)
+    assert manifest.write_if_changed(path, "hello\n", dry_run=False) == "unchanged"
+    assert manifest.write_if_changed(path, "changed\n", dry_run=True) == "dry-run"
+
+
+def test_hand_edited_file_is_rewritten(tmp_path):
+    path = tmp_path / "page.md"
+    manifest = OutputManifest(tmp_path)
+    manifest.write_if_changed(path, "hello\n", dry_run=False)
+    manifest.save()
+
+    path.write_text("edited by hand\n", encoding="utf-8")
+    manifest = OutputManifest(tmp_path)
+    assert manifest.write_if_changed(path, "hello\n", dry_run=False) == "written"
+    assert path.read_text(encoding="utf-8") == "hello\n"
+
+
+def test_matching_file_without_entry_is_adopted(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("hello\n", encoding="utf-8")
+    manifest = OutputManifest(tmp_path)
+
+    assert manifest.write_if_changed(path, "hello\n", dry_run=False) == "unchanged"
+    assert "page.md" in manifest.entries
+
+
+def test_hard_linked_file_is_replaced_not_written_through(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("old\n", encoding="utf-8")
+    link = tmp_path / "elsewhere.md"
+    os.link(path, link)
+
+    assert OutputManifest(tmp_path).write_if_changed(path, "new\n", dry_run=False) == "written"
+    assert path.read_text(encoding="utf-8") == "new\n"
+    assert link.read_text(encoding="utf-8") == "old\n"
+
+
+def test_remove_forgets_the_entry(tmp_path):
+    path = tmp_path / "page.md"
+    manifest = OutputManifest(tmp_path)
+    manifest.write_if_changed(path, "hello\n", dry_run=False)
+
+    assert manifest.remove(path)
+    assert not path.exists()
+    assert "page.md" not in manifest.entries
+    assert not manifest.remove(path)
@@ -0,0 +1,43 @@
+import pathlib
+
+import pytest
+
+from sitegen.pubs_from_bib import SourceConfig, load_source_records
+
+SAMPLE = pathlib.Path(__file__).with_name("data") / "sample.bib"
+
+
+@pytest.mark.parametrize("engine", ["builtin", "pybtex"])
+@pytest.mark.parametrize("venue_key", ["booktitle", "BookTitle", "BOOKTITLE"])
+def test_venue_key_is_case_insensitive(engine, venue_key):
+    if engine == "pybtex":
+        pytest.importorskip("pybtex")
+    config = SourceConfig(file=SAMPLE, venue_key=venue_key, venue_prefix="In ")
+
+    records, warnings, _ = load_source_records("sample", config, engine=engine)
+
+    assert warnings == []
+    record = next(record for record in records if record.bib_id == "jones-2019")
+    assert record.warning == ""
+    assert record.venue == "In Proceedings of the Conference 2019"
+
+
+def test_pybtex_fallback_warning_is_kept_on_a_cache_hit(tmp_path, monkeypatch):
+    pytest.importorskip("pybtex")
+    from sitegen import pubs_from_bib
+    from sitegen.bibtex import BibSyntaxError
+
+    def failing_reader(handle):
+        raise BibSyntaxError("unbalanced braces")
+        yield
+
+    monkeypatch.setattr(pubs_from_bib, "iter_entries", failing_reader)
+    config = SourceConfig(file=SAMPLE, venue_key="booktitle", venue_prefix="In ")
+
+    parsed, parse_warnings, _ = load_source_records("sample", config, cache_dir=tmp_path)
+    cached, cache_warnings, phases = load_source_records("sample", config, cache_dir=tmp_path)
+
+    assert "cache_load" in phases and "parse" not in phases
+    assert cached == parsed
+    assert len(parse_warnings) == 1 and "retrying with pybtex" in parse_warnings[0]
+    assert cache_warnings == parse_warnings
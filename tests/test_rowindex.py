@@ -0,0 +1,96 @@
+import pathlib
+
+from sitegen import publications, talks
+from sitegen.rowindex import RowIndex, keep_skipped_rows, row_fingerprint, stale_outputs
+
+TALKS_HEADER = "title\ttype\turl_slug\tvenue\tdate\tlocation\ttalk_url\tdescription\n"
+PUBLICATIONS_HEADER = "pub_date\ttitle\tvenue\texcerpt\tcitation\turl_slug\tpaper_url\tslides_url\n"
+
+
+def write_tsv(path: pathlib.Path, header: str, rows: list) -> None:
+    path.write_text(header + "".join("\t".join(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def talk(slug: str, date: str) -> list:
+    return [f"Talk {slug}", "Talk", slug, "Venue", date, "Berkeley CA, USA", "", ""]
+
+
+def test_stale_outputs_lists_files_of_removed_rows():
+    previous = {"slug:a": {"hash": "1", "file": "a.md"}, "slug:b": {"hash": "2", "file": "b.md"}}
+    current = {"slug:a": {"hash": "3", "file": "a.md"}}
+
+    assert stale_outputs(previous, current, {"a.md"}) == (1, ["b.md"])
+
+
+def test_skipped_rows_keep_their_previous_entry():
+    previous = {"slug:a": {"hash": "1", "file": "a.md"}, "slug:b": {"hash": "2", "file": "b.md"}}
+    current = {"slug:a": {"hash": "3", "file": "a.md"}}
+
+    keep_skipped_rows(previous, current, ["slug:b", "slug:new"])
+
+    assert current["slug:b"] == previous["slug:b"]
+    assert "slug:new" not in current
+    assert stale_outputs(previous, current, {"a.md"}) == (0, [])
+
+
+def test_invalid_talk_row_keeps_its_page(tmp_path, capsys):
+    source = tmp_path / "talks.tsv"
+    output_dir = tmp_path / "_talks"
+    write_tsv(source, TALKS_HEADER, [talk("one", "2012-03-01"), talk("two", "2013-03-01")])
+    assert talks.process_file(source, output_dir, dry_run=False) == 0
+    page = output_dir / "2013-03-01-two.md"
+    assert page.exists()
+
+    write_tsv(source, TALKS_HEADER, [talk("one", "2012-03-01"), talk("two", "2013-13-01")])
+    assert talks.process_file(source, output_dir, dry_run=False) == 0
+    assert "removed=0" in capsys.readouterr().out
+    assert page.exists()
+
+    # Once the row is fixed under a new date, the old page goes.
+    write_tsv(source, TALKS_HEADER, [talk("one", "2012-03-01"), talk("two", "2013-04-01")])
+    assert talks.process_file(source, output_dir, dry_run=False) == 0
+    assert not page.exists()
+    assert (output_dir / "2013-04-01-two.md").exists()
+
+    write_tsv(source, TALKS_HEADER, [talk("one", "2012-03-01")])
+    assert talks.process_file(source, output_dir, dry_run=False) == 0
+    assert "removed=1" in capsys.readouterr().out
+    assert sorted(path.name for path in output_dir.glob("*.md")) == ["2012-03-01-one.md"]
+
+
+def test_duplicate_publication_row_loses_its_page(tmp_path, capsys):
+    source = tmp_path / "publications.tsv"
+    output_dir = tmp_path / "_publications"
+    first = ["2009-10-01", "The First Paper", "Journal", "", "Citation one", "paper-one", "", ""]
+    second = ["2010-10-01", "The Second Paper", "Journal", "", "Citation two", "paper-two", "", ""]
+    write_tsv(source, PUBLICATIONS_HEADER, [first, second])
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+    capsys.readouterr()
+
+    # The second row now shares the first row's title, so dedup skips it and its page goes.
+    write_tsv(source, PUBLICATIONS_HEADER, [first, [*second[:1], "The First Paper", *second[2:]]])
+    assert publications.process_file(source, output_dir, dry_run=False) == 0
+    assert "skipped=1" in capsys.readouterr().out
+    assert sorted(path.name for path in output_dir.glob("*.md")) == ["2009-10-01-paper-one.md"]
+
+
+def test_row_index_reuse_depends_on_generator(tmp_path):
+    path = tmp_path / ".talks.row-index.json"
+    index = RowIndex(path, "generator-1")
+    assert index.reusable_entry("slug:a", "hash-a") is None
+
+    index.save({"slug:a": {"hash": "hash-a", "file": "a.md"}})
+    index = RowIndex(path, "generator-1")
+    assert index.reusable_entry("slug:a", "hash-a") == {"hash": "hash-a", "file": "a.md"}
+    assert index.reusable_entry("slug:a", "hash-b") is None
+
+    # A changed renderer keeps the rows for cleanup but reuses none of them.
+    index = RowIndex(path, "generator-2")
+    assert index.rows == {"slug:a": {"hash": "hash-a", "file": "a.md"}}
+    assert index.reusable_entry("slug:a", "hash-a") is None
+
+
+def test_row_fingerprint_sees_every_column():
+    assert row_fingerprint({"title": "A", "date": "2020-01-01"}) != row_fingerprint(
+        {"title": "A", "date": "2020-01-02"}
+    )
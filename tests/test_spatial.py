@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from sitegen.spatial import SpatialIndex, Venue, haversine_km
+
+
+def test_venues_sharing_coordinates_are_indexed():
+    berkeley = Venue("UC Berkeley", 37.8716, -122.2727)
+    alias = Venue("Berkeley CA, USA", 37.8716, -122.2727)
+
+    index = SpatialIndex([berkeley, alias])
+
+    assert index.venues == [alias, berkeley]
+    assert [venue for _, venue in index.within_radius(37.8716, -122.2727, 1.0)] == [alias, berkeley]
+
+
+def random_venues(seed: int, count: int) -> list:
+    generator = random.Random(seed)
+    venues = [
+        Venue(f"venue {index}", generator.uniform(-80, 80), generator.uniform(-180, 180))
+        for index in range(count)
+    ]
+    # Some venues share coordinates with others, as aliases of one place do.
+    aliases = [
+        Venue(f"alias {index}", venue.latitude, venue.longitude) for index, venue in enumerate(venues[:20])
+    ]
+    return venues + aliases
+
+
+def in_bbox(venue, south, west, north, east):
+    if not south <= venue.latitude <= north:
+        return False
+    if west <= east:
+        return west <= venue.longitude <= east
+    return venue.longitude >= west or venue.longitude <= east
+
+
+@pytest.mark.parametrize(
+    "box",
+    [(30, -130, 50, -60), (-10, 170, 10, -170), (-80, -180, 80, 180), (10, 10, 10.5, 10.5)],
+)
+def test_within_bbox_matches_brute_force(box):
+    venues = random_venues(1, 500)
+    index = SpatialIndex(venues)
+
+    expected = {venue.location for venue in venues if in_bbox(venue, *box)}
+    assert {venue.location for venue in index.within_bbox(*box)} == expected
+
+
+@pytest.mark.parametrize("center,radius_km", [((37.8, -122.3), 1500), ((0, 179.5), 800), ((75, 0), 3000)])
+def test_within_radius_and_nearest_match_brute_force(center, radius_km):
+    venues = random_venues(2, 500)
+    index = SpatialIndex(venues)
+    distances = sorted(
+        (haversine_km(*center, venue.latitude, venue.longitude), venue.location) for venue in venues
+    )
+
+    expected = [location for distance, location in distances if distance <= radius_km]
+    assert [venue.location for _, venue in index.within_radius(*center, radius_km)] == expected
+    nearest = [location for _, location in distances[:5]]
+    assert [venue.location for _, venue in index.nearest(*center, 5)] == nearest
+
+
+def test_payload_round_trip_keeps_order():
+    index = SpatialIndex(random_venues(3, 50))
+    restored = SpatialIndex.from_payload(index.to_payload())
+
+    assert restored.geohashes == index.geohashes
+    assert restored.venues == index.venues
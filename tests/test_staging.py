@@ -0,0 +1,79 @@
+import pytest
+
+from sitegen.context import BuildContext
+from sitegen.outputs import OutputManifest
+from sitegen.staging import run_staged
+
+
+def make_live(tmp_path):
+    live = tmp_path / "_talks"
+    live.mkdir()
+    (live / "kept.md").write_text("kept\n", encoding="utf-8")
+    (live / "changed.md").write_text("old\n", encoding="utf-8")
+    return live
+
+
+def snapshot(directory):
+    return {path.name: path.read_text(encoding="utf-8") for path in directory.iterdir()}
+
+
+def test_successful_run_swaps_the_directory_in(tmp_path):
+    live = make_live(tmp_path)
+    kept_inode = (live / "kept.md").stat().st_ino
+
+    def run(target):
+        assert target != live
+        OutputManifest(target, name=".manifest").write_if_changed(target / "changed.md", "new\n", False)
+        (target / "added.md").write_text("added\n", encoding="utf-8")
+        return 0
+
+    assert run_staged(live, True, BuildContext(), run) == 0
+    assert snapshot(live) == {"kept.md": "kept\n", "changed.md": "new\n", "added.md": "added\n"}
+    assert (live / "kept.md").stat().st_ino == kept_inode
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["_talks"]
+
+
+def test_failed_run_leaves_the_live_directory_untouched(tmp_path):
+    live = make_live(tmp_path)
+    before = snapshot(live)
+
+    def run(target):
+        OutputManifest(target, name=".manifest").write_if_changed(target / "changed.md", "new\n", False)
+        (target / "kept.md").unlink()
+        return 1
+
+    assert run_staged(live, True, None, run) == 1
+    assert snapshot(live) == before
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["_talks"]
+
+
+def test_exception_leaves_the_live_directory_untouched(tmp_path):
+    live = make_live(tmp_path)
+    before = snapshot(live)
+
+    def run(target):
+        (target / "added.md").write_text("added\n", encoding="utf-8")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        run_staged(live, True, None, run)
+    assert snapshot(live) == before
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["_talks"]
+
+
+def test_disabled_staging_writes_in_place(tmp_path):
+    live = make_live(tmp_path)
+    assert run_staged(live, False, None, lambda target: 0 if target == live else 1) == 0
+
+
+def test_rename_fallback_without_exchange(tmp_path, monkeypatch):
+    monkeypatch.setattr("sitegen.fileio.exchange_paths", lambda first, second: False)
+    live = make_live(tmp_path)
+
+    def run(target):
+        (target / "added.md").write_text("added\n", encoding="utf-8")
+        return 0
+
+    assert run_staged(live, True, None, run) == 0
+    assert snapshot(live) == {"kept.md": "kept\n", "changed.md": "old\n", "added.md": "added\n"}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["_talks"]
@@ -0,0 +1,141 @@
+import time
+
+import pytest
+
+from sitegen import talkmap
+from sitegen.geocache import MAX_FAILURE_BACKOFF_SECONDS, failure_retry_at
+from sitegen.geocoding import GeocodeOutcome
+from sitegen.talkmap import (
+    apply_geocode_outcome,
+    geocode_missing_locations,
+    load_existing_output_cache,
+    write_locations_js,
+)
+
+POINTS = [
+    ["Berkeley CA, USA", 37.8715, -122.273],
+    ["São Paulo, Brazil", -23.5505, -46.6333],
+    ["Berkeley CA, USA", 37.8715, -122.273],
+]
+EXPECTED = {
+    "Berkeley CA, USA": {"latitude": 37.8715, "longitude": -122.273},
+    "São Paulo, Brazil": {"latitude": -23.5505, "longitude": -46.6333},
+}
+
+
+@pytest.mark.parametrize("layout", ["pretty", "columnar"])
+def test_written_layouts_are_read_back_as_a_cache(tmp_path, layout):
+    output_js = tmp_path / "org-locations.js"
+
+    sizes = write_locations_js(output_js, POINTS, layout, ["gzip"])
+
+    assert set(sizes) == {"js", "gzip"}
+    assert load_existing_output_cache(output_js) == EXPECTED
+
+    # Without the .js, the cache is read from the .gz sibling.
+    output_js.unlink()
+    assert load_existing_output_cache(output_js) == EXPECTED
+
+
+def test_unrequested_and_unavailable_compressions_remove_stale_siblings(tmp_path, monkeypatch, capsys):
+    output_js = tmp_path / "org-locations.js"
+    gzip_path = tmp_path / "org-locations.js.gz"
+    brotli_path = tmp_path / "org-locations.js.br"
+    gzip_path.write_bytes(b"stale")
+    brotli_path.write_bytes(b"stale")
+    monkeypatch.setattr(talkmap, "load_brotli", lambda: None)
+
+    sizes = write_locations_js(output_js, POINTS, "columnar", ["brotli"])
+
+    assert set(sizes) == {"js"}
+    assert not gzip_path.exists()
+    assert not brotli_path.exists()
+    assert "brotli is not installed" in capsys.readouterr().err
+
+
+def test_saved_bytes_is_never_negative(tmp_path, capsys):
+    talks_dir = tmp_path / "_talks"
+    talks_dir.mkdir()
+    (talks_dir / "2012-03-01-one.md").write_text(
+        '---\ntitle: "One"\nlocation: "Berkeley CA, USA"\n---\n', encoding="utf-8"
+    )
+    cache_file = tmp_path / "geocode-cache.json"
+    cache_file.write_text(
+        '{"Berkeley CA, USA": {"latitude": 37.8715, "longitude": -122.273}}\n', encoding="utf-8"
+    )
+    paths = {
+        "--talks-dir": talks_dir,
+        "--output-js": tmp_path / "org-locations.js",
+        "--cache-file": cache_file,
+        "--aliases-file": tmp_path / "location-aliases.json",
+        "--alias-index": tmp_path / "location-index.json",
+        "--cache-db": tmp_path / "geocode-cache.sqlite",
+        "--scan-manifest": tmp_path / "scan-manifest.json",
+        "--failures-file": tmp_path / "geocode-failures.json",
+        "--clusters-dir": tmp_path / "clusters",
+        "--spatial-index": tmp_path / "spatial-index.json",
+    }
+    argv = [item for option, path in paths.items() for item in (option, str(path))]
+
+    assert talkmap.main([*argv, "--skip-geocode", "--output-layout", "columnar"]) == 0
+
+    summary = capsys.readouterr().out
+    assert "points=1" in summary
+    assert "saved_bytes=0" in summary
+
+
+def test_not_found_answers_count_attempts_and_transport_errors_do_not():
+    cache = {}
+    failures = {}
+
+    assert not apply_geocode_outcome(GeocodeOutcome("Atlantis", None), cache, failures, now=100.0)
+    assert failures == {"Atlantis": {"failed_at": 100.0, "attempts": 1}}
+    assert not apply_geocode_outcome(GeocodeOutcome("Atlantis", None), cache, failures, now=200.0)
+    assert failures == {"Atlantis": {"failed_at": 200.0, "attempts": 2}}
+
+    timed_out = GeocodeOutcome("Atlantis", None, error="GeocoderTimedOut: timed out")
+    assert not apply_geocode_outcome(timed_out, cache, failures, now=300.0)
+    assert failures == {"Atlantis": {"failed_at": 200.0, "attempts": 2}}
+
+    assert apply_geocode_outcome(GeocodeOutcome("Atlantis", (1.0, 2.0)), cache, failures, now=400.0)
+    assert cache == {"Atlantis": {"latitude": 1.0, "longitude": 2.0}}
+    assert failures == {}
+
+
+def test_backoff_doubles_with_each_attempt_up_to_the_cap():
+    assert failure_retry_at({"failed_at": 1000.0, "attempts": 1}, 60.0) == 1060.0
+    assert failure_retry_at({"failed_at": 1000.0, "attempts": 3}, 60.0) == 1240.0
+    assert failure_retry_at({"failed_at": 0.0, "attempts": 100}, 60.0) == MAX_FAILURE_BACKOFF_SECONDS
+
+
+def test_locations_inside_their_backoff_window_are_not_looked_up():
+    now = time.time()
+    cache = {}
+    failures = {
+        "Waiting": {"failed_at": now - 10, "attempts": 1},
+        "Expired": {"failed_at": now - 120, "attempts": 1},
+        "Doubled": {"failed_at": now - 90, "attempts": 2},
+    }
+    looked_up = []
+
+    def geocode(location):
+        looked_up.append(location)
+        return (1.0, 2.0) if location == "Expired" else None
+
+    resolved, unresolved, backing_off = geocode_missing_locations(
+        ["Waiting", "Expired", "Doubled", "New"],
+        cache,
+        user_agent="test",
+        min_delay=0,
+        lookup_limit=0,
+        failures=failures,
+        failure_backoff=60.0,
+        geocode=geocode,
+    )
+
+    assert (resolved, unresolved, backing_off) == (1, 1, 2)
+    assert sorted(looked_up) == ["Expired", "New"]
+    assert cache == {"Expired": {"latitude": 1.0, "longitude": 2.0}}
+    assert set(failures) == {"Waiting", "Doubled", "New"}
+    assert failures["New"]["attempts"] == 1
+    assert failures["Doubled"]["attempts"] == 2
@@ -0,0 +1,86 @@
+import json
+import pathlib
+
+from sitegen import talks
+from sitegen.validation import validate_rows
+
+TALKS_HEADER = "title\ttype\turl_slug\tvenue\tdate\tlocation\ttalk_url\tdescription\n"
+
+
+def write_tsv(path: pathlib.Path, header: str, rows: list) -> None:
+    path.write_text(header + "".join("\t".join(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def talk(slug: str, date: str) -> list:
+    return [f"Talk {slug}", "Talk", slug, "Venue", date, "Berkeley CA, USA", "", ""]
+
+
+def rows(*values):
+    return [{"title": title, "date": date, "url_slug": slug} for title, date, slug in values]
+
+
+def filename(row):
+    return f"{row['date']}-{row['url_slug']}.md"
+
+
+def test_each_rejected_row_gets_one_problem():
+    problems = validate_rows(
+        rows(
+            ("One", "2012-03-01", "one"),
+            ("", "2012-03-02", "two"),
+            ("Three", "", "three"),
+            ("Four", "2012-02-30", "four"),
+            ("Five", "2012-03-01", "one"),
+            ("Six", "March 2012", "one"),
+        ),
+        ("title", "date"),
+        "date",
+        filename,
+    )
+
+    assert list(problems) == [3, 4, 5, 6, 7]
+    assert problems[3] == "missing required values: title"
+    assert problems[4] == "missing required values: date"
+    assert "day is out of range" in problems[5]
+    assert problems[6] == "duplicate output filename 2012-03-01-one.md (first used by row 2)"
+    assert "Invalid isoformat" in problems[7]
+
+
+def test_a_rejected_row_does_not_claim_a_filename():
+    problems = validate_rows(
+        rows(("", "2012-03-01", "one"), ("One", "2012-03-01", "one")), ("title", "date"), "date", filename
+    )
+
+    assert problems == {2: "missing required values: title"}
+
+
+def test_cli_reports_every_problem_at_once_and_skips_those_rows(tmp_path, capsys):
+    source = tmp_path / "talks.tsv"
+    output_dir = tmp_path / "_talks"
+    report = tmp_path / "validation.json"
+    missing_title = talk("two", "2012-04-01")
+    missing_title[0] = ""
+    write_tsv(
+        source,
+        TALKS_HEADER,
+        [talk("one", "2012-03-01"), missing_title, talk("three", "2012-13-01"), talk("one", "2012-03-01")],
+    )
+
+    status = talks.main(
+        ["--input", str(source), "--output-dir", str(output_dir), "--validation-report", str(report)]
+    )
+
+    assert status == 0
+    warnings = [line for line in capsys.readouterr().err.splitlines() if line.startswith("WARNING")]
+    assert warnings[0] == "WARNING talks: 3 of 4 rows failed validation and are skipped"
+    assert [line.split(":")[0] for line in warnings[1:]] == [f"WARNING row {row}" for row in (3, 4, 5)]
+    assert sorted(path.name for path in output_dir.glob("*.md")) == ["2012-03-01-one.md"]
+
+    saved = json.loads(report.read_text(encoding="utf-8"))
+    assert saved["pipeline"] == "talks"
+    assert saved["rows"] == 4
+    assert [problem["row"] for problem in saved["problems"]] == [3, 4, 5]
+    assert saved["problems"][0]["message"] == "missing required values: title"
+    assert saved["problems"][2]["message"] == (
+        "duplicate output filename 2012-03-01-one.md (first used by row 2)"
+    )
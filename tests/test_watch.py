@@ -0,0 +1,66 @@
+import pytest
+
+from sitegen.context import BuildContext
+from sitegen.watch import PollingWatcher, WatchTarget, create_watcher, watch
+
+
+class ScriptedWatcher(PollingWatcher):
+    """Polls quickly, applies ``edit`` before the first scan and stops once a target has run."""
+
+    def __init__(self, edit, runs) -> None:
+        super().__init__(interval=0.001)
+        self.edit = edit
+        self.runs = runs
+
+    def wait(self, timeout):
+        if timeout is None:
+            if self.runs:
+                raise KeyboardInterrupt
+            if self.edit is not None:
+                self.edit()
+                self.edit = None
+        return super().wait(timeout)
+
+
+def test_poll_backend_has_nothing_to_drain(tmp_path):
+    watcher = create_watcher([tmp_path], backend="poll", poll_interval=0.25)
+
+    assert watcher.backend == "poll"
+    assert watcher.interval == 0.25
+    assert watcher.wait(0) is False
+
+
+def test_poll_backend_reruns_changed_targets_with_fresh_listings(tmp_path, capsys):
+    source = tmp_path / "talks.tsv"
+    source.write_text("title\n", encoding="utf-8")
+    output_dir = tmp_path / "_talks"
+    output_dir.mkdir()
+    (output_dir / "old.md").write_text("---\n---\n", encoding="utf-8")
+    context = BuildContext()
+    assert context.listing(output_dir) == {"old.md"}
+
+    runs = []
+    targets = [
+        WatchTarget(
+            name="talks",
+            paths=lambda: [source],
+            run=lambda: runs.append(("talks", set(context.listing(output_dir)))) or 0,
+        ),
+        WatchTarget(
+            name="publications",
+            paths=lambda: [tmp_path / "publications.tsv"],
+            run=lambda: runs.append(("publications", set())) or 0,
+        ),
+    ]
+
+    def edit():
+        source.write_text("title\nA new talk\n", encoding="utf-8")
+        (output_dir / "old.md").unlink()
+
+    trigger_file = tmp_path / ".rebuild"
+    with pytest.raises(KeyboardInterrupt):
+        watch(targets, ScriptedWatcher(edit, runs), 0.001, trigger_file=trigger_file, context=context)
+
+    assert runs == [("talks", set())]
+    assert trigger_file.exists()
+    assert "watch: changed=talks" in capsys.readouterr().out